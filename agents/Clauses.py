@@ -2,21 +2,17 @@ from email.mime import base
 import os
 import json
 from strands import Agent, tool
-from strands.models import BedrockModel
 from pydantic import BaseModel, Field
 from pprint import pprint
-from utils.normalizeNames import normalize_basename, make_sections_name
+from utils.normalizeNames import normalize_basename, make_md_name, make_sections_name, find_sections_name
 from memory.AgentsMemory import memory
-
-# ---------------------------
-# LLM configuration
-# ---------------------------
-NOVA_MODEL = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",
-    region_name="us-east-1",
-    temperature=0.2,
-    top_p=0.9,
-)
+from utils.tracing import traced
+from utils.novaModel import NOVA_MODEL
+from utils.concurrency import bounded_map, structured_output
+from utils.sectionPacker import pack_sections
+from utils.markdownSections import open_sections
+from retrieval.Dedup import dedupe_clauses
+from utils.sectionHashes import section_hash, context_hash, section_clauses_path, read_json, write_json
 
 AREAS = {
     "hr", "security", "privacy", "compliance", "operations",
@@ -32,10 +28,127 @@ class Clause(BaseModel):
 class Clauses(BaseModel):
     clauses: list[Clause]
 
+class PackedClause(Clause):
+    section: int = Field(..., description="Number in brackets of the section the clause comes from")
+
+class PackedClauses(BaseModel):
+    clauses: list[PackedClause]
+
+# Concurrent section analysis: maximum LLM calls in flight and per-call timeout (seconds)
+CLAUSES_MAX_WORKERS = int(os.getenv("CLAUSES_MAX_WORKERS", "4"))
+CLAUSES_CALL_TIMEOUT = float(os.getenv("CLAUSES_CALL_TIMEOUT", "120"))
+# Section text (estimated tokens) packed into one LLM call; 0 sends one call per section
+CLAUSES_TOKEN_BUDGET = int(os.getenv("CLAUSES_TOKEN_BUDGET", "3000"))
+
+def rebuild_window_sections(document_name: str, sections_dir: str, markdown_dir: str) -> str:
+    """Split the document's current Markdown into windows again and return the new sections file name."""
+    from agents.Splitter import split_markdown_by_window, save_sections
+    from pipeline.BatchIngestion import WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS
+    from utils.markdownSections import read_markdown
+
+    md_path = os.path.join(markdown_dir, make_md_name(document_name))
+    sections = split_markdown_by_window(read_markdown(md_path), WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS)
+    return os.path.basename(save_sections(sections, sections_dir, "window", document_name, md_path))
+
 class ClausesAgent:
-    def __init__(self):
-        self.agent = Agent(model=NOVA_MODEL)
+    def __init__(
+        self,
+        model=None,
+        max_workers: int = CLAUSES_MAX_WORKERS,
+        call_timeout: float = CLAUSES_CALL_TIMEOUT,
+        token_budget: int = CLAUSES_TOKEN_BUDGET,
+    ):
+        self.model = model or NOVA_MODEL
+        self.max_workers = max_workers
+        self.call_timeout = call_timeout
+        self.token_budget = token_budget
+        self.agent = Agent(model=self.model)
+
+    def analyze_section(self, section: dict, context: str = "") -> list[dict]:
+        """
+        Extract the clauses of a single section with one LLM call.
+
+        A fresh Agent is used for every call: `structured_output` appends the prompt to the
+        agent's conversation history, so sharing one agent between sections would both grow
+        the prompt on every call and race when sections run concurrently.
+        """
+        section_text = section.get('content', '').strip()
+        prompt = (
+            "Analyze the section and generate clauses:\n\n"
+            f"Section: {section_text}\n\n"
+            "Each clause must have: text, area (from list), and relevance (0-1).\n"
+            f"Areas: {', '.join(AREAS)}.\n"
+            f"Context: {context if context else 'No context provided.'}\n\n"
+        )
+
+        agent = Agent(model=self.model, callback_handler=None)
+        result = structured_output(agent, Clauses, prompt)
+
+        if not result or not result.clauses:
+            return []
+
+        return [
+            {
+                "section_title": section.get('title', 'Untitled'),
+                "clause_text": clause.clause_text,
+                "area": clause.area,
+                "relevance": clause.relevance
+            }
+            for clause in result.clauses
+        ]
+
+    @traced(kind="agent")
+    def analyze_pack(self, pack: list[dict], context: str = "") -> dict[int, list[dict]]:
+        """
+        Extract the clauses of several sections (or parts of a long one) with one LLM call.
 
+        Args:
+            pack (list[dict]): Pieces from `pack_sections`.
+            context (str): Context for the analysis.
+
+        Returns:
+            dict[int, list[dict]]: Clauses by section index (`piece["index"]`).
+        """
+        if len(pack) == 1 and pack[0]["parts"] == 1:
+            # Same prompt as before packing, so cached responses stay valid
+            piece = pack[0]
+            return {piece["index"]: self.analyze_section(piece, context)}
+
+        numbered = "\n\n".join(
+            f"[{number}] {piece['title']}"
+            + (f" (part {piece['part']} of {piece['parts']})" if piece["parts"] > 1 else "")
+            + f"\n{piece['content']}"
+            for number, piece in enumerate(pack, start=1)
+        )
+        prompt = (
+            "Analyze each of the numbered sections below and generate clauses:\n\n"
+            f"{numbered}\n\n"
+            "Each clause must have: text, area (from list), relevance (0-1), and section "
+            "(the number in brackets of the section the clause comes from).\n"
+            f"Areas: {', '.join(AREAS)}.\n"
+            f"Context: {context if context else 'No context provided.'}\n\n"
+        )
+
+        agent = Agent(model=self.model, callback_handler=None)
+        result = structured_output(agent, PackedClauses, prompt)
+
+        clauses = {piece["index"]: [] for piece in pack}
+        for clause in (result.clauses if result else []):
+            if 1 <= clause.section <= len(pack):
+                piece = pack[clause.section - 1]
+            else:
+                # Unknown section number: attribute the clause to the piece sharing most words with it
+                words = set(clause.clause_text.lower().split())
+                piece = max(pack, key=lambda p: len(words & set(p["content"].lower().split())))
+            clauses[piece["index"]].append({
+                "section_title": piece["title"],
+                "clause_text": clause.clause_text,
+                "area": clause.area,
+                "relevance": clause.relevance,
+            })
+        return clauses
+
+    @traced(kind="agent")
     def analyze_sections(self, document_name: str, chosen_file: str, context: str = "") -> dict:
         base_dir = os.getcwd()
         sections_dir = os.path.join(base_dir, "sections")
@@ -43,45 +156,89 @@ class ClausesAgent:
 
         print(f"🤖 Clauses Creator Agent - Analyze Sections")
         print(f"🔍 Document Name: {document_name}, Chosen File: {chosen_file}, Context: {context[:30]}" )
-        with open(os.path.join(sections_dir, chosen_file), "r", encoding="utf-8") as f:
-            sections = json.load(f)
+        # Window files hold offsets; their text is read from the memory-mapped Markdown
+        markdown_dir = os.path.join(base_dir, "markdown")
+        try:
+            with open_sections(os.path.join(sections_dir, chosen_file), markdown_dir) as stored:
+                sections = [section for section in stored if section.get('content', '').strip()]
+        except ValueError as e:
+            # The Markdown changed since the windows were computed: their offsets are stale
+            print(f"🔁 Rebuilding the window sections of {document_name}: {e}")
+            chosen_file = rebuild_window_sections(document_name, sections_dir, markdown_dir)
+            with open_sections(os.path.join(sections_dir, chosen_file), markdown_dir) as stored:
+                sections = [section for section in stored if section.get('content', '').strip()]
 
-        rank_sections = []
-        for section in sections:
-            section_text = section.get('content', '').strip()
-            if not section_text:
-                continue
+        # Clauses of sections whose content hash (and context) did not change since the
+        # previous run are carried over; the LLM only sees new or changed sections.
+        section_clauses_file = section_clauses_path(os.path.join(base_dir, "clauses"), document_name)
+        previous = read_json(section_clauses_file, {})
+        context_key = context_hash(context)
+        hashes = [section_hash(section) for section in sections]
+        reusable = {digest for digest in hashes if previous.get(digest, {}).get("context") == context_key}
+        to_analyze = [(section, digest) for section, digest in zip(sections, hashes) if digest not in reusable]
+        print(f"🔍 {len(to_analyze)} sections to analyze, {len(sections) - len(to_analyze)} unchanged")
 
-            prompt = (
-                "Analyze the section and generate clauses:\n\n"
-                f"Section: {section_text}\n\n"
-                "Each clause must have: text, area (from list), and relevance (0-1).\n"
-                f"Areas: {', '.join(AREAS)}.\n"
-                f"Context: {context if context else 'No context provided.'}\n\n"
-            )
-
-            try:
-                result = self.agent.structured_output(Clauses, prompt)
-            except Exception as e:
-                print(f"🔍 Error processing section: {e}")
-                continue
+        # Small sections share a call and long ones are split, up to `token_budget` per call
+        packs = pack_sections([section for section, _ in to_analyze], self.token_budget)
+        if packs:
+            print(f"🔍 {len(to_analyze)} sections packed into {len(packs)} LLM calls")
+        outcomes = bounded_map(
+            lambda pack: self.analyze_pack(pack, context),
+            packs,
+            max_workers=self.max_workers,
+            timeout=self.call_timeout,
+        )
+
+        found = {index: [] for index in range(len(to_analyze))}
+        errors = {}
+        for outcome in outcomes:
+            for piece in outcome.item:
+                if not outcome.ok:
+                    errors.setdefault(piece["index"], outcome.error)
+            if outcome.ok:
+                for index, clauses in outcome.result.items():
+                    found[index].extend(clauses)
 
-            if not result or not result.clauses:
-                print(f"🔍 No clauses generated for section: {section.get('title', 'Untitled')}")
+        analyzed = {}
+        failed_sections = []
+        for index, (section, digest) in enumerate(to_analyze):
+            title = section.get('title', 'Untitled')
+            if index in errors:
+                # A section is stored only when all its parts succeeded
+                print(f"🔍 Error processing section '{title}': {errors[index]!r}")
+                failed_sections.append({"section_title": title, "error": repr(errors[index])})
                 continue
+            if not found[index]:
+                print(f"🔍 No clauses generated for section: {title}")
+            analyzed[digest] = found[index]
 
-            for clause in result.clauses:
-                rank_sections.append({
-                    "section_title": section.get('title', 'Untitled'),
-                    "clause_text": clause.clause_text,
-                    "area": clause.area,
-                    "relevance": clause.relevance
-                })
+        # Assemble in section order, so the ranking below is deterministic
+        rank_sections = []
+        section_clauses = {}
+        for section, digest in zip(sections, hashes):
+            if digest in analyzed:
+                clauses = analyzed[digest]
+            elif digest in reusable:
+                clauses = previous[digest]["clauses"]
+            else:
+                continue  # failed; retried on the next run
+            section_clauses[digest] = {
+                "title": section.get('title', 'Untitled'),
+                "context": context_key,
+                "clauses": clauses,
+            }
+            rank_sections.extend(clauses)
+        write_json(section_clauses_file, section_clauses)
 
         if not rank_sections:
             print(f"🔍 No clauses generated.")
-            return {"file": document_name, "clauses": []}
+            return {"file": document_name, "clauses": [], "failed_sections": failed_sections, "llm_calls": len(packs)}
 
+        # Overlapping windows and repeated passages yield the same clause more than once
+        extracted = len(rank_sections)
+        rank_sections = dedupe_clauses(rank_sections)
+        if extracted > len(rank_sections):
+            print(f"🔍 {extracted - len(rank_sections)} duplicated clauses merged")
         rank_sections.sort(key=lambda x: x['relevance'], reverse=True)
         top_clauses = rank_sections[:10]
 
@@ -95,7 +252,15 @@ class ClausesAgent:
             with open(clauses_file, "w", encoding="utf-8") as f:
                 json.dump(top_clauses, f, indent=2)
             
-        clauses_context = {"file": document_name, "clauses": top_clauses} 
+        clauses_context = {
+            "file": document_name,
+            "clauses": top_clauses,
+            "analyzed_sections": len(analyzed),
+            "reused_sections": len(reusable),
+            "llm_calls": len(packs),
+        }
+        if failed_sections:
+            clauses_context["failed_sections"] = failed_sections
         memory.set("top_clauses", top_clauses)
         return clauses_context  
 
@@ -103,9 +268,14 @@ class ClausesAgent:
         memory.set("actual_agent", "Clauses")
         memory.set("actual_tool", "analyze_sections")
         result = self.analyze_sections(document_name, chosen_file, context)
+        # Kept per document, so the validator merges the clauses of every ingested document
+        clauses_by_document = dict(memory.get("clauses_by_document") or {})
+        clauses_by_document[document_name] = result.get("clauses", [])
+        memory.set("clauses_by_document", clauses_by_document)
         return json.dumps(result, indent=2)
     
 @tool
+@traced(kind="tool")
 def clauses_agent(document_name: str, context: str = "") -> str:
     """
     Analyze sections of a document and extract relevant clauses.
@@ -123,20 +293,21 @@ def clauses_agent(document_name: str, context: str = "") -> str:
         return "Document name is required."
     
     base = normalize_basename(document_name)
-    title_file = make_sections_name(base, "title")    # e.g. title_My_File.json
-    window_file = make_sections_name(base, "window")  # e.g. window_My_File.json    
+    title_file = make_sections_name(base, "title")    # e.g. title_My_File.sections
+    window_file = make_sections_name(base, "window")  # e.g. window_My_File.sections
 
     base_dir = os.getcwd()
     sections_dir = os.path.join(base_dir, "sections")
-    title_path = os.path.join(sections_dir, title_file)
-    window_path = os.path.join(sections_dir, window_file)
-
-    if os.path.exists(title_path):
-        chosen_file = title_file
-        print(f"✅ Using title sections: {title_file}")
-    elif os.path.exists(window_path):
-        chosen_file = window_file
-        print(f"✅ Using window sections: {window_file}")
+    # Binary section stores first, then JSON section files
+    found_title = find_sections_name(sections_dir, base, "title")
+    found_window = find_sections_name(sections_dir, base, "window")
+
+    if found_title:
+        chosen_file = found_title
+        print(f"✅ Using title sections: {found_title}")
+    elif found_window:
+        chosen_file = found_window
+        print(f"✅ Using window sections: {found_window}")
     else:
         return f"Error: No sections found for base name '{base}'. Expected {title_file} or {window_file} in {sections_dir}."
 
@@ -1,18 +1,23 @@
 from strands import Agent, tool
 from utils.novaModel import NOVA_MODEL
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.concurrency import stream_agent
 
 
 class CreatorAgent:
-    def __init__(self):
+    def __init__(self, model=None):
         self.agent = Agent(
-            model=NOVA_MODEL
+            model=model or NOVA_MODEL
         )
 
+    @traced(kind="agent")
     def create_response(self) -> str:
         """
         Create the final response based on the validated clauses and the user's question.
         The function uses the memory to retrieve the validated clauses and the user's question.
+        The response is streamed: while it is generated, `partial_answer` in memory holds
+        the text so far, so the interface can show it before the model finishes.
 
         Returns:
             str: The final response.
@@ -33,17 +38,31 @@ class CreatorAgent:
             print("❌ User question not found in memory.")
             return "User question not found in memory."
         
-        document_name = memory.get("main_document") or ""
+        documents = memory.get("documents") or [memory.get("main_document") or ""]
         
         # Create a prompt and use LLM to generate the final response
         prompt = f"Create a response to the following question: {user_input}\n\n"
         prompt += f"Based on the following validated clauses: \n {validated_clauses if validated_clauses else ''}"
-        prompt += f"In the end of your response, refer to the document: {document_name}\n\n"
-        response = self.agent(prompt)
+        if len(documents) > 1:
+            # Clauses end with their sources in brackets (utils/clauseMerge.py)
+            prompt += "Cite the source document of each statement, as given in brackets after each clause.\n"
+            prompt += f"In the end of your response, refer to the documents used among: {', '.join(documents)}\n\n"
+        else:
+            prompt += f"In the end of your response, refer to the document: {documents[0]}\n\n"
+        partial = ""
+
+        def publish(text: str) -> None:
+            nonlocal partial
+            partial += text
+            memory.set("partial_answer", partial)
+
+        memory.set("partial_answer", "")
+        response = stream_agent(self.agent, prompt, publish)
         
         return response
     
 @tool
+@traced(kind="tool")
 def create_answer() -> str:
     """
     Create the final answer using the CreatorAgent.
@@ -1,20 +1,15 @@
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.novaModel import NOVA_MODEL
+from utils.concurrency import call_agent
 from agents.Markdown import pdf_to_md_agent
 from agents.Splitter import splitter_agent
 from agents.Clauses import clauses_agent
 from strands import Agent, tool
-from strands.models import BedrockModel
 from utils.normalizeNames import normalize_basename, make_pdf_name, make_md_name
 import os
 
 
-NOVA_MODEL = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",
-    region_name="us-east-1",
-    temperature=0.2,
-    top_p=0.9,
-)
-
 INGESTION_PROMPT = """
 You are an Ingestion Agent that orchestrates the ingestion of documents.
 You will receive a instruction containing the name of a document in PDF or Markdown format, and your task is to process it.
@@ -54,6 +49,7 @@ class IngestionAgent():
         )
     
     @tool
+    @traced(kind="tool")
     def check_status(self, document_name: str) -> str:
         """
         Check if the document has been processed.
@@ -78,9 +74,10 @@ class IngestionAgent():
             return f"Document {base_name} has not been processed yet."
         
     def __call__(self, instruction: str) -> dict:
-        return self.agent(instruction)
+        return call_agent(self.agent, instruction)
 
 @tool
+@traced(kind="tool")
 def ingestion_agent(instruction: str, document_name: str, bucket_name: str, context: str) -> dict:
     """
     Ingest a document based on the provided instruction.
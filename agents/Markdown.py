@@ -1,38 +1,141 @@
 import os
-import boto3
-from io import BytesIO
+from pathlib import Path
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands_tools import use_aws
-from docling.document_converter import DocumentConverter, DocumentStream
+from utils.awsClients import get_client
 from pprint import pprint
 from pydantic import BaseModel
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.novaModel import NOVA_MODEL
+from utils.concurrency import call_agent
 from utils.normalizeNames import normalize_basename, make_pdf_name
+from utils.conversionCache import get_conversion_cache
+from utils.converterPool import get_converter_pool
 
 
-# ---------------------------
-# LLM configuration
-# ---------------------------
-NOVA_MODEL = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",
-    region_name="us-east-1",
-    temperature=0.2,
-    top_p=0.9,
-)
+# Options that change the docling output; part of the conversion cache key
+DOCLING_OPTIONS = {"converter": "default", "export": "markdown"}
 
 class FileMeta(BaseModel):
     base_name: str
     extension: str
     local_path: str
 
+# ---------------------------
+# Download / conversion steps, shared by the agent tools and batch ingestion
+# ---------------------------
+# Multipart, streamed-to-disk S3 downloads: ranged GETs of 8 MB written straight to the file
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True,
+)
+
+def _etag_path(local_path: str) -> str:
+    return local_path + ".etag"
+
+def source_etag_path(md_path: str) -> str:
+    """ETag of the S3 object a Markdown file (and the sections and clauses made from it) was built from."""
+    return md_path + ".etag"
+
+def _record_source_etag(local_path: str, md_path: str) -> None:
+    if os.path.exists(_etag_path(local_path)):
+        with open(_etag_path(local_path), "r", encoding="utf-8") as f:
+            etag = f.read().strip()
+        with open(source_etag_path(md_path), "w", encoding="utf-8") as f:
+            f.write(etag)
+
+@traced(kind="s3")
+def download_pdf(s3_client, bucket: str, key: str, tmp_dir: str) -> tuple[str, bool]:
+    """
+    Stream an S3 object to `tmp_dir`, keeping its file name.
+
+    The object is never held in memory: it is fetched in chunks straight to a temporary
+    file. The ETag of every download is stored next to the file, and a later call for
+    the same key sends a conditional request (If-None-Match) and skips the download
+    when the object has not changed.
+
+    Returns:
+        tuple[str, bool]: Local path of the file and whether it was downloaded (False when unchanged).
+    """
+    local_path = os.path.join(tmp_dir, key.rsplit("/", 1)[-1])
+    etag_path = _etag_path(local_path)
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    head_kwargs = {"Bucket": bucket, "Key": key}
+    if os.path.exists(local_path) and os.path.exists(etag_path):
+        with open(etag_path, "r", encoding="utf-8") as f:
+            head_kwargs["IfNoneMatch"] = f.read().strip()
+    try:
+        head = s3_client.head_object(**head_kwargs)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+            print(f"⏭️ {key} unchanged since last download, using {local_path}")
+            return local_path, False
+        raise
+
+    tmp_path = f"{local_path}.{os.getpid()}.part"
+    try:
+        s3_client.download_file(bucket, key, tmp_path, Config=S3_TRANSFER_CONFIG)
+        os.replace(tmp_path, local_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(etag_path, "w", encoding="utf-8") as f:
+        f.write(head["ETag"])
+
+    print(f"📥 Downloaded {key} to {local_path} ({head.get('ContentLength', 0)} bytes)")
+    return local_path, True
+
+@traced(kind="docling")
+def convert_pdf_to_markdown(local_path: str, filename: str, markdown_dir: str) -> tuple[str, bool]:
+    """
+    Convert a local PDF to Markdown in `markdown_dir`, going through the conversion cache.
+    The ETag `download_pdf` stored for the PDF is recorded next to the Markdown
+    (`source_etag_path`), so batch ingestion can tell when the object changes.
+
+    Returns:
+        tuple[str, bool]: Path of the Markdown file and whether it came from the cache.
+    """
+    md_filename = filename.rsplit(".", 1)[0] + ".md"
+    md_path = os.path.join(markdown_dir, md_filename)
+
+    cache = get_conversion_cache()
+    cache_key = cache.make_key(local_path, DOCLING_OPTIONS)
+    if cache.materialize(cache_key, md_path):
+        print(f"⚡ Conversion cache hit for {filename}")
+        _record_source_etag(local_path, md_path)
+        return md_path, True
+
+    print(f"🔄 Converting PDF: {local_path}")
+    # docling reads the file itself; no in-memory copy of the PDF
+    result = get_converter_pool().convert(Path(local_path)).document
+    markdown = result.export_to_markdown()
+
+    cache.put(cache_key, markdown)
+    if not cache.materialize(cache_key, md_path):
+        # Entry evicted right away (larger than the whole cache budget)
+        os.makedirs(markdown_dir, exist_ok=True)
+        with open(md_path, "w", encoding="utf-8") as md_file:
+            md_file.write(markdown)
+
+    _record_source_etag(local_path, md_path)
+    print(f"✅ Markdown saved to {md_path}")
+    return md_path, False
+
 # ---------------------------
 # PdfToMarkdownAgent as Class
 # ---------------------------
 class PdfToMarkdownAgent:
     def __init__(self):
+        # strands_tools is slow to import; only load it when the agent is built
+        from strands_tools import use_aws
+
         # Initialize tools
-        self.s3_client = boto3.client("s3")
+        self.s3_client = get_client("s3")
         self.agent = Agent(
             tools=[
                 self.download_pdf_from_s3, 
@@ -43,6 +146,7 @@ class PdfToMarkdownAgent:
         )
 
     @tool
+    @traced(kind="tool")
     def download_pdf_from_s3(self, bucket: str, document_name: str) -> dict:
         """
         Download a PDF from S3 raw folder and save to a local tmp directory.
@@ -66,24 +170,12 @@ class PdfToMarkdownAgent:
         print(f"🔧 Downloading {key} from bucket {bucket}")
 
         try:
-            response = self.s3_client.get_object(Bucket=bucket, Key=key)
-            pdf_bytes = response['Body'].read()
+            local_path, _ = download_pdf(self.s3_client, bucket, key, tmp_dir)
         except Exception as e:
             
             return {"error": f"Error downloading file from S3: {e}"}
 
-        filename = key.rsplit("/", 1)[-1]
-        local_path = os.path.join(tmp_dir, filename)
-
-        try:
-            os.makedirs(tmp_dir, exist_ok=True)
-            with open(local_path, "wb") as f:
-                f.write(pdf_bytes)
-        except Exception as e:
-            
-            return {"error": f"Error saving file to local tmp: {e}"}
-
-        print(f"📥 Downloaded {key} to {local_path} ({len(pdf_bytes)} bytes)")
+        filename = os.path.basename(local_path)
         
         return {
             "local_path": local_path,
@@ -91,6 +183,7 @@ class PdfToMarkdownAgent:
         }
 
     @tool
+    @traced(kind="tool")
     def convert_pdf_save_md(self, local_path: str, filename: str) -> str:
         """
         Convert a local PDF file to Markdown and save it to a markdown directory with a .md extension.
@@ -107,34 +200,11 @@ class PdfToMarkdownAgent:
         base_dir = os.getcwd()
         markdown_dir = os.path.join(base_dir, "markdown")
 
-        print(f"🔄 Converting PDF: {local_path}")
-        try:
-            with open(local_path, "rb") as f:
-                source_stream = DocumentStream(name=filename, stream=BytesIO(f.read()))
-        except Exception as e:
-            
-            return f"Error reading PDF file: {e}"
-
         try:
-            converter = DocumentConverter()
-            result = converter.convert(source_stream).document
-            markdown = result.export_to_markdown()
+            md_path, _ = convert_pdf_to_markdown(local_path, filename, markdown_dir)
         except Exception as e:
             
             return f"Error converting PDF to Markdown: {e}"
-
-        md_filename = filename.rsplit(".", 1)[0] + ".md"
-        md_path = os.path.join(markdown_dir, md_filename)
-
-        try:
-            os.makedirs(markdown_dir, exist_ok=True)
-            with open(md_path, "w", encoding="utf-8") as md_file:
-                md_file.write(markdown)
-        except Exception as e:
-            
-            return f"Error saving Markdown file: {e}"
-
-        print(f"✅ Markdown saved to {md_path}")
         
         return f"Markdown saved to {md_path}"
 
@@ -142,12 +212,13 @@ class PdfToMarkdownAgent:
         """
         Allow the agent to be called like a function.
         """
-        return self.agent(query)
+        return call_agent(self.agent, query)
 
 # ---------------------------
 # Wrap in Tool for other agents
 # ---------------------------
 @tool
+@traced(kind="tool")
 def pdf_to_md_agent(document_name: str, bucket: str) -> str:
     """
     Tool to convert a PDF file from S3 to Markdown.
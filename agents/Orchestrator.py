@@ -1,18 +1,22 @@
 import os
-import boto3
 from typing import Any, Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()  # before the agent imports, which read their settings from the environment
+
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.concurrency import call_agent
 from agents.Ingestion import ingestion_agent
 from agents.Validator import validate_agent
 from agents.Creator import create_answer
 from strands import Agent, tool
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from pprint import pprint
 from agents.tools.agentsTools import check_status
 from utils.novaModel import NOVA_MODEL
-
-load_dotenv()
+from retrieval.Retriever import retrieve_documents, default_min_score
+from pipeline.Planner import PipelineExecutor, ORCHESTRATOR_MODE
 
 KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID", "default_kb_id")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
@@ -25,6 +29,7 @@ Your task is to orchestrate the execution of agents in a way that optimizes resp
 Your first step should be to retrieve relevant documents from the knowledge base using the `custom_retrieve` tool.
 After that you can check if a document has already been processed and is available in Markdown format using the `check_status` tool.
 If the document isn't processed, you should use the `IngestionAgent` to process it.
+When several retrieved documents are relevant, ingest each of them before validating: the validator merges their clauses and the final answer cites every source.
 You should consider the following available agents:
 
 IngestionAgent -> ingestion_agent tool: The agent responsible for orchestrating the ingestion of documents.
@@ -33,7 +38,7 @@ IngestionAgent -> ingestion_agent tool: The agent responsible for orchestrating
   - Returns a JSON with the most relevant clauses extracted from the document and their areas.
 
 ValidatorAgent -> validate_agent tool: The agent responsible for validating clauses extracted by the IngestionAgent.
-  - Read the clauses from memory and validates them against the provided context.
+  - Read the clauses of all ingested documents from memory and validates them against the provided context.
   - Returns a message indicating whether the clauses are valid or not.
 
 CreatorAgent -> creator_agent tool: The agent responsible for creating the final response based on the validated clauses.
@@ -57,7 +62,10 @@ class DocumentList(BaseModel):
     documents: list[str]
 
 class OrchestratorAgent():
-    def __init__(self):
+    def __init__(self, mode: str = ORCHESTRATOR_MODE):
+        self.mode = mode
+        # Why the last fast-mode call fell back to the agentic orchestrator, None if it did not
+        self.fast_path_error = None
         self.agent = Agent(
             tools=[
                 ingestion_agent,
@@ -88,6 +96,7 @@ class OrchestratorAgent():
       return [result for result in results if result.get("score", 0.0) >= min_score]
     
     @tool
+    @traced(kind="tool")
     def custom_retrieve(self, text: str, number_of_results: int, score: float) -> DocumentList:
         """
         Retrieve a list of documents from the knowledge base based on the provided text.
@@ -102,44 +111,35 @@ class OrchestratorAgent():
         """
         memory.set("actual_agent", "Orchestrator")
         memory.set("actual_tool", "custom_retrieve")
-        kb_id = os.getenv("KNOWLEDGE_BASE_ID")
-        region_name = os.getenv("AWS_REGION", "us-east-1")
         default_number_of_results = int(os.getenv("NUMBER_OF_RESULTS", "10"))
-        default_min_score = float(os.getenv("MIN_SCORE", "0.4"))
-        min_score = score if score is not None else default_min_score
+        min_score = score if score is not None else default_min_score()
         number_of_results = number_of_results if number_of_results is not None else default_number_of_results
 
-        bedrock_agent_runtime_client = boto3.client("bedrock-agent-runtime", region_name=region_name)
-        
-        # Perform retrieval
-        response = bedrock_agent_runtime_client.retrieve(
-            retrievalQuery={"text": text},
-            knowledgeBaseId=kb_id,
-            retrievalConfiguration={
-                "vectorSearchConfiguration": {"numberOfResults": 5},
-            },
-        )
-
-        # pprint(response)
-
-         # Get and filter results
-        all_results = response.get("retrievalResults", [])
-        filtered_results = self.filter_results_by_score(all_results, min_score)
-        documents_names = []
-        for result in filtered_results:
-            uri = result['location']['s3Location']['uri']
-            documents_names.append(uri.split("/")[-1])  # Extract filename from S3 URI
+        documents_names = retrieve_documents(text, number_of_results, min_score)
         print(f"📄 Documents found: {documents_names}")
         memory.set("main_document", documents_names[0] if documents_names else None)
+        # Every retrieved document is a source; clauses of a previous question are dropped
+        memory.set("documents", list(documents_names))
+        memory.set("clauses_by_document", {})
 
         return documents_names
     
+    @traced("Orchestrator", kind="request")
     def __call__(self, user_input: str) -> dict:
         memory.set("actual_agent", "Orchestrator")
         print(f"🤖 Orchestrator Agent - Processing instruction: {user_input}")
         memory.set("user_input", user_input)
 
-        return self.agent(user_input)
+        self.fast_path_error = None
+        if self.mode == "fast":
+            try:
+                return PipelineExecutor().run(user_input)
+            except Exception as e:
+                self.fast_path_error = repr(e)
+                print(f"⚠️ Fast path failed ({e}), falling back to the agentic orchestrator")
+                memory.set("actual_agent", "Orchestrator")
+
+        return call_agent(self.agent, user_input)
 
 
 if __name__ == "__main__":
@@ -1,19 +1,72 @@
 import os
 import json
 from strands import Agent, tool
-from strands.models import BedrockModel
-from utils.normalizeNames import normalize_basename, make_md_name
+from utils.normalizeNames import normalize_basename, make_md_name, make_sections_name
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.novaModel import NOVA_MODEL
+from utils.concurrency import call_agent
+from utils.markdownSections import split_sections, split_windows, offsets_payload, read_markdown, count_headings
+from utils.sectionStore import write_section_store
+from utils.sectionHashes import section_hash, hashes_path, diff_sections, read_json, write_json
 
 # ---------------------------
-# LLM configuration
+# Splitting steps, shared by the agent tools and batch ingestion
 # ---------------------------
-NOVA_MODEL = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",
-    region_name="us-east-1",
-    temperature=0.2,
-    top_p=0.9,
-)
+def split_markdown_by_title(text: str, levels: tuple = None) -> list[dict]:
+    """
+    Split Markdown text into sections at its headings, in one pass (utils/markdownSections.py).
+    `levels` defaults to SPLITTER_HEADING_LEVELS; text before the first heading is kept as a preamble.
+    """
+    return split_sections(text, levels)
+
+def split_markdown_by_window(text: str, window_tokens: int, overlap_tokens: int) -> list[dict]:
+    """
+    Split text into windows of about `window_tokens` tokens overlapping by up to `overlap_tokens`,
+    cut at paragraph or sentence boundaries (utils/markdownSections.py).
+    """
+    return split_windows(text, window_tokens, overlap_tokens)
+
+def save_sections(sections: list[dict], sections_dir: str, method: str, document_name: str, md_path: str = None) -> str:
+    """
+    Save sections as `<method>_<base name>.sections` (a binary section store, see
+    utils/sectionStore.py) or `.json` when SECTIONS_FORMAT is "json", and return the file path.
+    The content hash of every section is saved next to it in `<method>_<base name>.hashes.json`,
+    which lets a re-ingestion find the sections that changed since the previous split.
+    A sections file of the other format, left by an earlier split, is deleted.
+    When `md_path` is given, sections are stored as offsets into that Markdown file, without
+    their text; `open_sections` reads them back from it.
+    """
+    os.makedirs(sections_dir, exist_ok=True)
+    base_name = normalize_basename(document_name)
+    sections_file = os.path.join(sections_dir, make_sections_name(base_name, method))
+
+    old_hashes = read_json(hashes_path(sections_file), [])
+    if old_hashes:
+        diff = diff_sections(old_hashes, sections)
+        print(
+            f"🔁 Section changes for {base_name}: {len(diff['new'])} new, {len(diff['changed'])} changed, "
+            f"{len(diff['unchanged'])} unchanged, {len(diff['removed'])} removed"
+        )
+
+    if sections_file.endswith(".sections"):
+        write_section_store(sections, sections_file, md_path)
+    else:
+        with open(sections_file, "w", encoding="utf-8") as f:
+            if md_path:
+                json.dump(offsets_payload(sections, md_path), f, ensure_ascii=False)
+            else:
+                json.dump(sections, f, ensure_ascii=False, indent=2)
+    write_json(
+        hashes_path(sections_file),
+        [{"title": section.get("title", "Untitled"), "hash": section_hash(section)} for section in sections],
+    )
+    # A file of the other format holds an earlier split; only the one just written may be found
+    other_format = "json" if sections_file.endswith(".sections") else "binary"
+    outdated = os.path.join(sections_dir, make_sections_name(base_name, method, other_format))
+    if os.path.exists(outdated):
+        os.remove(outdated)
+    return sections_file
 
 class SplitterAgent:
     def __init__(self):
@@ -27,6 +80,7 @@ class SplitterAgent:
         )
 
     @tool
+    @traced(kind="tool")
     def split_sections_by_title(self, document_name: str) -> str:
         """
         Split the document into sections based on Markdown titles.
@@ -50,8 +104,8 @@ class SplitterAgent:
 
         try:
             # Read the file content
-            with open(os.path.join(markdown_dir, document_name), "r", encoding="utf-8") as f:
-                text = f.read()
+            # As stored (line endings, BOM): section offsets are byte offsets into the file
+            text = read_markdown(os.path.join(markdown_dir, document_name))
         except FileNotFoundError:
             
             return f"File {document_name} not found in {markdown_dir}."
@@ -63,31 +117,14 @@ class SplitterAgent:
             
             return "File is empty."
         
-        sections = []
-        lines = text.splitlines()
-        current_section = None
-
-        for line in lines:
-            if line.startswith("## "):
-                if current_section:
-                    sections.append(current_section)
-                current_section = {"title": line[3:].strip(), "content": ""}
-            elif current_section is not None:
-                current_section["content"] += line.rstrip() + "\n"
-        if current_section:
-            sections.append(current_section)
+        sections = split_markdown_by_title(text)
 
         if not sections:
             
             return "No sections found in the document."
 
         try:
-            os.makedirs(sections_dir, exist_ok=True)
-            base_name = normalize_basename(document_name)
-            sections_file = os.path.join(sections_dir, f"title_{base_name}.json")
-            # Save JSON sections to a file
-            with open(sections_file, "w", encoding="utf-8") as f:
-                json.dump(sections, f, ensure_ascii=False, indent=2)
+            sections_file = save_sections(sections, sections_dir, "title", document_name)
         except Exception as e:
             
             return f"Error saving sections to file: {e}"
@@ -96,13 +133,14 @@ class SplitterAgent:
         return "Sections saved to " + sections_file
 
     @tool
+    @traced(kind="tool")
     def split_sections_by_sliding_window(self, document_name: str, window_size: int, overlap: int) -> str:
         """
         Split the text into sections using a sliding window approach with overlap.
 
         Args:
-            window_size (int): The size of the sliding window.
-            overlap (int): The number of characters each window should overlap with the previous one.
+            window_size (int): The size of the sliding window, in tokens.
+            overlap (int): The number of tokens each window should overlap with the previous one.
 
         Returns:
             str: The result of the splitting operation, including the path to the saved sections file.
@@ -119,9 +157,10 @@ class SplitterAgent:
         markdown_dir = os.path.join(base_dir, "markdown")
         sections_dir = os.path.join(base_dir, "sections")
 
+        md_path = os.path.join(markdown_dir, document_name)
         try:
-            with open(os.path.join(markdown_dir, document_name), "r", encoding="utf-8") as f:
-                text = f.read()
+            # As stored (line endings, BOM): window offsets are byte offsets into the file
+            text = read_markdown(md_path)
         except FileNotFoundError:
             
             return f"File {document_name} not found in {markdown_dir}."
@@ -133,25 +172,14 @@ class SplitterAgent:
             
             return "File is empty."
 
-        sections = []
-        step_size = window_size - overlap
-        if step_size <= 0:
+        try:
+            sections = split_markdown_by_window(text, window_size, overlap)
+        except ValueError as e:
             
-            return "Overlap must be smaller than window size."
-
-        for i in range(0, len(text), step_size):
-            section = {
-                "title": f"Section {i // step_size + 1}",
-                "content": text[i:i + window_size]
-            }
-            sections.append(section)
+            return str(e)
 
         try:
-            os.makedirs(sections_dir, exist_ok=True)
-            base_name = normalize_basename(document_name)
-            sections_file = os.path.join(sections_dir, f"window_{base_name}.json")
-            with open(sections_file, "w", encoding="utf-8") as f:
-                json.dump(sections, f, ensure_ascii=False, indent=2)
+            sections_file = save_sections(sections, sections_dir, "window", document_name, md_path)
         except Exception as e:
             
             return f"Error saving sections to file: {e}"
@@ -160,6 +188,7 @@ class SplitterAgent:
         return "Sections saved to " + sections_file
 
     @tool
+    @traced(kind="tool")
     def count_words_and_titles(self, document_name: str) -> tuple[int, int]:
         """
         Count the number of words and titles in the text.
@@ -179,8 +208,7 @@ class SplitterAgent:
         markdown_dir = os.path.join(base_dir, "markdown")
 
         try:
-            with open(os.path.join(markdown_dir, document_name), "r", encoding="utf-8") as f:
-                text = f.read()
+            text = read_markdown(os.path.join(markdown_dir, document_name))
         except FileNotFoundError:
             
             return 0, 0
@@ -192,7 +220,8 @@ class SplitterAgent:
             return 0, 0
 
         word_count = len(text.split())
-        title_count = text.count("## ")
+        # Headings at the levels the title splitter cuts at (SPLITTER_HEADING_LEVELS)
+        title_count = count_headings(text)
         
         return word_count, title_count
 
@@ -200,9 +229,10 @@ class SplitterAgent:
         """
         Allows the agent to be called with a query.
         """
-        return self.agent(query)
+        return call_agent(self.agent, query)
 
 @tool
+@traced(kind="tool")
 def splitter_agent(document_name: str) -> str:
     """
     Tool to split a document into sections based on titles or sliding window.
@@ -1,10 +1,14 @@
 import os
 from strands import Agent, tool
 from utils.novaModel import NOVA_MODEL
-from strands_tools import retrieve
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from memory.AgentsMemory import memory
+from utils.tracing import traced
+from utils.concurrency import bounded_map, structured_output
+from retrieval.Retriever import retrieve_context
+from utils.clauseMerge import merge_clauses, format_sources
+from utils.normalizeNames import normalize_basename
 import json
 
 VALIDATION_PROMPT = """You are a Validator Agent responsible for validating clauses extracted from documents.
@@ -21,17 +25,90 @@ class ValidationResult(BaseModel):
     status: ValidationStatus
     message: str
 
+class ClauseVerdict(BaseModel):
+    index: int = Field(..., description="Number of the clause in the list being validated")
+    status: ValidationStatus
+    message: str
+
+class BatchValidationResult(BaseModel):
+    results: list[ClauseVerdict]
+
+# Batched validation: clauses per LLM call, batches in flight and per-call timeout (seconds)
+VALIDATION_BATCH_SIZE = int(os.getenv("VALIDATION_BATCH_SIZE", "5"))
+VALIDATION_MAX_WORKERS = int(os.getenv("VALIDATION_MAX_WORKERS", "4"))
+VALIDATION_CALL_TIMEOUT = float(os.getenv("VALIDATION_CALL_TIMEOUT", "120"))
+
 class ValidatorAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        model=None,
+        batch_size: int = VALIDATION_BATCH_SIZE,
+        max_workers: int = VALIDATION_MAX_WORKERS,
+        call_timeout: float = VALIDATION_CALL_TIMEOUT,
+    ):
+        self.model = model or NOVA_MODEL
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max_workers
+        self.call_timeout = call_timeout
         self.agent = Agent(
             tools=[
-                retrieve,
                 self.compare
             ],
-            model=NOVA_MODEL
+            model=self.model
+        )
+
+    @traced(kind="agent")
+    def validate_clause(self, clause: dict, context: str) -> dict:
+        """
+        Validate a single clause with one LLM call.
+        """
+        prompt = f"Validate the following clause: {clause['clause_text']} in the context of: {context}"
+        response = structured_output(Agent(model=self.model, callback_handler=None), ValidationResult, prompt)
+        return {
+            "clause": clause['clause_text'],
+            "status": response.status,
+            "message": response.message,
+            "documents": clause.get('documents', [])
+        }
+
+    @traced(kind="agent")
+    def validate_batch(self, clauses: list, context: str) -> list[dict]:
+        """
+        Validate several clauses with a single LLM call, sending the context only once.
+        If the response is malformed (call failure, missing or duplicated clause numbers),
+        the batch falls back to one call per clause.
+        """
+        if len(clauses) == 1:
+            return [self.validate_clause(clauses[0], context)]
+
+        numbered = "\n".join(f"{i}. {clause['clause_text']}" for i, clause in enumerate(clauses, start=1))
+        prompt = (
+            "Validate each of the following numbered clauses in the context given below.\n"
+            "Return exactly one result per clause, using the clause number as index.\n\n"
+            f"Clauses:\n{numbered}\n\n"
+            f"Context: {context}"
         )
+        try:
+            response = structured_output(Agent(model=self.model, callback_handler=None), BatchValidationResult, prompt)
+            verdicts = {verdict.index: verdict for verdict in response.results}
+            if len(response.results) != len(clauses) or set(verdicts) != set(range(1, len(clauses) + 1)):
+                raise ValueError(f"expected {len(clauses)} results, got indexes {sorted(verdicts)}")
+        except Exception as e:
+            print(f"⚠️ Malformed batch validation response ({e}), validating clauses one by one")
+            return [self.validate_clause(clause, context) for clause in clauses]
+
+        return [
+            {
+                "clause": clause['clause_text'],
+                "status": verdicts[i].status,
+                "message": verdicts[i].message,
+                "documents": clause.get('documents', [])
+            }
+            for i, clause in enumerate(clauses, start=1)
+        ]
 
     @tool
+    @traced(kind="tool")
     def compare(self, clauses: list, context: str) -> dict:
         """
         Compare the provided clauses against the context and validate them.
@@ -52,19 +129,20 @@ class ValidatorAgent:
             
             return {"error": "No context provided for validation."}
 
-        # Create a prompt and use LLM to validate each clause
+        # Validate the clauses in batches of `batch_size`, dispatching the batches in parallel
+        batches = [clauses[i:i + self.batch_size] for i in range(0, len(clauses), self.batch_size)]
+        outcomes = bounded_map(
+            lambda batch: self.validate_batch(batch, context),
+            batches,
+            max_workers=self.max_workers,
+            timeout=self.call_timeout,
+        )
         validation_results = []
-        for clause in clauses:
-            prompt = f"Validate the following clause: {clause['clause_text']} in the context of: {context}"
-            response = self.agent.structured_output(
-                ValidationResult,
-                prompt=prompt
-            )
-            validation_results.append({
-                "clause": clause['clause_text'],
-                "status": response.status,
-                "message": response.message
-            })
+        for outcome in outcomes:
+            if not outcome.ok:
+                print(f"⚠️ Error validating batch of {len(outcome.item)} clauses: {outcome.error!r}")
+                continue
+            validation_results.extend(outcome.result)
 
         # Return only the valid results
         validation_results = [result for result in validation_results if result['status'] == ValidationStatus.valid]
@@ -74,8 +152,8 @@ class ValidatorAgent:
 
         answer = "The following clauses are valid and can be used to create the final answer:\n"
         for result in validation_results:
-            
-            answer += f"- {result['clause']}\n"
+            # Each clause names the documents it was found in, so the answer can cite them
+            answer += f"- {result['clause']}{format_sources(result)}\n"
 
         
         memory.set("valid_clauses", answer)
@@ -88,6 +166,7 @@ class ValidatorAgent:
 
 
 @tool
+@traced(kind="tool")
 def validate_agent(context: str) -> str:
     """
     Validate the clauses against the provided context.
@@ -103,37 +182,39 @@ def validate_agent(context: str) -> str:
     """
 
     memory.set("actual_agent", "Validator")
-    clauses = memory.get("top_clauses") or []
-    if not clauses:
-        doc_name = memory.get("main_document")
+    # Clauses of every ingested document, merged and deduplicated, validated in one fan-out
+    clauses_by_document = memory.get("clauses_by_document") or {}
+    if not clauses_by_document:
         base_dir = os.getcwd()
-        doc = os.path.join(base_dir, "clauses", doc_name) if doc_name else None
-        if doc and os.path.exists(doc):
-            print(f"Loading clauses from {doc}")
-            with open(doc, "r") as f:
-                clauses = json.load(f)
+        for doc_name in memory.get("documents") or [memory.get("main_document")]:
+            doc = os.path.join(base_dir, "clauses", f"{normalize_basename(doc_name)}.json") if doc_name else None
+            if doc and os.path.exists(doc):
+                print(f"Loading clauses from {doc}")
+                with open(doc, "r") as f:
+                    clauses_by_document[normalize_basename(doc_name)] = json.load(f)
+    clauses = merge_clauses(clauses_by_document) if clauses_by_document else memory.get("top_clauses") or []
     if not clauses or not isinstance(clauses, list):
         return "No clauses provided for validation."
     if not context:
         return "No context provided for validation."
     
     validator_agent = ValidatorAgent()
-    retrieved_content = validator_agent.agent.tool.retrieve(
-        text=context,
-        knowledgeBaseId=os.getenv("KNOWLEDGE_BASE_ID"),
-        region=os.getenv("AWS_REGION", "us-east-1")
-    )
+    try:
+        retrieved_content = retrieve_context(context)
+    except Exception as e:
+        return f"Error during retrieval: {e}"
 
           
     if not retrieved_content:
         return "No relevant information found for validation."
     
     print("Retrieved content for validation!")
-    # print(retrieved_content['content'][0]['text'])
 
-    result = validator_agent.agent.tool.compare(
+    # Called directly rather than through `agent.tool`, which runs the tool on a thread
+    # outside this request's context (memory session and trace)
+    result = validator_agent.compare(
         clauses=clauses,
-        context=retrieved_content['content'][0]['text']
+        context=retrieved_content
     )
 
     if not result:
@@ -1,10 +1,12 @@
 import os
 from strands import tool
 from memory.AgentsMemory import memory
+from utils.tracing import traced
 from utils.normalizeNames import normalize_basename, make_md_name
 
 
 @tool
+@traced(kind="tool")
 def check_status(document_name: str) -> str:
     """
     Check if the document has already been processed and is available in Markdown format.
@@ -1,15 +1,32 @@
-import os, threading
+import os, threading, uuid
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 from dotenv import load_dotenv
-from agents.Orchestrator import OrchestratorAgent
+load_dotenv()                                  # before the agents read their settings
 from memory.AgentsMemory import memory
+from memory.EventBus import bus
+from utils.converterPool import get_converter_pool
 from streamlit.runtime.scriptrunner import add_script_run_ctx   # 👈 silences the warning
 import graphviz as gv
 
-# ───────── env / agent init
-load_dotenv()
-orchestrator_agent = OrchestratorAgent()
+# ───────── agent imports: once per process, on the first question, so the page renders without waiting for them
+@st.cache_resource
+def get_orchestrator_class():
+    from agents.Orchestrator import OrchestratorAgent   # imports every agent and its tools
+    return OrchestratorAgent
+
+# A strands Agent keeps the conversation and is not thread-safe: one per question.
+# Building it is cheap, the Bedrock model behind it is shared (utils/novaModel.py)
+def new_orchestrator():
+    return get_orchestrator_class()()
+
+# ───────── optional docling warm-up (once per process, in the background)
+@st.cache_resource
+def warm_up_converters():
+    if os.getenv("DOCLING_WARMUP", "0") == "1":
+        threading.Thread(target=get_converter_pool().warm_up, daemon=True).start()
+    return True
+
+warm_up_converters()
 
 # ───────── session defaults
 defaults = {
@@ -17,7 +34,7 @@ defaults = {
     "runner":        None,        # Thread obj
     "answer":        None,        # str
     "pending":       None,        # str
-    "dots":          0            # spinner index
+    "request_id":    None,        # memory session of the last question
 }
 for k, v in defaults.items():
     st.session_state.setdefault(k, v)
@@ -35,40 +52,74 @@ if prompt:
     st.session_state.answer  = None            # clear previous answer
 
 # ───────── background worker
-def worker(user_prompt):
-    try:
-        resp = orchestrator_agent(user_prompt)
-        st.session_state.answer = str(resp)
-    except Exception as e:
-        st.session_state.answer = f"❌ Error: {e}"
-    finally:
-        st.session_state.runner = None         # mark done
+def worker(user_prompt, request_id):
+    with memory.session(request_id):           # own memory, no cross-talk between sessions
+        try:
+            resp = new_orchestrator()(user_prompt)
+            st.session_state.answer = str(resp)
+        except Exception as e:
+            st.session_state.answer = f"❌ Error: {e}"
+        finally:
+            st.session_state.runner = None     # mark done
 
 # launch once when pending
 if st.session_state.pending and st.session_state.runner is None:
-    t = threading.Thread(target=worker, args=(st.session_state.pending,), daemon=True)
+    st.session_state.request_id = uuid.uuid4().hex
+    t = threading.Thread(target=worker, args=(st.session_state.pending, st.session_state.request_id), daemon=True)
     add_script_run_ctx(t)                      # 👈 attach Streamlit ctx
     t.start()
     st.session_state.runner  = t
     st.session_state.pending = None            # consumed
 
+# ───────── monitor diagram: one DOT layout per highlighted agent, built once per process
+AGENTS = ["Orchestrator", "Ingestion", "Validator", "Creator", "Markdown", "Splitter", "Clauses"]
+EDGES = [
+    ("Orchestrator", "Ingestion"),
+    ("Orchestrator", "Validator"),
+    ("Orchestrator", "Creator"),
+    ("Ingestion", "Markdown"),
+    ("Ingestion", "Splitter"),
+    ("Ingestion", "Clauses"),
+]
+
+@st.cache_data
+def monitor_dot(active_agent: str) -> str:
+    dot = gv.Digraph(engine="dot")
+    for name in AGENTS:
+        if name == active_agent:
+            dot.node(name, shape="ellipse", style="filled,bold", fillcolor="#4FC3F7")  # light-blue highlight
+        else:
+            dot.node(name, shape="ellipse")
+    dot.edges(EDGES)
+    return dot.source
+
+def render_monitor(request_id):
+    current_agent = memory.get("actual_agent", session_id=request_id) or "N/A"
+    current_tool  = memory.get("actual_tool", session_id=request_id)  or "N/A"
+    tool_slot.markdown(f"**Current Tool:** `{current_tool}`")
+    graph_slot.graphviz_chart(monitor_dot(current_agent), use_container_width=True)
+    stages = bus.timeline(request_id) if request_id else []
+    if stages:
+        timeline_slot.dataframe(
+            [{"agent": s["agent"], "tool": s["tool"], "seconds": round(s["seconds"], 2)} for s in stages],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+def render_partial(partial):
+    with placeholder.container():
+        st.chat_message("assistant").markdown(f"{partial}▌" if partial else "Thinking…")
+
 # ───────── LEFT column: chat + placeholder
 with col_chat:
     for m in st.session_state.messages:
         with st.chat_message(m["role"]):
             st.markdown(m["content"])
 
-    # dedicated slot that will flip from “Thinking…” to answer
+    # dedicated slot that will flip from “Thinking…” to the streamed answer
     placeholder = st.empty()
 
-    # 1) show dots while thread alive
-    if st.session_state.runner and st.session_state.answer is None:
-        dots = "." * (st.session_state.dots % 4)
-        st.session_state.dots += 1
-        with placeholder.container():
-            st.chat_message("assistant").markdown(f"Thinking{dots}")
-
-    # 2) once answer ready → render & store in history (just once)
+    # once answer ready → render & store in history (just once)
     if st.session_state.answer is not None:
         with placeholder.container():
             st.chat_message("assistant").markdown(st.session_state.answer)
@@ -81,50 +132,25 @@ with col_chat:
 
 # ───────── RIGHT column: live monitor
 with col_monitor:
-    import graphviz as gv          # ← add once at the top of the file
-
     st.subheader("🛠️ Agent Monitor")
-
-    # current status (exactly as before)
-    current_agent = memory.get("actual_agent") or "N/A"
-    current_tool  = memory.get("actual_tool")  or "N/A"
-    st.markdown(f"**Current Tool:** `{current_tool}`")
-
-    # ───── Graphviz diagram (auto-highlights active agent) ─────
-    dot = gv.Digraph(engine="dot")
-
-    # helper to style the active node
-    def add_node(name: str):
-        if name == current_agent:
-            dot.node(name,
-                     shape="ellipse",
-                     style="filled,bold",
-                     fillcolor="#4FC3F7")           # light-blue highlight
-        else:
-            dot.node(name, shape="ellipse")
-
-    # nodes
-    add_node("Orchestrator")
-    add_node("Ingestion")
-    add_node("Validator")
-    add_node("Creator")
-    for sub in ["Markdown", "Splitter", "Clauses"]:
-        add_node(sub)
-
-    # edges (same structure as your sketch)
-    dot.edges(
-        [
-            ("Orchestrator", "Ingestion"),
-            ("Orchestrator", "Validator"),
-            ("Orchestrator", "Creator"),
-            ("Ingestion", "Markdown"),
-            ("Ingestion", "Splitter"),
-            ("Ingestion", "Clauses"),
-        ]
-    )
-
-    # render in Streamlit (auto-refresh already handled by st_autorefresh)
-    st.graphviz_chart(dot, use_container_width=True)
-
-# ───────── auto-refresh every 700 ms
-st_autorefresh(interval=700, limit=None, key="live_refresh")
+    tool_slot     = st.empty()
+    graph_slot    = st.empty()
+    timeline_slot = st.empty()                 # stage durations of the last question
+    render_monitor(st.session_state.request_id)
+
+# ───────── while a question runs, redraw only what changed, when it changes
+runner = st.session_state.runner
+if runner is not None:
+    request_id = st.session_state.request_id
+    version, shown_stage, shown_partial = 0, None, None
+    while runner.is_alive() and st.session_state.answer is None:
+        stage   = (memory.get("actual_agent", session_id=request_id), memory.get("actual_tool", session_id=request_id))
+        partial = memory.get("partial_answer", session_id=request_id) or ""
+        if stage != shown_stage:
+            render_monitor(request_id)
+            shown_stage = stage
+        if partial != shown_partial:
+            render_partial(partial)
+            shown_partial = partial
+        version = bus.wait(request_id, version, timeout=1.0)  # wakes up on agent/tool/answer changes
+    st.rerun()                                 # final answer and complete timeline
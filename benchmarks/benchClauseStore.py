@@ -0,0 +1,96 @@
+"""
+Memory and latency of `ClauseStore` against plain `json.loads` into a list of dicts.
+
+The corpus is `s3_data/index.jsonl` replicated `--scale` times with fresh clause ids.
+From the repository root:
+
+    python -m benchmarks.benchClauseStore --scale 20
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from retrieval.ClauseStore import ClauseStore
+
+INDEX_PATH = os.path.join("s3_data", "index.jsonl")
+
+
+def make_corpus(path: str, scale: int) -> int:
+    with open(INDEX_PATH, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    with open(path, "w", encoding="utf-8") as out:
+        for copy in range(scale):
+            for record in records:
+                record = dict(record, clause_id=str(uuid.uuid5(uuid.NAMESPACE_OID, f"{copy}:{record['clause_id']}")))
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(records) * scale
+
+
+def load_dicts(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def measure(loader, path: str) -> tuple[object, float, float]:
+    """Return (loaded object, load seconds, retained MB)."""
+    gc.collect()
+    start = time.perf_counter()
+    loaded = loader(path)
+    seconds = time.perf_counter() - start
+    del loaded
+
+    gc.collect()
+    tracemalloc.start()
+    loaded = loader(path)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return loaded, seconds, retained / 1e6
+
+
+def time_query(func, repeat: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def run(scale: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "index.jsonl")
+        rows = make_corpus(path, scale)
+
+        dicts, dict_seconds, dict_mb = measure(load_dicts, path)
+        store, store_seconds, store_mb = measure(ClauseStore.from_jsonl, path)
+
+    doc_id = dicts[0]["doc_id"]
+    scan_ms, scan_hits = time_query(
+        lambda: [r for r in dicts if r["doc_id"] == doc_id and r["area"] == "compliance" and r["status"] == "pending"],
+        repeat,
+    )
+    index_ms, index_hits = time_query(
+        lambda: store.query(doc_id=doc_id, area="compliance", status="pending"),
+        repeat,
+    )
+    assert scan_hits == index_hits
+
+    return {
+        "rows": rows,
+        "dicts": {"load_seconds": round(dict_seconds, 3), "retained_mb": round(dict_mb, 1), "query_ms": round(scan_ms, 3)},
+        "clause_store": {"load_seconds": round(store_seconds, 3), "retained_mb": round(store_mb, 1), "query_ms": round(index_ms, 3)},
+        "query_hits": index_hits,
+        "memory_ratio": round(dict_mb / store_mb, 1),
+        "query_speedup": round(scan_ms / index_ms, 1) if index_ms else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10, help="Copies of index.jsonl to load")
+    parser.add_argument("--repeat", type=int, default=20, help="Query repetitions")
+    args = parser.parse_args()
+    print(json.dumps(run(args.scale, args.repeat), indent=2))
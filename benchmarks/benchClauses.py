@@ -0,0 +1,70 @@
+"""
+Wall-clock benchmark of `ClausesAgent.analyze_sections`: sequential, concurrent, and
+concurrent with sections packed into token-budgeted calls.
+
+Runs against `StubModel`, so no AWS access is needed. From the repository root:
+
+    python -m benchmarks.benchClauses --sections 60 --latency 0.5 --workers 8 --budget 3000
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from agents.Clauses import ClausesAgent, CLAUSES_TOKEN_BUDGET
+from benchmarks.stubModel import StubModel
+
+
+def make_sections(count: int) -> list[dict]:
+    # Mostly short sections with a few long ones, like the title split of a policy document
+    return [
+        {"title": f"Section {i + 1}", "content": f"Clause text of section {i + 1}. " * (5 + (i * 37) % 60 + (300 if i % 20 == 19 else 0))}
+        for i in range(count)
+    ]
+
+
+def run(sections: int, latency: float, workers: int, budget: int = CLAUSES_TOKEN_BUDGET) -> dict:
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "sections"))
+        with open(os.path.join(workdir, "sections", "title_bench.json"), "w", encoding="utf-8") as f:
+            json.dump(make_sections(sections), f)
+
+        os.chdir(workdir)
+        try:
+            for label, max_workers, token_budget in (("sequential", 1, 0), ("concurrent", workers, 0), ("packed", workers, budget)):
+                # Start cold: previously extracted clauses would be carried over
+                shutil.rmtree(os.path.join(workdir, "clauses"), ignore_errors=True)
+                model = StubModel(latency=latency)
+                agent = ClausesAgent(model=model, max_workers=max_workers, token_budget=token_budget)
+                start = time.perf_counter()
+                output = agent.analyze_sections("bench", "title_bench.json")
+                elapsed = time.perf_counter() - start
+                results[label] = {
+                    "workers": max_workers,
+                    "token_budget": token_budget,
+                    "seconds": round(elapsed, 3),
+                    "llm_calls": model.calls,
+                    "clauses": len(output["clauses"]),
+                    "failed_sections": len(output.get("failed_sections", [])),
+                }
+        finally:
+            os.chdir(cwd)
+
+    results["speedup"] = round(results["sequential"]["seconds"] / results["concurrent"]["seconds"], 2)
+    results["packed_speedup"] = round(results["sequential"]["seconds"] / results["packed"]["seconds"], 2)
+    results["llm_calls_reduction"] = round(results["concurrent"]["llm_calls"] / results["packed"]["llm_calls"], 2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM latency per call (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=CLAUSES_TOKEN_BUDGET, help="Token budget per packed call")
+    args = parser.parse_args()
+    print(json.dumps(run(args.sections, args.latency, args.workers, args.budget), indent=2))
@@ -0,0 +1,117 @@
+"""
+Cold import time of the entry points, from `python -X importtime` in a fresh interpreter.
+
+Reports the cumulative import time of each module (best of --runs), the slowest
+imports by self time, and any heavy dependency (docling, torch, faiss, numpy,
+strands_tools) pulled in at import time; those should only load on first use.
+From the repository root:
+
+    python -m benchmarks.benchImportTime --save imports.json
+    python -m benchmarks.benchImportTime --baseline imports.json --tolerance 0.25
+
+The exit status is 1 when an entry point fails to import, when a heavy dependency is
+imported, or, with --baseline, when an entry point got slower by more than --tolerance.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = ("agents.Orchestrator", "pipeline.Planner", "utils.novaModel", "app")
+HEAVY_MODULES = ("docling", "torch", "faiss", "numpy", "strands_tools")
+
+
+def import_profile(module: str) -> list[dict]:
+    """One entry per imported module: name, self and cumulative microseconds, nesting depth."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        last_line = (completed.stderr.strip().splitlines() or ["import failed"])[-1]
+        raise ImportError(last_line)
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return entries
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    profiles = [import_profile(module) for _ in range(runs)]
+    best = min(profiles, key=lambda entries: next(e["cumulative_us"] for e in entries if e["module"] == module))
+    total = next(e["cumulative_us"] for e in best if e["module"] == module)
+    loaded = {e["module"] for e in best}
+    return {
+        "ms": round(total / 1000, 1),
+        "modules": len(best),
+        "heavy": sorted({name.split(".")[0] for name in loaded if name.split(".")[0] in HEAVY_MODULES}),
+        "slowest_self_ms": [
+            {"module": e["module"], "ms": round(e["self_us"] / 1000, 1)}
+            for e in sorted(best, key=lambda e: e["self_us"], reverse=True)[:top]
+        ],
+        "slowest_first_party_ms": [
+            {"module": e["module"], "ms": round(e["cumulative_us"] / 1000, 1)}
+            for e in sorted(best, key=lambda e: e["cumulative_us"], reverse=True)
+            if e["module"].split(".")[0] in ("agents", "utils", "pipeline", "retrieval", "memory")
+        ][:top],
+    }
+
+
+def run(modules: tuple = MODULES, runs: int = 3, top: int = 8) -> dict:
+    results = {}
+    for module in modules:
+        try:
+            results[module] = measure(module, runs, top)
+        except ImportError as e:
+            results[module] = {"error": str(e)}
+    return results
+
+
+def problems(results: dict, baseline: dict = None, tolerance: float = 0.25) -> list[str]:
+    found = []
+    for module, result in results.items():
+        if result.get("error"):
+            found.append(f"{module} failed to import: {result['error']}")
+            continue
+        if result.get("heavy"):
+            found.append(f"{module} imports {', '.join(result['heavy'])} at import time")
+        before = (baseline or {}).get(module, {}).get("ms")
+        if before and result.get("ms") and result["ms"] > before * (1 + tolerance):
+            found.append(f"{module}: {before} ms -> {result['ms']} ms (+{100 * (result['ms'] / before - 1):.0f}%)")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports listed per module")
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed growth over the baseline")
+    args = parser.parse_args()
+
+    results = run(tuple(args.modules), args.runs, args.top)
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    found = problems(results, baseline, args.tolerance)
+    for line in found:
+        print(f"❌ {line}")
+    if found:
+        sys.exit(1)
+    print("✅ No heavy import and no regression")
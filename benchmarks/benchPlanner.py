@@ -0,0 +1,110 @@
+"""
+LLM calls and latency of the deterministic fast path versus the agentic orchestrator.
+
+Both modes answer the same question over the `Politica_Ambiental_2024` fixtures
+(markdown/ and sections/ already present, so nothing is downloaded or converted),
+with `StubModel` in place of every Bedrock model, the local clause index in place
+of the Knowledge Base and a `LocalS3Client` bucket holding the fixture PDF in place
+of S3. In agentic mode the stub routes through every tool, skipping only the S3
+download/convert tools. The run fails (exit 1) when the fast path fell back to the
+agentic orchestrator, since its numbers would then measure the agentic path twice.
+From the repository root:
+
+    python -m benchmarks.benchPlanner --latency 0.3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BUCKET = "stub-bucket"
+DOCUMENT = "Politica_Ambiental_2024"
+QUESTION = "Qual é a política ambiental da Capgemini?"
+MODEL_MODULES = (
+    "agents.Orchestrator", "agents.Ingestion", "agents.Markdown", "agents.Splitter",
+    "agents.Clauses", "agents.Validator", "agents.Creator", "utils.novaModel",
+)
+
+
+def make_workdir(repo_dir: str, workdir: str) -> None:
+    for folder, name in (("markdown", f"{DOCUMENT}.md"), ("sections", f"title_{DOCUMENT}.json")):
+        os.makedirs(os.path.join(workdir, folder), exist_ok=True)
+        shutil.copy(os.path.join(repo_dir, folder, name), os.path.join(workdir, folder, name))
+
+
+def build_index(repo_dir: str, index_dir: str) -> None:
+    from retrieval.ClauseIndex import ClauseIndex
+
+    with open(os.path.join(repo_dir, "clauses", f"{DOCUMENT}.json"), "r", encoding="utf-8") as f:
+        clauses = json.load(f)
+    clause_index = ClauseIndex()
+    clause_index.add(
+        {**clause, "clause_id": f"fixture-{i}", "doc_name": f"raw/{DOCUMENT}.pdf"}
+        for i, clause in enumerate(clauses)
+    )
+    clause_index.save(index_dir)
+
+
+def run(latency: float) -> dict:
+    repo_dir = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = os.path.join(tmp, "vector_index")
+        os.environ["RETRIEVAL_ENGINE"] = "local"
+        os.environ["CLAUSE_INDEX_DIR"] = index_dir
+        os.environ["S3_BUCKET_NAME"] = BUCKET
+        build_index(repo_dir, index_dir)
+
+        import importlib
+        from agents.Orchestrator import OrchestratorAgent
+        from benchmarks.localS3 import LocalS3Client, seed_bucket, use_local_s3
+        from benchmarks.stubModel import StubModel
+        modules = [importlib.import_module(name) for name in MODEL_MODULES]
+        s3 = LocalS3Client(os.path.join(tmp, "s3"))
+        seed_bucket(s3, BUCKET, [os.path.join(repo_dir, "tmp", f"{DOCUMENT}.pdf")])
+
+        for mode in ("agentic", "fast"):
+            workdir = os.path.join(tmp, mode)
+            make_workdir(repo_dir, workdir)
+            model = StubModel(
+                latency=latency,
+                tool_inputs={
+                    "document_name": f"{DOCUMENT}.pdf", "bucket": BUCKET, "bucket_name": BUCKET,
+                    "text": QUESTION, "context": QUESTION, "instruction": QUESTION,
+                    "number_of_results": 5, "score": 0.0,
+                },
+                skip_tools={"download_pdf_from_s3", "convert_pdf_save_md"},
+            )
+            for module in modules:
+                module.NOVA_MODEL = model
+
+            os.chdir(workdir)
+            try:
+                orchestrator = OrchestratorAgent(mode=mode)
+                with use_local_s3(s3):
+                    start = time.perf_counter()
+                    answer = orchestrator(QUESTION)
+                    elapsed = time.perf_counter() - start
+            finally:
+                os.chdir(repo_dir)
+            results[mode] = {"llm_calls": model.calls, "seconds": round(elapsed, 3), "answer": str(answer)[:80]}
+
+    results["fast_path_error"] = orchestrator.fast_path_error
+    if orchestrator.fast_path_error is None:
+        results["llm_calls_saved"] = results["agentic"]["llm_calls"] - results["fast"]["llm_calls"]
+        results["speedup"] = round(results["agentic"]["seconds"] / results["fast"]["seconds"], 2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM latency per call (s)")
+    args = parser.parse_args()
+    results = run(args.latency)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if results["fast_path_error"]:
+        print(f"❌ The fast path fell back to the agentic orchestrator: {results['fast_path_error']}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""
+Wall-clock of ingesting several documents one after another versus on the stage scheduler.
+
+Stages are replaced by sleeps with the given per-stage latencies, so only the
+scheduling is measured. From the repository root:
+
+    python -m benchmarks.benchScheduler --documents 3 --download 0.5 --convert 2 --split 0.05 --extract 1.5
+"""
+import argparse
+import json
+import time
+
+from pipeline.BatchIngestion import STAGES, new_job, run_stage
+from pipeline.Scheduler import STAGE_WORKERS, Stage, StageScheduler
+
+
+def sleeper(seconds: float):
+    def stage(job: dict) -> None:
+        time.sleep(seconds)
+    return stage
+
+
+def run(documents: int, latencies: dict) -> dict:
+    keys = [f"raw/bench_{i}.pdf" for i in range(documents)]
+
+    start = time.perf_counter()
+    for key in keys:
+        job = new_job("stub-bucket", key)
+        for name in STAGES:
+            run_stage(job, name, sleeper(latencies[name]))
+    sequential = time.perf_counter() - start
+
+    stages = [
+        Stage(name, sleeper(latencies[name]), STAGE_WORKERS[name], after=(STAGES[i - 1],) if i else ())
+        for i, name in enumerate(STAGES)
+    ]
+    scheduler = StageScheduler(stages)
+    scheduler.run([new_job("stub-bucket", key) for key in keys])
+    stats = scheduler.stats()
+
+    return {
+        "documents": documents,
+        "slowest_document_seconds": round(sum(latencies.values()), 3),
+        "sequential_seconds": round(sequential, 3),
+        "scheduled_seconds": stats["wall_seconds"],
+        "speedup": round(sequential / stats["wall_seconds"], 2),
+        "stages": stats["stages"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=3)
+    for name, default in (("download", 0.5), ("convert", 2.0), ("split", 0.05), ("extract", 1.5)):
+        parser.add_argument(f"--{name}", type=float, default=default, help=f"Seconds per document in {name}")
+    args = parser.parse_args()
+    latencies = {name: getattr(args, name) for name in STAGES}
+    print(json.dumps(run(args.documents, latencies), indent=2))
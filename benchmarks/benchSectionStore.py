@@ -0,0 +1,107 @@
+"""
+Load time and peak RSS of a binary section store (utils/sectionStore.py) against the
+pretty-printed JSON section file it replaces.
+
+The corpus is the title sections of the fixtures in sections/ replicated `--scale`
+times. Each measurement runs in a fresh interpreter, so peak RSS is not shared
+between them: reading every section, and reading `--samples` random sections.
+From the repository root:
+
+    python -m benchmarks.benchSectionStore --scale 2000
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("json_all", "store_all", "json_random", "store_random")
+
+
+def make_corpus(workdir: str, scale: int) -> tuple[str, str]:
+    from utils.sectionStore import write_section_store
+
+    sections = []
+    for path in sorted(glob.glob(os.path.join("sections", "title_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            sections.extend(json.load(f))
+    corpus = [
+        {"title": f"{section['title']} ({copy})", "content": section["content"]}
+        for copy in range(scale)
+        for section in sections
+    ]
+    json_path = os.path.join(workdir, "title_corpus.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+    store_path = write_section_store(corpus, os.path.join(workdir, "title_corpus.sections"))
+    return json_path, store_path
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def measure(mode: str, path: str, samples: int) -> dict:
+    """Run in the child process: load `path` the way `mode` says and report time and RSS."""
+    from utils.sectionStore import SectionStore
+
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode.startswith("json"):
+        with open(path, "r", encoding="utf-8") as f:
+            sections = json.load(f)
+        opened = time.perf_counter() - start
+        indexes = range(len(sections)) if mode == "json_all" else random.Random(0).sample(range(len(sections)), samples)
+        characters = sum(len(sections[i]["content"]) for i in indexes)
+    else:
+        store = SectionStore(path)
+        opened = time.perf_counter() - start
+        indexes = range(len(store)) if mode == "store_all" else random.Random(0).sample(range(len(store)), samples)
+        characters = sum(len(store.content(i)) for i in indexes)
+        store.close()
+    return {
+        "open_seconds": round(opened, 4),
+        "total_seconds": round(time.perf_counter() - start, 4),
+        "sections_read": len(indexes),
+        "characters": characters,
+        "peak_rss_growth_mb": round(_peak_rss_mb() - before, 1),
+    }
+
+
+def run(scale: int, samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        json_path, store_path = make_corpus(workdir, scale)
+        results = {
+            "json_mb": round(os.path.getsize(json_path) / 1e6, 1),
+            "store_mb": round(os.path.getsize(store_path) / 1e6, 1),
+        }
+        for mode in MODES:
+            path = json_path if mode.startswith("json") else store_path
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.benchSectionStore", "--child", mode, path, "--samples", str(samples)],
+                capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(completed.stdout)
+    results["open_speedup"] = round(results["json_all"]["open_seconds"] / max(results["store_all"]["open_seconds"], 1e-6), 1)
+    results["random_speedup"] = round(results["json_random"]["total_seconds"] / max(results["store_random"]["total_seconds"], 1e-6), 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=2000, help="Copies of the fixture sections")
+    parser.add_argument("--samples", type=int, default=100, help="Sections read in the random modes")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], args.child[1], args.samples)))
+    else:
+        print(json.dumps(run(args.scale, args.samples), indent=2))
@@ -0,0 +1,85 @@
+"""
+Title splitting of a large Markdown document: the previous line-by-line splitter, which
+grows each section with `content += line`, against the one-pass offset splitter
+(utils/markdownSections.py), in memory and streamed to JSONL from a memory-mapped file.
+
+The document has `--pages` pages of ~50 lines in `--sections` sections, so sections
+are long, as in policies with few headings. From the repository root:
+
+    python -m benchmarks.benchSplitter --pages 500 --sections 20
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from utils.markdownSections import split_sections, write_sections_jsonl
+
+LINES_PER_PAGE = 50
+
+
+def legacy_split(text: str) -> list[dict]:
+    """The splitter as it was: `## ` headings only, text before the first heading dropped."""
+    sections = []
+    current_section = None
+    for line in text.splitlines():
+        if line.startswith("## "):
+            if current_section:
+                sections.append(current_section)
+            current_section = {"title": line[3:].strip(), "content": ""}
+        elif current_section is not None:
+            current_section["content"] += line.rstrip() + "\n"
+    if current_section:
+        sections.append(current_section)
+    return sections
+
+
+def make_document(pages: int, sections: int) -> str:
+    lines_per_section = max(1, pages * LINES_PER_PAGE // sections)
+    parts = ["Documento de referência, versão 3.\n"]
+    for i in range(sections):
+        parts.append(f"## Seção {i + 1}\n")
+        parts.append("".join(f"Linha {j} da seção {i + 1}: a empresa deve cumprir a política aplicável.\n" for j in range(lines_per_section)))
+    return "".join(parts)
+
+
+def measure(func, *args) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, round(elapsed, 3), round(peak / 1e6, 1)
+
+
+def run(pages: int, sections: int) -> dict:
+    text = make_document(pages, sections)
+    results = {"document_mb": round(len(text.encode("utf-8")) / 1e6, 1), "pages": pages, "sections": sections}
+
+    legacy, seconds, peak = measure(legacy_split, text)
+    results["legacy"] = {"seconds": seconds, "peak_mb": peak, "sections": len(legacy)}
+
+    one_pass, seconds, peak = measure(split_sections, text, (2,))
+    results["one_pass"] = {"seconds": seconds, "peak_mb": peak, "sections": len(one_pass)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        md_path = os.path.join(tmp, "document.md")
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        del text, legacy, one_pass
+        count, seconds, peak = measure(write_sections_jsonl, md_path, os.path.join(tmp, "sections.jsonl"), (2,))
+        results["streamed_jsonl"] = {"seconds": seconds, "peak_mb": peak, "sections": count}
+
+    results["speedup"] = round(results["legacy"]["seconds"] / max(results["one_pass"]["seconds"], 1e-6), 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--sections", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.sections), indent=2))
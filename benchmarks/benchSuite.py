@@ -0,0 +1,355 @@
+"""
+Offline benchmark suite: throughput and latency of every pipeline step on the fixtures.
+
+Runs without network access or AWS credentials. `StubModel` replaces every Bedrock
+model, `LocalS3Client` serves the PDFs in tmp/ as the S3 bucket, and conversion uses
+the Markdown fixtures of those PDFs (or docling itself with --docling, which needs
+the layout models). Everything is written to a temporary working directory.
+
+    conversion   download + PDF -> Markdown of tmp/*.pdf
+    splitting    title and sliding-window split of markdown/*.md
+    extraction   ClausesAgent.analyze_sections over sections/*.json
+    validation   ValidatorAgent.compare over the clauses in clauses/*.json
+    orchestrator full question, fast and agentic, starting from an empty workdir
+
+From the repository root:
+
+    python -m benchmarks.benchSuite --latency 0.05 --save results.json
+    python -m benchmarks.benchSuite --latency 0.05 --baseline results.json --tolerance 0.25
+
+With --baseline, the exit status is 1 when a step's median latency regressed by more
+than --tolerance, so the suite can gate CI.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+BUCKET = "bench-bucket"
+QUESTION = "Qual é a política ambiental da Capgemini?"
+MODEL_MODULES = (
+    "agents.Orchestrator", "agents.Ingestion", "agents.Markdown", "agents.Splitter",
+    "agents.Clauses", "agents.Validator", "agents.Creator", "utils.novaModel",
+)
+STEPS = ("conversion", "splitting", "extraction", "validation", "orchestrator")
+
+
+class FixtureConverterPool:
+    """
+    Stand-in for `utils.converterPool.ConverterPool` that answers with the Markdown
+    fixture of the PDF (markdown/<name>.md), after `seconds_per_page` per estimated page.
+    PDFs without a fixture get one `## Page n` section of filler text per page.
+    """
+
+    BYTES_PER_PAGE = 60_000
+
+    def __init__(self, markdown_dir: str, seconds_per_page: float = 0.0):
+        self.markdown_dir = markdown_dir
+        self.seconds_per_page = seconds_per_page
+        self.conversions = 0
+
+    def convert(self, source):
+        path = str(source)
+        pages = max(1, os.path.getsize(path) // self.BYTES_PER_PAGE)
+        time.sleep(pages * self.seconds_per_page)
+        fixture = os.path.join(self.markdown_dir, os.path.splitext(os.path.basename(path))[0] + ".md")
+        if os.path.exists(fixture):
+            with open(fixture, "r", encoding="utf-8") as f:
+                markdown = f.read()
+        else:
+            markdown = "\n".join(f"## Page {n}\n\n" + "Policy text. " * 200 for n in range(1, pages + 1))
+        self.conversions += 1
+        document = SimpleNamespace(export_to_markdown=lambda: markdown)
+        return SimpleNamespace(document=document, pages=[None] * pages)
+
+
+def responder(output_model, text: str):
+    """`fake_instance`, except batched validations get one verdict per numbered clause."""
+    from benchmarks.stubModel import fake_instance
+
+    if output_model.__name__ == "BatchValidationResult":
+        clauses = text.split("Clauses:", 1)[-1].split("Context:", 1)[0]
+        count = sum(1 for line in clauses.splitlines() if line.split(".", 1)[0].strip().isdigit())
+        return output_model(results=[{"index": i, "status": "valid", "message": "stub"} for i in range(1, count + 1)])
+    return fake_instance(output_model, text)
+
+
+def latency_stats(samples: list[float], wall_seconds: float, items: Optional[int] = None) -> dict:
+    """Median, p95 and max latency in ms, and items per second over the wall time."""
+    ordered = sorted(samples)
+    count = items if items is not None else len(samples)
+    return {
+        "items": count,
+        "wall_seconds": round(wall_seconds, 3),
+        "items_per_second": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(1000 * statistics.median(ordered), 2) if ordered else 0.0,
+        "p95_ms": round(1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2) if ordered else 0.0,
+        "max_ms": round(1000 * ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def timed(func: Callable, items: list, repeat: int = 1) -> tuple[list, list[float], float]:
+    """Call `func` on each item `repeat` times; return the last results, per-call seconds and wall time."""
+    samples, results = [], []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = []
+        for item in items:
+            call_start = time.perf_counter()
+            results.append(func(item))
+            samples.append(time.perf_counter() - call_start)
+    return results, samples, time.perf_counter() - start
+
+
+def llm_usage(model, before: tuple) -> dict:
+    calls, input_tokens, output_tokens = before
+    return {
+        "llm_calls": model.calls - calls,
+        "input_tokens": model.input_tokens - input_tokens,
+        "output_tokens": model.total_output_tokens - output_tokens,
+    }
+
+
+def bench_conversion(repo_dir: str, workdir: str, s3, docling: bool, page_latency: float) -> dict:
+    from agents.Markdown import download_pdf, convert_pdf_to_markdown
+    from utils import conversionCache, converterPool
+    from benchmarks.localS3 import seed_bucket
+
+    keys = seed_bucket(s3, BUCKET, sorted(glob.glob(os.path.join(repo_dir, "tmp", "*.pdf"))))
+    # A private, empty conversion cache, so every PDF is really converted
+    conversionCache._default_cache = conversionCache.ConversionCache(os.path.join(workdir, ".cache", "markdown"))
+    if not docling:
+        converterPool._default_pool = FixtureConverterPool(os.path.join(repo_dir, "markdown"), page_latency)
+
+    def convert(key: str) -> int:
+        local_path, _ = download_pdf(s3, BUCKET, key, os.path.join(workdir, "tmp"))
+        md_path, _ = convert_pdf_to_markdown(local_path, os.path.basename(local_path), os.path.join(workdir, "markdown"))
+        return os.path.getsize(local_path)
+
+    sizes, samples, wall = timed(convert, keys)
+    result = latency_stats(samples, wall)
+    result["mb_per_second"] = round(sum(sizes) / 1e6 / wall, 2) if wall else 0.0
+    result["converter"] = "docling" if docling else "fixture"
+    return result
+
+
+def bench_splitting(repo_dir: str, repeat: int) -> dict:
+    from agents.Splitter import split_markdown_by_title, split_markdown_by_window
+    from pipeline.BatchIngestion import WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS
+
+    texts = []
+    for path in sorted(glob.glob(os.path.join(repo_dir, "markdown", "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+
+    def split(text: str) -> int:
+        return len(split_markdown_by_title(text)) + len(split_markdown_by_window(text, WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS))
+
+    counts, samples, wall = timed(split, texts, repeat)
+    result = latency_stats(samples, wall)
+    result["sections"] = sum(counts)
+    result["mb_per_second"] = round(repeat * sum(len(t.encode("utf-8")) for t in texts) / 1e6 / wall, 2) if wall else 0.0
+    return result
+
+
+def bench_extraction(repo_dir: str, workdir: str, model) -> dict:
+    from agents.Clauses import ClausesAgent
+
+    sections_dir = os.path.join(workdir, "extraction", "sections")
+    os.makedirs(sections_dir)
+    files = [os.path.basename(p) for p in sorted(glob.glob(os.path.join(repo_dir, "sections", "*.json")))]
+    for name in files:
+        shutil.copy(os.path.join(repo_dir, "sections", name), sections_dir)
+    # Window files are offsets into the Markdown
+    shutil.copytree(os.path.join(repo_dir, "markdown"), os.path.join(workdir, "extraction", "markdown"))
+
+    def extract(name: str) -> int:
+        base = name.split("_", 1)[1].rsplit(".", 1)[0]
+        # Start cold: clauses of a previous file of the same document would be carried over
+        shutil.rmtree(os.path.join(workdir, "extraction", "clauses"), ignore_errors=True)
+        return len(ClausesAgent(model=model).analyze_sections(base, name, QUESTION)["clauses"])
+
+    before = (model.calls, model.input_tokens, model.total_output_tokens)
+    cwd = os.getcwd()
+    os.chdir(os.path.join(workdir, "extraction"))
+    try:
+        counts, samples, wall = timed(extract, files)
+    finally:
+        os.chdir(cwd)
+    return {**latency_stats(samples, wall), "clauses": sum(counts), **llm_usage(model, before)}
+
+
+def bench_validation(repo_dir: str, model) -> dict:
+    from agents.Validator import ValidatorAgent
+
+    batches = []
+    for path in sorted(glob.glob(os.path.join(repo_dir, "clauses", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            batches.append(json.load(f))
+
+    before = (model.calls, model.input_tokens, model.total_output_tokens)
+    validator = ValidatorAgent(model=model)
+    results, samples, wall = timed(lambda clauses: validator.compare(clauses, QUESTION), batches)
+    return {
+        **latency_stats(samples, wall),
+        "clauses": sum(len(batch) for batch in batches),
+        "clauses_per_second": round(sum(len(batch) for batch in batches) / wall, 2) if wall else 0.0,
+        **llm_usage(model, before),
+    }
+
+
+def bench_orchestrator(repo_dir: str, workdir: str, model) -> dict:
+    from agents.Orchestrator import OrchestratorAgent
+
+    results = {}
+    for mode in ("fast", "agentic"):
+        mode_dir = os.path.join(workdir, "orchestrator", mode)
+        os.makedirs(mode_dir)
+        before = (model.calls, model.input_tokens, model.total_output_tokens)
+        cwd = os.getcwd()
+        os.chdir(mode_dir)
+        try:
+            _, samples, wall = timed(lambda question: OrchestratorAgent(mode=mode)(question), [QUESTION])
+        finally:
+            os.chdir(cwd)
+        results[mode] = {**latency_stats(samples, wall), **llm_usage(model, before)}
+    return results
+
+
+def build_index(repo_dir: str, index_dir: str) -> None:
+    from retrieval.ClauseIndex import ClauseIndex
+
+    clause_index = ClauseIndex()
+    for path in sorted(glob.glob(os.path.join(repo_dir, "clauses", "*.json"))):
+        document = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            clauses = json.load(f)
+        clause_index.add(
+            {**clause, "clause_id": f"{document}-{i}", "doc_name": f"raw/{document}.pdf"}
+            for i, clause in enumerate(clauses)
+        )
+    clause_index.save(index_dir)
+
+
+def run(
+    latency: float,
+    seconds_per_token: float = 0.0,
+    output_tokens: Optional[int] = None,
+    page_latency: float = 0.0,
+    s3_latency: float = 0.0,
+    repeat: int = 20,
+    docling: bool = False,
+    steps: tuple = STEPS,
+) -> dict:
+    repo_dir = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Settings read at import time by the modules under test
+        os.environ["RETRIEVAL_ENGINE"] = "local"
+        os.environ["CLAUSE_INDEX_DIR"] = os.path.join(workdir, "vector_index")
+        os.environ["S3_BUCKET_NAME"] = BUCKET
+        os.environ.setdefault("TRACE_EXPORT_PATH", os.path.join(workdir, "traces", "spans.jsonl"))
+        build_index(repo_dir, os.environ["CLAUSE_INDEX_DIR"])
+
+        import importlib
+        from benchmarks.localS3 import LocalS3Client, use_local_s3
+        from benchmarks.stubModel import StubModel
+
+        model = StubModel(
+            latency=latency,
+            output_tokens=output_tokens,
+            seconds_per_token=seconds_per_token,
+            responder=responder,
+            tool_inputs={
+                "bucket": BUCKET, "bucket_name": BUCKET, "document_name": "Politica_Ambiental_2024.pdf",
+                "text": QUESTION, "context": QUESTION, "instruction": QUESTION,
+                "number_of_results": 5, "score": 0.0,
+            },
+        )
+        for name in MODEL_MODULES:
+            importlib.import_module(name).NOVA_MODEL = model
+
+        s3 = LocalS3Client(os.path.join(workdir, "s3"), latency=s3_latency)
+        with use_local_s3(s3):
+            if "conversion" in steps:
+                results["conversion"] = bench_conversion(repo_dir, workdir, s3, docling, page_latency)
+            if "splitting" in steps:
+                results["splitting"] = bench_splitting(repo_dir, repeat)
+            if "extraction" in steps:
+                results["extraction"] = bench_extraction(repo_dir, workdir, model)
+            if "validation" in steps:
+                results["validation"] = bench_validation(repo_dir, model)
+            if "orchestrator" in steps:
+                if "conversion" not in steps:
+                    bench_conversion(repo_dir, os.path.join(workdir, "seed"), s3, docling, page_latency)
+                results["orchestrator"] = bench_orchestrator(repo_dir, workdir, model)
+        results["s3"] = {"requests": s3.requests, "bytes_downloaded": s3.bytes_downloaded}
+    results["settings"] = {
+        "latency": latency, "seconds_per_token": seconds_per_token, "output_tokens": output_tokens,
+        "page_latency": page_latency, "s3_latency": s3_latency, "repeat": repeat, "docling": docling,
+    }
+    return results
+
+
+def _medians(results: dict, prefix: str = "") -> dict:
+    medians = {}
+    for name, value in results.items():
+        if not isinstance(value, dict) or name == "settings":
+            continue
+        if "p50_ms" in value:
+            medians[prefix + name] = value["p50_ms"]
+        else:
+            medians.update(_medians(value, f"{prefix}{name}."))
+    return medians
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Steps whose median latency grew by more than `tolerance` (a fraction) over the baseline."""
+    current, previous = _medians(results), _medians(baseline)
+    regressions = []
+    for step, before in previous.items():
+        after = current.get(step)
+        if after is not None and before > 0 and after > before * (1 + tolerance):
+            regressions.append(f"{step}: p50 {before:.2f} ms -> {after:.2f} ms (+{100 * (after / before - 1):.0f}%)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency per call (s)")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0, help="Stub LLM latency per output token (s)")
+    parser.add_argument("--output-tokens", type=int, default=None, help="Output tokens reported per LLM call")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Fixture converter latency per page (s)")
+    parser.add_argument("--s3-latency", type=float, default=0.0, help="Local S3 latency per request (s)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions of the splitting step")
+    parser.add_argument("--docling", action="store_true", help="Convert with docling instead of the fixtures")
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=list(STEPS))
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 growth over the baseline")
+    args = parser.parse_args()
+
+    results = run(
+        args.latency, args.seconds_per_token, args.output_tokens, args.page_latency,
+        args.s3_latency, args.repeat, args.docling, tuple(args.steps),
+    )
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regression against the baseline")
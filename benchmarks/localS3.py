@@ -0,0 +1,158 @@
+"""
+Filesystem stand-in for the S3 client, so ingestion can be benchmarked offline.
+
+Objects live under `root/<bucket>/<key>`. Only the calls made by the pipeline are
+implemented: `head_object` (with `IfNoneMatch`), `download_file`, `get_object`,
+`put_object`, `upload_file` and the `list_objects_v2` paginator. `use_local_s3`
+registers the stand-in as the shared client returned by `utils.awsClients.get_client`.
+"""
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from utils import awsClients
+
+
+def _error(code: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class LocalS3Client:
+    """
+    Args:
+        root (str): Directory holding one sub-directory per bucket.
+        latency (float): Seconds added to every request, like a network round trip.
+        bytes_per_second (float | None): Simulated download bandwidth; None is unlimited.
+    """
+
+    def __init__(self, root: str, latency: float = 0.0, bytes_per_second: Optional[float] = None):
+        self.root = root
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.requests = 0
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _request(self, size: int = 0) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_downloaded += size
+        delay = self.latency + (size / self.bytes_per_second if self.bytes_per_second else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    @staticmethod
+    def _etag(path: str) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return f'"{digest.hexdigest()}"'
+
+    def _existing(self, bucket: str, key: str, operation: str) -> str:
+        path = self._path(bucket, key)
+        if not os.path.isfile(path):
+            raise _error("404", operation)
+        return path
+
+    def head_object(self, Bucket: str, Key: str, IfNoneMatch: Optional[str] = None, **kwargs) -> dict:
+        self._request()
+        path = self._existing(Bucket, Key, "HeadObject")
+        etag = self._etag(path)
+        if IfNoneMatch is not None and IfNoneMatch.strip('"') == etag.strip('"'):
+            raise _error("304", "HeadObject")
+        stat = os.stat(path)
+        return {
+            "ETag": etag,
+            "ContentLength": stat.st_size,
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        }
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, Config=None, **kwargs) -> None:
+        path = self._existing(Bucket, Key, "GetObject")
+        self._request(os.path.getsize(path))
+        shutil.copyfile(path, Filename)
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        path = self._existing(Bucket, Key, "GetObject")
+        with open(path, "rb") as f:
+            data = f.read()
+        self._request(len(data))
+        return {"Body": io.BytesIO(data), "ContentLength": len(data), "ETag": self._etag(path)}
+
+    def put_object(self, Bucket: str, Key: str, Body=b"", **kwargs) -> dict:
+        self._request()
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(Body.encode("utf-8") if isinstance(Body, str) else Body if isinstance(Body, bytes) else Body.read())
+        return {"ETag": self._etag(path)}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs) -> None:
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket=Bucket, Key=Key, Body=f.read())
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", **kwargs) -> dict:
+        self._request()
+        bucket_dir = os.path.join(self.root, Bucket)
+        contents = []
+        for dirpath, _, filenames in os.walk(bucket_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    contents.append({"Key": key, "ETag": self._etag(path), "Size": os.path.getsize(path)})
+        contents.sort(key=lambda obj: obj["Key"])
+        return {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+
+    def get_paginator(self, operation: str):
+        if operation != "list_objects_v2":
+            raise NotImplementedError(operation)
+        return _SinglePagePaginator(self.list_objects_v2)
+
+
+class _SinglePagePaginator:
+    def __init__(self, method):
+        self.method = method
+
+    def paginate(self, **kwargs):
+        yield self.method(**kwargs)
+
+
+def seed_bucket(client: LocalS3Client, bucket: str, files: list[str], prefix: str = "raw/") -> list[str]:
+    """Copy local files into the bucket under `prefix` and return their keys."""
+    keys = []
+    for path in files:
+        key = prefix + os.path.basename(path)
+        target = client._path(bucket, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+        keys.append(key)
+    return keys
+
+
+@contextmanager
+def use_local_s3(client: LocalS3Client, region: Optional[str] = None):
+    """Serve `get_client("s3")` from `client` within the block."""
+    region = region or os.getenv("AWS_REGION", "us-east-1")
+    key = ("s3", region, os.getpid())
+    previous = awsClients._clients.get(key)
+    awsClients._clients[key] = client
+    try:
+        yield client
+    finally:
+        if previous is None:
+            awsClients._clients.pop(key, None)
+        else:
+            awsClients._clients[key] = previous
@@ -0,0 +1,195 @@
+"""
+Deterministic, offline stand-in for `strands.models.BedrockModel`.
+
+The stub sleeps for a configurable latency (fixed, plus a per-output-token delay) and answers `structured_output` calls with
+an instance of the requested pydantic model filled from the prompt text, so agents can
+be benchmarked without network access or AWS credentials. When an agent offers tools,
+the stub routes like a well-behaved LLM: it calls each offered tool once, in the
+pipeline order of `ROUTING_ORDER`, then answers with text. Token usage is reported
+like Bedrock does (input tokens estimated from the prompt, output tokens configurable)
+and totalled on the stub.
+"""
+import asyncio
+import enum
+import json
+import threading
+import typing
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+from strands.models import Model
+
+
+# Order in which the stub calls the tools an agent offers
+ROUTING_ORDER = (
+    "custom_retrieve", "check_status", "ingestion_agent",
+    "pdf_to_md_agent", "download_pdf_from_s3", "convert_pdf_save_md",
+    "splitter_agent", "split_sections_by_title",
+    "clauses_agent", "validate_agent", "create_answer",
+)
+
+
+def _used_tools(messages) -> set:
+    return {
+        block["toolUse"]["name"]
+        for message in messages or []
+        for block in message.get("content", [])
+        if "toolUse" in block
+    }
+
+
+def _prompt_text(messages) -> str:
+    """Return the text of the last user message."""
+    for message in reversed(messages or []):
+        if message.get("role") == "user":
+            return " ".join(block.get("text", "") for block in message.get("content", []))
+    return ""
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _fake_value(annotation: Any, text: str, depth: int = 0) -> Any:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin in (list, tuple, set):
+        return [_fake_value(args[0] if args else str, text, depth + 1)]
+    if origin is typing.Union:
+        return _fake_value(next(a for a in args if a is not type(None)), text, depth)
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return fake_instance(annotation, text, depth + 1)
+        if issubclass(annotation, enum.Enum):
+            return list(annotation)[0]
+        if issubclass(annotation, bool):
+            return True
+        if issubclass(annotation, int):
+            return 1
+        if issubclass(annotation, float):
+            return 0.5
+    return text[:200]
+
+
+def fake_instance(output_model: type[BaseModel], text: str = "", depth: int = 0) -> BaseModel:
+    """Build a valid instance of `output_model`, using `text` for string fields."""
+    values = {
+        name: _fake_value(field.annotation, text, depth)
+        for name, field in output_model.model_fields.items()
+    }
+    return output_model(**values)
+
+
+class StubModel(Model):
+    """
+    Local model with fixed latency and deterministic answers.
+
+    Args:
+        latency (float): Seconds each call sleeps before answering.
+        output_tokens (int | None): Output tokens reported per call. Defaults to an estimate
+            from the answer text.
+        seconds_per_token (float): Extra latency per output token, like a decoding model.
+        responder (Callable | None): `responder(output_model, prompt_text)` returning the
+            structured output. Defaults to `fake_instance`.
+        tool_inputs (dict | None): Values for tool parameters, by parameter name, used when
+            the stub routes to a tool. Missing parameters get a default for their JSON type.
+        skip_tools (set | None): Tools the stub never calls, e.g. ones that need the network.
+        model_id (str): Reported in the model config, like a real Bedrock model id.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        output_tokens: Optional[int] = None,
+        seconds_per_token: float = 0.0,
+        responder: Optional[Callable[[type, str], Any]] = None,
+        model_id: str = "stub.model-v1:0",
+        tool_inputs: Optional[dict] = None,
+        skip_tools: Optional[set] = None,
+        **model_config: Any,
+    ):
+        self.latency = latency
+        self.output_tokens = output_tokens
+        self.seconds_per_token = seconds_per_token
+        self.responder = responder or fake_instance
+        self.tool_inputs = tool_inputs or {}
+        self.skip_tools = set(skip_tools or ())
+        self.config = {"model_id": model_id, **model_config}
+        self.calls = 0
+        self.input_tokens = 0
+        self.total_output_tokens = 0
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.config
+
+    def _count_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    async def _answer(self, prompt_text: str, answer_text: str) -> dict:
+        """Sleep like the model would for this answer and return its Bedrock-style usage."""
+        input_tokens = _estimate_tokens(prompt_text)
+        output_tokens = self.output_tokens if self.output_tokens is not None else _estimate_tokens(answer_text)
+        await asyncio.sleep(self.latency + output_tokens * self.seconds_per_token)
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
+        return {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens}
+
+    async def structured_output(self, output_model, prompt, **kwargs):
+        self._count_call()
+        text = _prompt_text(prompt)
+        output = self.responder(output_model, text)
+        usage = await self._answer(text, output.model_dump_json() if isinstance(output, BaseModel) else str(output))
+        message = {"role": "assistant", "content": [{"text": ""}]}
+        yield {"stop": ("end_turn", message, usage, {"latencyMs": int(self.latency * 1000)})}
+        yield {"output": output}
+
+    def _next_tool(self, messages, tool_specs) -> Optional[dict]:
+        offered = {spec["name"]: spec for spec in tool_specs or []}
+        used = _used_tools(messages)
+        for name in ROUTING_ORDER:
+            if name in offered and name not in used and name not in self.skip_tools:
+                return offered[name]
+        return None
+
+    def _tool_input(self, spec: dict) -> dict:
+        schema = spec.get("inputSchema", {}).get("json", {})
+        defaults = {"string": "stub", "integer": 5, "number": 0.0, "boolean": False, "array": [], "object": {}}
+        return {
+            name: self.tool_inputs.get(name, defaults.get(prop.get("type"), "stub"))
+            for name, prop in schema.get("properties", {}).items()
+        }
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self._count_call()
+
+        spec = self._next_tool(messages, tool_specs)
+        if spec is not None:
+            await self._answer(_prompt_text(messages), spec["name"])
+            tool_use_id = f"stub-{self.calls}-{spec['name']}"
+            yield {"messageStart": {"role": "assistant"}}
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": spec["name"]}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(self._tool_input(spec))}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            return
+
+        text = f"Stub answer to: {_prompt_text(messages)[:200]}"
+        usage = await self._answer(_prompt_text(messages), text)
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockStart": {"start": {}}}
+        yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": usage,
+                "metrics": {"latencyMs": int(self.latency * 1000)},
+            }
+        }
@@ -1,12 +1,94 @@
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from memory.EventBus import bus
+
+# Seconds a finished session stays readable (e.g. by the Streamlit monitor) before eviction
+MEMORY_SESSION_TTL = float(os.getenv("MEMORY_SESSION_TTL", "600"))
+
+DEFAULT_SESSION = "default"
+
+# Keys whose changes are published to the event bus (memory/EventBus.py)
+PUBLISHED_KEYS = ("actual_agent", "actual_tool", "partial_answer")
+
+# Session of the request being served; threads started through utils.concurrency inherit it
+_current_session: ContextVar[str] = ContextVar("memory_session", default=DEFAULT_SESSION)
+
+
 class MemoryStore:
-    def __init__(self):
-        self.state = {}
+    """
+    Shared state of the agents, kept per request.
+
+    `set`/`get` act on the session of the current context, so concurrent questions
+    served by one process do not see each other's `user_input`, `top_clauses` or
+    `main_document`. Code outside `session()` uses the "default" session.
+    """
+
+    def __init__(self, ttl: float = MEMORY_SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: dict[str, dict] = {}
+        self._finished_at: dict[str, float] = {}
+
+    def _state(self, session_id: Optional[str]) -> dict:
+        return self._sessions.setdefault(session_id or _current_session.get(), {})
 
     def set(self, key, value):
-        self.state[key] = value
+        session_id = _current_session.get()
+        with self._lock:
+            state = self._state(session_id)
+            changed = key in PUBLISHED_KEYS and state.get(key) != value
+            state[key] = value
+        if changed:
+            bus.publish(session_id, key, value)
+
+    def get(self, key, default: Any = None, session_id: Optional[str] = None):
+        """Value of `key` in the current session, or in `session_id` when given."""
+        with self._lock:
+            state = self._sessions.get(session_id or _current_session.get(), {})
+            return state.get(key, default)
+
+    @property
+    def session_id(self) -> str:
+        return _current_session.get()
+
+    @contextmanager
+    def session(self, session_id: Optional[str] = None):
+        """
+        Run the enclosed code in its own memory session and yield its id.
+        On exit the session is kept for `ttl` seconds, then evicted.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        self.evict_expired()
+        with self._lock:
+            self._sessions[session_id] = {}
+            self._finished_at.pop(session_id, None)
+        bus.drop(session_id)
+        token = _current_session.set(session_id)
+        try:
+            yield session_id
+        finally:
+            _current_session.reset(token)
+            with self._lock:
+                self._finished_at[session_id] = time.monotonic()
+            bus.close(session_id)
 
-    def get(self, key):
-        return self.state.get(key)
+    def evict_expired(self) -> int:
+        """Drop finished sessions older than the TTL. Returns how many were dropped."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [sid for sid, finished in self._finished_at.items() if now - finished > self.ttl]
+            for sid in expired:
+                self._sessions.pop(sid, None)
+                del self._finished_at[sid]
+        for sid in expired:
+            bus.drop(sid)
+        return len(expired)
 
-# Global memory (or you can inject it per-agent)
-memory = MemoryStore()
\ No newline at end of file
+# Global memory; its state is scoped per session (see MemoryStore.session)
+memory = MemoryStore()
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+# Memory keys whose changes are recorded as events; other published keys only wake up listeners
+STAGE_KEYS = ("actual_agent", "actual_tool")
+
+# Events kept per session; the long-lived "default" session would otherwise grow forever
+EVENT_BUS_MAX_EVENTS = 1000
+
+# Agent and tool are set one after the other; transitions closer than this are one stage
+COALESCE_SECONDS = 0.01
+
+
+class EventBus:
+    """
+    Per-session stream of agent/tool transitions.
+
+    `MemoryStore.set` publishes here, so the agents need no extra calls. Listeners
+    block in `wait` until the session's version changes, instead of polling memory.
+    """
+
+    def __init__(self):
+        self._changed = threading.Condition()
+        self._sessions: dict[str, dict] = {}
+
+    def _session(self, session_id: str) -> dict:
+        return self._sessions.setdefault(session_id, {"version": 0, "events": deque(maxlen=EVENT_BUS_MAX_EVENTS), "done_at": None})
+
+    def publish(self, session_id: str, key: str, value: Any) -> None:
+        with self._changed:
+            session = self._session(session_id)
+            if key in STAGE_KEYS:
+                session["events"].append({"key": key, "value": value, "at": time.time()})
+            session["version"] += 1
+            self._changed.notify_all()
+
+    def close(self, session_id: str) -> None:
+        """Mark the session's request as finished; its last stage ends now."""
+        with self._changed:
+            session = self._session(session_id)
+            session["done_at"] = time.time()
+            session["version"] += 1
+            self._changed.notify_all()
+
+    def drop(self, session_id: str) -> None:
+        with self._changed:
+            self._sessions.pop(session_id, None)
+
+    def version(self, session_id: str) -> int:
+        with self._changed:
+            return self._sessions.get(session_id, {}).get("version", 0)
+
+    def wait(self, session_id: str, version: int, timeout: Optional[float] = None) -> int:
+        """Block until the session's version differs from `version` (or `timeout`), and return it."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._session(session_id)["version"] != version, timeout)
+            return self._session(session_id)["version"]
+
+    def timeline(self, session_id: str) -> list[dict]:
+        """
+        Stages of the session's request in order, each with agent, tool, start (epoch
+        seconds) and seconds. The current stage of a running request is measured up to now.
+        """
+        with self._changed:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            events = list(session["events"])
+            done_at = session["done_at"]
+
+        stages = []
+        current = {"actual_agent": None, "actual_tool": None}
+        for event in events:
+            if current[event["key"]] == event["value"]:
+                continue
+            current[event["key"]] = event["value"]
+            stage = {"agent": current["actual_agent"], "tool": current["actual_tool"], "start": event["at"]}
+            if stages and event["at"] - stages[-1]["start"] < COALESCE_SECONDS:
+                stage["start"] = stages[-1]["start"]
+                stages[-1] = stage
+            else:
+                stages.append(stage)
+
+        end = done_at or time.time()
+        for stage, following in zip(stages, stages[1:] + [None]):
+            stage["seconds"] = (following["start"] if following else end) - stage["start"]
+        return stages
+
+
+# Global bus, fed by `memory`
+bus = EventBus()
@@ -0,0 +1,337 @@
+"""
+Batch ingestion of every PDF under an S3 prefix, without LLM tool routing.
+
+Each document goes through download -> convert -> split -> extract in a worker
+process. Completed documents are recorded in a JSONL state file, so an interrupted
+run can be restarted and only picks up what is missing or changed (by ETag).
+
+The ETag of the object a document's outputs were built from is kept next to its
+Markdown (`markdown/<name>.md.etag`, written on conversion). Existing outputs are
+reused unless that ETag differs from the object's current one: then its Markdown,
+sections and top clauses are deleted and rebuilt. Outputs without a recorded ETag
+are taken as current, and so are all outputs when S3 cannot be reached.
+
+    python -m pipeline.BatchIngestion --bucket my-bucket --prefix raw/ --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+from utils.awsClients import get_client
+from utils.normalizeNames import normalize_basename, make_md_name, make_sections_name, find_sections_name
+from utils.tracing import span, traced
+
+STAGES = ("download", "convert", "split", "extract")
+
+# Sliding window (in tokens) used when a document has no usable titles
+WINDOW_TOKENS = 500
+WINDOW_OVERLAP_TOKENS = 50
+
+def list_pdfs(bucket: str, prefix: str = "raw/") -> list[dict]:
+    """List the PDF objects under `prefix` as dicts with key, etag and size."""
+    paginator = get_client("s3").get_paginator("list_objects_v2")
+    objects = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].lower().endswith(".pdf"):
+                objects.append({"key": obj["Key"], "etag": obj["ETag"].strip('"'), "size": obj["Size"]})
+    return objects
+
+
+def load_state(state_path: str) -> dict:
+    """Read the last record of each key from the JSONL state file."""
+    state = {}
+    if not os.path.exists(state_path):
+        return state
+    with open(state_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            state[record["key"]] = record
+    return state
+
+
+def new_job(bucket: str, key: str, etag: str = "", context: str = "") -> dict:
+    """
+    Working state of one document as it moves through the stages. The stage functions
+    fill in local_path, md_path and sections_file; `record` is what gets reported.
+    """
+    filename = key.rsplit("/", 1)[-1]
+    base = normalize_basename(filename)
+    base_dir = os.getcwd()
+    return {
+        "bucket": bucket,
+        "key": key,
+        "context": context,
+        "filename": filename,
+        "base": base,
+        "base_dir": base_dir,
+        "local_path": os.path.join(base_dir, "tmp", filename),
+        "md_path": os.path.join(base_dir, "markdown", make_md_name(base)),
+        "sections_file": None,
+        "current": False,  # outputs on disk were built from the object's current ETag
+        "record": {"key": key, "etag": etag, "status": "done", "stages": {}, "skipped": [], "bytes": 0, "error": None},
+    }
+
+
+def _read_etag(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip().strip('"') or None
+
+
+def remove_outputs(job: dict) -> list[str]:
+    """Delete the Markdown, sections and top clauses of a document. Returns the paths removed."""
+    from agents.Markdown import source_etag_path
+
+    sections_dir = os.path.join(job["base_dir"], "sections")
+    paths = [job["md_path"], source_etag_path(job["md_path"]), os.path.join(job["base_dir"], "clauses", f"{job['base']}.json")]
+    for method in ("title", "window"):
+        for sections_format in ("binary", "json"):
+            paths.append(os.path.join(sections_dir, make_sections_name(job["base"], method, sections_format)))
+    removed = [path for path in paths if os.path.exists(path)]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def _current_etag(job: dict) -> Optional[str]:
+    """ETag of the object: the listed one, else from a HEAD request; None when S3 cannot be reached."""
+    if job["record"]["etag"]:
+        return job["record"]["etag"]
+    try:
+        return get_client("s3").head_object(Bucket=job["bucket"], Key=job["key"])["ETag"].strip('"')
+    except Exception as e:
+        print(f"⚠️ Could not check {job['key']} on S3 ({e!r}), using the local outputs")
+        return None
+
+
+def download_stage(job: dict) -> None:
+    from agents.Markdown import download_pdf, source_etag_path
+
+    record = job["record"]
+    if os.path.exists(job["md_path"]):
+        built_path = source_etag_path(job["md_path"])
+        built = _read_etag(built_path)
+        etag = _current_etag(job)
+        if built is None and etag:
+            # Converted before ETags were recorded: taken as built from the current object
+            with open(built_path, "w", encoding="utf-8") as f:
+                f.write(etag)
+        if built is None or etag is None or built == etag:
+            job["current"] = True
+            record["skipped"].append("download")
+            return
+        removed = remove_outputs(job)
+        print(f"🔁 {job['key']} changed, removed {len(removed)} outdated outputs")
+
+    # Conditional (If-None-Match) download: a local copy of the current object is reused
+    job["local_path"], downloaded = download_pdf(
+        get_client("s3"), job["bucket"], job["key"], os.path.join(job["base_dir"], "tmp")
+    )
+    if downloaded:
+        record["bytes"] = os.path.getsize(job["local_path"])
+    else:
+        record["skipped"].append("download")
+
+
+def convert_stage(job: dict) -> None:
+    from agents.Markdown import convert_pdf_to_markdown
+
+    if job["current"] and os.path.exists(job["md_path"]):
+        job["record"]["skipped"].append("convert")
+        return
+    # Also records the object's ETag next to the Markdown
+    job["md_path"], cache_hit = convert_pdf_to_markdown(
+        job["local_path"], job["filename"], os.path.join(job["base_dir"], "markdown")
+    )
+    if cache_hit:
+        job["record"]["skipped"].append("convert")
+
+
+def split_stage(job: dict) -> None:
+    from agents.Splitter import split_markdown_by_title, split_markdown_by_window, save_sections
+    from utils.markdownSections import read_markdown
+
+    base = job["base"]
+    sections_dir = os.path.join(job["base_dir"], "sections")
+    existing = find_sections_name(sections_dir, base, "title") or find_sections_name(sections_dir, base, "window")
+    if job["current"] and existing:
+        chosen_file = existing
+        job["record"]["skipped"].append("split")
+    else:
+        # As stored (line endings, BOM): window offsets are byte offsets into the file
+        text = read_markdown(job["md_path"])
+        sections = split_markdown_by_title(text)
+        method = "title"
+        # The preamble (text before the first heading) does not make a document titled
+        if sum(1 for section in sections if section["level"] > 0) < 2:
+            sections = split_markdown_by_window(text, WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS)
+            method = "window"
+        # Overlapping windows are stored as offsets into the Markdown, not as copies of it
+        md_path = job["md_path"] if method == "window" else None
+        chosen_file = os.path.basename(save_sections(sections, sections_dir, method, base, md_path))
+    job["sections_file"] = chosen_file
+    job["record"]["sections_file"] = chosen_file
+
+
+def extract_stage(job: dict) -> None:
+    from agents.Clauses import ClausesAgent
+
+    if job["current"] and os.path.exists(os.path.join(job["base_dir"], "clauses", f"{job['base']}.json")):
+        job["record"]["skipped"].append("extract")
+        return
+    result = ClausesAgent().analyze_sections(job["base"], job["sections_file"], job["context"])
+    job["clauses"] = result.get("clauses", [])
+    job["record"]["clauses"] = len(job["clauses"])
+
+
+STAGE_FUNCTIONS = {
+    "download": download_stage,
+    "convert": convert_stage,
+    "split": split_stage,
+    "extract": extract_stage,
+}
+
+
+def run_stage(job: dict, stage: str, func=None) -> None:
+    """Run one stage on `job` and record its seconds. A failure marks the job failed."""
+    start = time.perf_counter()
+    try:
+        with span(stage, "stage", document=job["base"]):
+            (func or STAGE_FUNCTIONS[stage])(job)
+    except Exception as e:
+        job["record"]["status"] = "failed"
+        job["record"]["error"] = f"{stage}: {e!r}"
+    finally:
+        job["record"]["stages"][stage] = time.perf_counter() - start
+
+
+@traced(kind="pipeline")
+def ingest_document(bucket: str, key: str, etag: str = "", extract_clauses: bool = True, context: str = "") -> dict:
+    """
+    Run all ingestion stages for one S3 object. Stages whose output already exists,
+    built from the object's current ETag, are skipped.
+
+    Returns:
+        dict: Record with status, per-stage seconds, bytes downloaded and any error.
+    """
+    job = new_job(bucket, key, etag, context)
+    for stage in STAGES if extract_clauses else STAGES[:-1]:
+        run_stage(job, stage)
+        if job["record"]["status"] == "failed":
+            break
+    return job["record"]
+
+
+def summarize(records: list[dict], wall_seconds: float, workers: int) -> dict:
+    """Per-stage counts, busy time and throughput for a batch run."""
+    summary = {
+        "documents": len(records),
+        "failed": sum(1 for r in records if r["status"] == "failed"),
+        "wall_seconds": round(wall_seconds, 2),
+        "documents_per_second": round(len(records) / wall_seconds, 3) if wall_seconds else 0.0,
+        "workers": workers,
+        "stages": {},
+    }
+    for stage in STAGES:
+        runs = [r for r in records if stage in r["stages"] and stage not in r["skipped"]]
+        busy = sum(r["stages"][stage] for r in runs)
+        summary["stages"][stage] = {
+            "processed": len(runs),
+            "skipped": sum(1 for r in records if stage in r["skipped"]),
+            "busy_seconds": round(busy, 2),
+            "avg_seconds": round(busy / len(runs), 3) if runs else 0.0,
+            "documents_per_second": round(len(runs) / busy, 3) if busy else 0.0,
+        }
+    downloaded = sum(r["bytes"] for r in records)
+    download_busy = summary["stages"]["download"]["busy_seconds"]
+    summary["stages"]["download"]["mb_per_second"] = round(downloaded / 1e6 / download_busy, 2) if download_busy else 0.0
+    return summary
+
+
+def ingest_prefix(
+    bucket: str,
+    prefix: str = "raw/",
+    workers: int = 2,
+    state_path: str = "batch_ingestion_state.jsonl",
+    extract_clauses: bool = True,
+    context: str = "",
+    limit: Optional[int] = None,
+) -> dict:
+    """
+    Ingest every PDF under `s3://bucket/prefix` on a process pool.
+
+    Documents already recorded as done with the same ETag in `state_path` are skipped.
+
+    Returns:
+        dict: Throughput summary (see `summarize`).
+    """
+    objects = list_pdfs(bucket, prefix)
+    state = load_state(state_path)
+    todo = [
+        obj for obj in objects
+        if not (state.get(obj["key"], {}).get("status") == "done" and state[obj["key"]].get("etag") == obj["etag"])
+    ]
+    if limit is not None:
+        todo = todo[:limit]
+    print(f"📦 {len(objects)} PDFs under s3://{bucket}/{prefix}, {len(objects) - len(todo)} already ingested, {len(todo)} to process")
+
+    records = []
+    start = time.perf_counter()
+    # spawn: workers must not inherit boto3/docling thread state from the parent
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor, \
+            open(state_path, "a", encoding="utf-8") as state_file:
+        futures = [
+            executor.submit(ingest_document, bucket, obj["key"], obj["etag"], extract_clauses, context)
+            for obj in todo
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Ingesting", unit="doc"):
+            record = future.result()
+            records.append(record)
+            state_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            state_file.flush()
+            if record["status"] == "failed":
+                tqdm.write(f"❌ {record['key']}: {record['error']}")
+
+    return summarize(records, time.perf_counter() - start, workers)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Batch-ingest PDFs from S3 without LLM tool routing.")
+    parser.add_argument("--bucket", default=os.getenv("S3_BUCKET_NAME"), help="S3 bucket (default: $S3_BUCKET_NAME)")
+    parser.add_argument("--prefix", default="raw/", help="Key prefix to ingest (default: raw/)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+    parser.add_argument("--state", default="batch_ingestion_state.jsonl", help="Resumable state file")
+    parser.add_argument("--context", default="", help="Context passed to clause extraction")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most N documents")
+    parser.add_argument("--no-clauses", action="store_true", help="Skip the LLM clause extraction stage")
+    args = parser.parse_args()
+
+    if not args.bucket:
+        parser.error("--bucket or S3_BUCKET_NAME is required")
+
+    summary = ingest_prefix(
+        args.bucket,
+        prefix=args.prefix,
+        workers=args.workers,
+        state_path=args.state,
+        extract_clauses=not args.no_clauses,
+        context=args.context,
+        limit=args.limit,
+    )
+    print(json.dumps(summary, indent=2))
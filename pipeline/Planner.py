@@ -0,0 +1,115 @@
+"""
+Deterministic fast-path executor for the question-answering pipeline.
+
+The agentic orchestrator asks the LLM which tool to call next, although the sequence
+never changes: retrieve -> check_status -> ingest (download -> convert -> split ->
+clauses) -> validate -> create. This executor runs that sequence directly in Python
+and only calls the LLM for content work: clause extraction, validation and the
+final answer. The top retrieved documents are ingested together on the stage
+scheduler (pipeline/Scheduler.py), so several documents take about as long as the
+slowest one; their clauses are merged, with the documents each one comes from, and
+validated and answered from together.
+"""
+import os
+import time
+
+from memory.AgentsMemory import memory
+from pipeline.Scheduler import ingest_documents
+from retrieval.Retriever import retrieve_documents, retrieve_context
+from utils.clauseMerge import merge_clauses
+from utils.normalizeNames import normalize_basename, make_pdf_name
+from utils.tracing import traced
+
+# "fast" runs PipelineExecutor and falls back to the agentic orchestrator on failure
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "fast")
+# Retrieved documents ingested and analyzed per question, best match first
+PLANNER_MAX_DOCUMENTS = int(os.getenv("PLANNER_MAX_DOCUMENTS", "3"))
+
+
+class PipelineError(Exception):
+    """A pipeline stage failed; the caller may fall back to the agentic mode."""
+
+
+class PipelineExecutor:
+    def __init__(self, model=None, bucket: str = None):
+        self.model = model
+        self.bucket = bucket or os.getenv("S3_BUCKET_NAME", "default_bucket_name")
+        self.timings: dict[str, float] = {}
+
+    def _stage(self, agent: str, tool: str):
+        memory.set("actual_agent", agent)
+        memory.set("actual_tool", tool)
+        return time.perf_counter()
+
+    def _done(self, name: str, start: float) -> None:
+        self.timings[name] = time.perf_counter() - start
+
+    @traced(kind="pipeline")
+    def run(self, user_input: str) -> str:
+        """
+        Answer `user_input` with the fixed pipeline.
+
+        Raises:
+            PipelineError: When a stage cannot produce its output.
+        """
+        # Imported here: the agents import docling and build Bedrock models
+        from agents.Clauses import ClausesAgent
+        from agents.Validator import ValidatorAgent
+        from agents.Creator import CreatorAgent
+
+        self.timings = {}
+        memory.set("user_input", user_input)
+
+        start = self._stage("Orchestrator", "custom_retrieve")
+        documents = retrieve_documents(user_input, int(os.getenv("NUMBER_OF_RESULTS", "10")))
+        self._done("retrieve", start)
+        print(f"📄 Documents found: {documents}")
+        if not documents:
+            raise PipelineError("No relevant documents found in the knowledge base.")
+        documents = documents[:PLANNER_MAX_DOCUMENTS]
+        memory.set("main_document", documents[0])
+        memory.set("documents", documents)
+
+        def extract(job: dict) -> None:
+            memory.set("actual_agent", "Clauses")
+            memory.set("actual_tool", "analyze_sections")
+            result = ClausesAgent(model=self.model).analyze_sections(job["base"], job["sections_file"], user_input)
+            job["clauses"] = result.get("clauses", [])
+            job["record"]["clauses"] = len(job["clauses"])
+
+        # check_status + download/convert/split/extract, overlapped across documents;
+        # stages with existing outputs are skipped
+        start = self._stage("Ingestion", "check_status")
+        keys = [f"raw/{make_pdf_name(normalize_basename(name))}" for name in documents]
+        jobs = ingest_documents(self.bucket, keys, context=user_input, extract_func=extract)
+        self._done("ingest", start)
+        for job in jobs:
+            if job["record"]["status"] != "done":
+                print(f"⚠️ Ingestion of {job['base']} failed: {job['record']['error']}")
+        # One clause set for all documents: duplicates kept once, each clause with its sources
+        clauses_by_document = {job["base"]: job.get("clauses", []) for job in jobs if job["record"]["status"] == "done"}
+        clauses = merge_clauses(clauses_by_document)
+        if not clauses:
+            errors = "; ".join(f"{job['base']}: {job['record']['error']}" for job in jobs if job["record"]["error"])
+            raise PipelineError(f"No clauses extracted from {', '.join(documents)}. {errors}".strip())
+        extracted = sum(len(found) for found in clauses_by_document.values())
+        print(f"📄 {len(clauses)} clauses from {len(clauses_by_document)} documents ({extracted - len(clauses)} duplicates merged)")
+        memory.set("clauses_by_document", clauses_by_document)
+        memory.set("top_clauses", clauses)
+
+        # All documents' clauses are validated in a single fan-out of batches
+        start = self._stage("Validator", "compare")
+        context = retrieve_context(user_input)
+        if not context:
+            raise PipelineError("No relevant information found for validation.")
+        validated = ValidatorAgent(model=self.model).compare(clauses, context)
+        self._done("validate", start)
+        if isinstance(validated, dict) and "error" in validated:
+            raise PipelineError(validated["error"])
+
+        start = self._stage("Creator", "create_response")
+        response = CreatorAgent(model=self.model).create_response()
+        self._done("create", start)
+
+        print("⏱️ Pipeline timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in self.timings.items()))
+        return str(response)
@@ -0,0 +1,167 @@
+"""
+Incremental re-ingestion of a revised document.
+
+The Markdown is split again and each section's content hash is compared with the
+hashes stored by the previous split. Only new or changed sections go to the LLM;
+clauses of unchanged sections are carried over. The document's records in
+`s3_data/index.jsonl` are then updated in place: clauses that disappeared are
+dropped, new ones are appended, and clauses re-extracted from changed sections get
+a fresh `updated_at`. Duplicated clauses are kept once, with all their areas
+(retrieval/Dedup.py).
+
+    python -m pipeline.Reingest Politica_Ambiental_2024 --context "..."
+"""
+import argparse
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+from retrieval.ClauseStore import ClauseStore
+from retrieval.Dedup import duplicate_groups
+from utils.clauseMerge import clause_key
+from utils.normalizeNames import normalize_basename, make_md_name, make_pdf_name, make_sections_name, find_sections_name
+from utils.sectionHashes import diff_sections, hashes_path, read_json, section_clauses_path
+
+INDEX_PATH = os.path.join("s3_data", "index.jsonl")
+
+
+def update_index(index_path: str, base_name: str, section_clauses: dict, changed_hashes: set) -> dict:
+    """
+    Bring the index records of one document in line with its current clauses.
+
+    Args:
+        index_path (str): Path to the JSONL index.
+        base_name (str): Document base name, e.g. "Politica_Ambiental_2024".
+        section_clauses (dict): Per-section clauses, as saved by ClausesAgent.
+        changed_hashes (set): Hashes of the sections re-analyzed in this run.
+
+    Returns:
+        dict: Number of records kept, added, removed and touched.
+    """
+    store = ClauseStore.from_jsonl(index_path) if os.path.exists(index_path) else ClauseStore()
+    doc_name = f"raw/{make_pdf_name(base_name)}"
+    doc_rows = store.query(doc_name=doc_name)
+    now = datetime.now(timezone.utc).isoformat()
+
+    # One record per distinct clause: duplicates and near-duplicates (e.g. from overlapping
+    # windows) are collapsed, with the areas of all of them
+    extracted = [(clause, digest) for digest, entry in section_clauses.items() for clause in entry["clauses"]]
+    current = {}
+    aliases = {}  # key of every extracted text -> key of its group
+    refreshed = set()
+    for group in duplicate_groups([clause["clause_text"] for clause, _ in extracted]):
+        clause = extracted[group[0]][0]
+        key = clause_key(clause["clause_text"])
+        current[key] = {
+            "clause_text": clause["clause_text"],
+            "areas": list(dict.fromkeys(extracted[i][0]["area"] for i in group)),
+        }
+        aliases.update((clause_key(extracted[i][0]["clause_text"]), key) for i in group)
+        if any(extracted[i][1] in changed_hashes for i in group):
+            refreshed.add(key)
+
+    existing = set()
+    removed = set()
+    touched = 0
+    for row in doc_rows:
+        key = aliases.get(clause_key(store.get(row, "clause_text") or ""))
+        if key is None or key in existing:
+            removed.add(row)
+            continue
+        existing.add(key)
+        areas = current[key]["areas"]
+        if store.get(row, "areas") != areas:
+            store.set_field(row, "area", areas[0])
+            store.set_field(row, "areas", areas)
+        if key in refreshed:
+            store.set_field(row, "updated_at", now)
+            touched += 1
+
+    doc_id = store.get(doc_rows[0], "doc_id") if doc_rows else str(uuid.uuid4())
+    added = 0
+    for key, clause in current.items():
+        if key in existing:
+            continue
+        store.append({
+            "doc_id": doc_id,
+            "doc_name": doc_name,
+            "vec_db_idx": None,
+            "status": "pending",
+            "area": clause["areas"][0],
+            "areas": clause["areas"],
+            "clause_id": str(uuid.uuid4()),
+            "clause_text": clause["clause_text"],
+            "created_at": now,
+            "updated_at": now,
+            "linked_docs": [],
+        })
+        added += 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix=".tmp")
+    os.close(fd)
+    store.to_jsonl(tmp_path, rows=(row for row in range(len(store)) if row not in removed))
+    os.replace(tmp_path, index_path)
+
+    return {"kept": len(existing), "added": added, "removed": len(removed), "touched": touched}
+
+
+def reingest_document(document_name: str, context: str = "", index_path: str = INDEX_PATH, model=None) -> dict:
+    """
+    Re-split a document, re-extract clauses for new or changed sections only,
+    and update its index records.
+
+    Returns:
+        dict: Section diff, LLM calls made and index changes.
+    """
+    from agents.Clauses import ClausesAgent
+    from agents.Splitter import split_markdown_by_title, split_markdown_by_window, save_sections
+    from utils.markdownSections import read_markdown
+    from pipeline.BatchIngestion import WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS
+
+    base_dir = os.getcwd()
+    sections_dir = os.path.join(base_dir, "sections")
+    base = normalize_basename(document_name)
+
+    md_path = os.path.join(base_dir, "markdown", make_md_name(base))
+    # As stored (line endings, BOM): window offsets are byte offsets into the file
+    text = read_markdown(md_path)
+
+    # Keep the split method of the previous ingestion, so section hashes are comparable
+    if find_sections_name(sections_dir, base, "window") and not find_sections_name(sections_dir, base, "title"):
+        method = "window"
+        sections = split_markdown_by_window(text, WINDOW_TOKENS, WINDOW_OVERLAP_TOKENS)
+    else:
+        method = "title"
+        sections = split_markdown_by_title(text)
+
+    sections_file = os.path.join(sections_dir, make_sections_name(base, method))
+    old_hashes = read_json(hashes_path(sections_file), [])
+    diff = diff_sections(old_hashes, sections)
+    save_sections(sections, sections_dir, method, base, md_path if method == "window" else None)
+
+    result = ClausesAgent(model=model).analyze_sections(base, os.path.basename(sections_file), context)
+
+    old = {entry["hash"] for entry in old_hashes}
+    section_clauses = read_json(section_clauses_path(os.path.join(base_dir, "clauses"), base), {})
+    changed_hashes = {digest for digest in section_clauses if digest not in old}
+    index_changes = update_index(index_path, base, section_clauses, changed_hashes)
+
+    return {
+        "document": base,
+        "sections": {name: len(titles) for name, titles in diff.items()},
+        "llm_calls": result.get("llm_calls", 0),
+        "failed_sections": result.get("failed_sections", []),
+        "index": index_changes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-ingest a revised document, reprocessing only changed sections.")
+    parser.add_argument("document_name", help="Document name, with or without extension")
+    parser.add_argument("--context", default="", help="Context passed to clause extraction")
+    parser.add_argument("--index", default=INDEX_PATH, help="JSONL index to update")
+    args = parser.parse_args()
+    print(json.dumps(reingest_document(args.document_name, args.context, args.index), indent=2, ensure_ascii=False))
@@ -0,0 +1,210 @@
+"""
+Stage-level DAG scheduler for ingesting several documents at once.
+
+Each stage (download, convert, split, extract) has its own worker threads and a
+bounded input queue, so documents overlap: B downloads while A is in docling and
+A's sections are already with the LLM. A stage starts on a document once every
+stage it depends on has finished that document. When a queue is full, the upstream
+workers wait (backpressure) instead of piling up PDFs or Markdown in memory.
+
+    python -m pipeline.Scheduler raw/a.pdf raw/b.pdf --bucket my-bucket
+"""
+import argparse
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from pipeline.BatchIngestion import STAGES, STAGE_FUNCTIONS, new_job, run_stage
+from utils.converterPool import DOCLING_POOL_SIZE
+from utils.tracing import traced
+
+# Concurrent documents per stage; convert beyond the docling pool size would only wait for a converter
+STAGE_WORKERS = {
+    "download": int(os.getenv("SCHEDULER_DOWNLOAD_WORKERS", "4")),
+    "convert": int(os.getenv("SCHEDULER_CONVERT_WORKERS", str(DOCLING_POOL_SIZE))),
+    "split": int(os.getenv("SCHEDULER_SPLIT_WORKERS", "2")),
+    "extract": int(os.getenv("SCHEDULER_EXTRACT_WORKERS", "2")),
+}
+# Documents that may wait in front of each stage before upstream stages block
+SCHEDULER_QUEUE_SIZE = int(os.getenv("SCHEDULER_QUEUE_SIZE", "2"))
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """A node of the DAG: `func(job)` runs on up to `workers` jobs at once, after the stages in `after`."""
+    name: str
+    func: Callable[[dict], None]
+    workers: int = 1
+    after: tuple = ()
+
+
+def ingestion_stages(extract: bool = True, extract_func: Optional[Callable[[dict], None]] = None) -> list[Stage]:
+    """
+    The download -> convert -> split -> extract chain with the STAGE_WORKERS limits.
+    `extract_func` replaces the default clause extraction stage.
+    """
+    names = STAGES if extract else STAGES[:-1]
+    stages = []
+    for i, name in enumerate(names):
+        func = extract_func if name == "extract" and extract_func else STAGE_FUNCTIONS[name]
+        stages.append(Stage(name, func, STAGE_WORKERS[name], after=(names[i - 1],) if i else ()))
+    return stages
+
+
+class StageScheduler:
+    """
+    Runs jobs (see `pipeline.BatchIngestion.new_job`) through a DAG of stages.
+
+    A failed stage marks the job failed; its downstream stages are then skipped for
+    that job only.
+    """
+
+    def __init__(self, stages: list[Stage], queue_size: int = SCHEDULER_QUEUE_SIZE):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.after if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+        self.dependents = {name: [s.name for s in stages if name in s.after] for name in self.stages}
+        self.sinks = [name for name, dependents in self.dependents.items() if not dependents]
+        self.queue_size = queue_size
+        self._stats = {}
+        self._wall_seconds = 0.0
+
+    def _worker(self, stage: Stage, inbox: queue.Queue, queues: dict, state: dict) -> None:
+        while True:
+            index = inbox.get()
+            if index is _STOP:
+                return
+            job = state["jobs"][index]
+            if job["record"]["status"] != "failed":
+                with state["lock"]:
+                    stats = self._stats[stage.name]
+                    stats["in_flight"] += 1
+                    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+                run_stage(job, stage.name, stage.func)
+                with state["lock"]:
+                    stats["in_flight"] -= 1
+                    stats["processed"] += 1
+                    stats["busy_seconds"] += job["record"]["stages"][stage.name]
+
+            ready = []
+            with state["lock"]:
+                for name in self.dependents[stage.name]:
+                    state["waiting"][index][name] -= 1
+                    if state["waiting"][index][name] == 0:
+                        ready.append(name)
+                if not self.dependents[stage.name]:
+                    state["sinks_left"][index] -= 1
+                    if state["sinks_left"][index] == 0:
+                        state["done"] += 1
+                        state["finished"].notify_all()
+            # Blocks while the next stage's queue is full
+            for name in ready:
+                queues[name].put(index)
+
+    @traced("StageScheduler.run", kind="pipeline")
+    def run(self, jobs: list[dict]) -> list[dict]:
+        """
+        Run every job through the DAG and return the jobs, in input order, once all have finished.
+        """
+        if not jobs:
+            return jobs
+        lock = threading.Lock()
+        state = {
+            "jobs": jobs,
+            "lock": lock,
+            "finished": threading.Condition(lock),
+            "done": 0,
+            "waiting": [{name: len(stage.after) for name, stage in self.stages.items()} for _ in jobs],
+            "sinks_left": [len(self.sinks)] * len(jobs),
+        }
+        self._stats = {
+            name: {"workers": stage.workers, "processed": 0, "busy_seconds": 0.0, "in_flight": 0, "max_in_flight": 0}
+            for name, stage in self.stages.items()
+        }
+        queues = {name: queue.Queue(maxsize=self.queue_size) for name in self.stages}
+        # Workers run in copies of the caller's context, so stages write to the caller's memory session
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._worker, stage, queues[name], queues, state),
+                daemon=True,
+            )
+            for name, stage in self.stages.items()
+            for _ in range(max(1, stage.workers))
+        ]
+        for thread in threads:
+            thread.start()
+
+        start = time.perf_counter()
+        sources = [name for name, stage in self.stages.items() if not stage.after]
+        for index in range(len(jobs)):
+            for name in sources:
+                queues[name].put(index)
+        with state["finished"]:
+            state["finished"].wait_for(lambda: state["done"] == len(jobs))
+        self._wall_seconds = time.perf_counter() - start
+
+        for name, stage in self.stages.items():
+            for _ in range(max(1, stage.workers)):
+                queues[name].put(_STOP)
+        for thread in threads:
+            thread.join()
+        return jobs
+
+    def stats(self) -> dict:
+        """Per-stage processed count, busy seconds and peak concurrency of the last run, plus its wall time."""
+        return {
+            "wall_seconds": round(self._wall_seconds, 3),
+            "stages": {
+                name: {k: round(v, 3) if isinstance(v, float) else v for k, v in values.items() if k != "in_flight"}
+                for name, values in self._stats.items()
+            },
+        }
+
+
+def ingest_documents(
+    bucket: str,
+    keys: list[str],
+    extract_clauses: bool = True,
+    context: str = "",
+    extract_func: Optional[Callable[[dict], None]] = None,
+) -> list[dict]:
+    """
+    Ingest several S3 objects with overlapping stages.
+
+    Returns:
+        list[dict]: The finished jobs, in the order of `keys`; each has its `record`.
+    """
+    scheduler = StageScheduler(ingestion_stages(extract_clauses, extract_func))
+    jobs = scheduler.run([new_job(bucket, key, context=context) for key in keys])
+    stats = scheduler.stats()
+    print(f"⏱️ Ingested {len(jobs)} documents in {stats['wall_seconds']:.2f}s "
+          f"(sum of stages {sum(sum(job['record']['stages'].values()) for job in jobs):.2f}s)")
+    return jobs
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Ingest several PDFs from S3 with overlapping stages.")
+    parser.add_argument("keys", nargs="+", help="S3 keys, e.g. raw/Politica_Ambiental_2024.pdf")
+    parser.add_argument("--bucket", default=os.getenv("S3_BUCKET_NAME"), help="S3 bucket (default: $S3_BUCKET_NAME)")
+    parser.add_argument("--context", default="", help="Context passed to clause extraction")
+    parser.add_argument("--no-clauses", action="store_true", help="Skip the LLM clause extraction stage")
+    args = parser.parse_args()
+
+    if not args.bucket:
+        parser.error("--bucket or S3_BUCKET_NAME is required")
+
+    jobs = ingest_documents(args.bucket, args.keys, extract_clauses=not args.no_clauses, context=args.context)
+    print(json.dumps([job["record"] for job in jobs], indent=2, ensure_ascii=False))
@@ -0,0 +1,237 @@
+"""
+Local FAISS index over extracted clauses.
+
+Vector ids are the `vec_db_idx` values of `s3_data/index.jsonl`, so a search hit maps
+back to its clause record. With `--dedupe`, duplicated clauses of the JSONL
+(retrieval/Dedup.py) are indexed once; the JSONL itself is left as it is. Build the
+index (and fill `vec_db_idx`) with:
+
+    python -m retrieval.ClauseIndex build s3_data/index.jsonl
+    python -m retrieval.ClauseIndex search "política ambiental" -k 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional
+
+import faiss
+import numpy as np
+
+from retrieval.Embedders import get_embedder
+
+CLAUSE_INDEX_DIR = os.getenv("CLAUSE_INDEX_DIR", "vector_index")
+INDEX_FILE = "clauses.faiss"
+META_FILE = "clauses_meta.json"
+
+# Clause fields kept next to each vector and returned with search hits
+META_FIELDS = ("clause_id", "doc_id", "doc_name", "area", "areas", "status", "clause_text")
+
+
+class ClauseIndex:
+    """
+    FAISS inner-product index of clause embeddings with incremental add/remove.
+
+    Vectors are L2-normalized, so scores are cosine similarities in [-1, 1]. The flat
+    index gives exact results; at the corpus sizes we have it answers a query in well
+    under a millisecond, and the query embedding dominates the latency.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedder.dim))
+        self.meta: dict[int, dict] = {}
+        self.ids_by_clause: dict[str, int] = {}
+        self.next_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def add(self, records: Iterable[dict], batch_size: int = 512) -> list[int]:
+        """
+        Embed and add clause records. Records whose `clause_id` is already indexed are replaced.
+
+        Returns:
+            list[int]: The `vec_db_idx` assigned to each record, in input order.
+        """
+        records = [r for r in records if r.get("clause_text")]
+        assigned = []
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            vectors = self.embedder.embed([r["clause_text"] for r in batch])
+            with self._lock:
+                self.remove([r["clause_id"] for r in batch if r.get("clause_id") in self.ids_by_clause])
+                ids = np.arange(self.next_id, self.next_id + len(batch), dtype=np.int64)
+                self.next_id += len(batch)
+                self.index.add_with_ids(vectors, ids)
+                for vec_id, record in zip(ids.tolist(), batch):
+                    self.meta[vec_id] = {field: record.get(field) for field in META_FIELDS}
+                    if record.get("clause_id"):
+                        self.ids_by_clause[record["clause_id"]] = vec_id
+                    assigned.append(vec_id)
+        return assigned
+
+    def remove(self, clause_ids: Iterable[str]) -> int:
+        """Remove clauses by `clause_id`. Returns the number of vectors removed."""
+        with self._lock:
+            ids = [self.ids_by_clause.pop(cid) for cid in clause_ids if cid in self.ids_by_clause]
+            if not ids:
+                return 0
+            self.index.remove_ids(np.array(ids, dtype=np.int64))
+            for vec_id in ids:
+                self.meta.pop(vec_id, None)
+            return len(ids)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        min_score: float = 0.0,
+        area: Optional[str] = None,
+        doc_id: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Return the top-k clauses for `query`, best first, as metadata dicts with
+        `vec_db_idx` and `score`. Optional `area`/`doc_id` filters are applied on an
+        over-fetched candidate list.
+        """
+        if not len(self):
+            return []
+        filtered = area is not None or doc_id is not None
+        fetch = min(len(self), k * 10 if filtered else k)
+        query_vector = self.embedder.embed([query])
+        with self._lock:
+            scores, ids = self.index.search(query_vector, fetch)
+            hits = []
+            for score, vec_id in zip(scores[0].tolist(), ids[0].tolist()):
+                if vec_id < 0 or score < min_score:
+                    continue
+                meta = self.meta[vec_id]
+                if area is not None and area not in (meta.get("areas") or [meta.get("area")]):
+                    continue
+                if doc_id is not None and meta.get("doc_id") != doc_id:
+                    continue
+                hits.append({**meta, "vec_db_idx": vec_id, "score": score})
+                if len(hits) == k:
+                    break
+        return hits
+
+    def save(self, index_dir: str = CLAUSE_INDEX_DIR) -> None:
+        """Persist the index and its metadata, replacing both files atomically."""
+        os.makedirs(index_dir, exist_ok=True)
+        with self._lock:
+            index_tmp = os.path.join(index_dir, INDEX_FILE + ".tmp")
+            faiss.write_index(self.index, index_tmp)
+            state = {
+                "embedder": self.embedder.name,
+                "dim": self.embedder.dim,
+                "next_id": self.next_id,
+                "meta": {str(k): v for k, v in self.meta.items()},
+            }
+            fd, meta_tmp = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(index_tmp, os.path.join(index_dir, INDEX_FILE))
+            os.replace(meta_tmp, os.path.join(index_dir, META_FILE))
+
+    @classmethod
+    def load(cls, index_dir: str = CLAUSE_INDEX_DIR, embedder=None) -> "ClauseIndex":
+        with open(os.path.join(index_dir, META_FILE), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        embedder = embedder or get_embedder(state["embedder"], dim=state["dim"])
+        if embedder.dim != state["dim"]:
+            raise ValueError(f"Embedder dim {embedder.dim} does not match index dim {state['dim']}")
+
+        clause_index = cls(embedder)
+        clause_index.index = faiss.read_index(os.path.join(index_dir, INDEX_FILE))
+        clause_index.next_id = state["next_id"]
+        clause_index.meta = {int(k): v for k, v in state["meta"].items()}
+        clause_index.ids_by_clause = {
+            meta["clause_id"]: vec_id for vec_id, meta in clause_index.meta.items() if meta.get("clause_id")
+        }
+        return clause_index
+
+
+def read_jsonl(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_vec_db_idx(jsonl_path: str, clause_index: ClauseIndex, merged_into: Optional[dict] = None) -> int:
+    """
+    Fill the `vec_db_idx` field of every record in `jsonl_path`. A record deduplicated
+    into another (`merged_into`, by `clause_id`) gets that record's vector. Returns the
+    records updated.
+    """
+    merged_into = merged_into or {}
+    records = read_jsonl(jsonl_path)
+    updated = 0
+    for record in records:
+        clause_id = record.get("clause_id")
+        vec_id = clause_index.ids_by_clause.get(merged_into.get(clause_id, clause_id))
+        if record.get("vec_db_idx") != vec_id:
+            record["vec_db_idx"] = vec_id
+            updated += 1
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(jsonl_path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, jsonl_path)
+    return updated
+
+
+_default_index: Optional[ClauseIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_clause_index(index_dir: str = CLAUSE_INDEX_DIR) -> ClauseIndex:
+    """Process-wide index loaded from `index_dir` on first use (empty if not built yet)."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            if os.path.exists(os.path.join(index_dir, META_FILE)):
+                _default_index = ClauseIndex.load(index_dir)
+            else:
+                _default_index = ClauseIndex()
+        return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local clause index.")
+    parser.add_argument("--index-dir", default=CLAUSE_INDEX_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index every clause of a JSONL file and fill vec_db_idx")
+    build.add_argument("jsonl", nargs="?", default=os.path.join("s3_data", "index.jsonl"))
+    build.add_argument("--embedder", default=None)
+    build.add_argument("--dedupe", action="store_true", help="Index one record per duplicated clause")
+    search = commands.add_parser("search", help="Top-k search")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        records = read_jsonl(args.jsonl)
+        merged_into = {}
+        if args.dedupe:
+            from retrieval.Dedup import dedupe_records
+
+            records, merged_into = dedupe_records(records)
+            print(f"✅ {len(records) + len(merged_into)} records, {len(records)} after deduplication")
+        clause_index = ClauseIndex(get_embedder(args.embedder))
+        clause_index.add(records)
+        clause_index.save(args.index_dir)
+        updated = write_vec_db_idx(args.jsonl, clause_index, merged_into)
+        print(f"✅ Indexed {len(clause_index)} clauses in {time.perf_counter() - start:.2f}s, {updated} records updated")
+    else:
+        clause_index = ClauseIndex.load(args.index_dir)
+        start = time.perf_counter()
+        hits = clause_index.search(args.query, k=args.k)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"{hit['score']:.3f}  [{hit['area']}] {hit['doc_name']}: {hit['clause_text'][:100]}")
+        print(f"⏱️ {elapsed_ms:.2f} ms")
@@ -0,0 +1,296 @@
+"""
+Compact, column-oriented loader and query engine for `s3_data/index.jsonl`.
+
+The JSONL is streamed line by line; records are never kept as dicts. Repeated strings
+(doc ids, names, areas, statuses and duplicated clause texts) are dictionary-encoded,
+clause ids are packed as 16-byte UUIDs and timestamps as integer microseconds.
+Secondary indexes on the categorical columns answer filters such as
+"pending compliance clauses for doc X" by intersecting posting lists instead of
+scanning every row. A deduplicated clause (retrieval/Dedup.py) may have several
+`areas`; it is found by an `area` filter on any of them.
+"""
+import json
+import uuid
+from array import array
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+# Dictionary-encoded columns with a secondary index each
+CATEGORICAL = ("doc_id", "doc_name", "area", "status")
+FIELDS = (
+    "doc_id", "doc_name", "vec_db_idx", "status", "area", "areas", "clause_id",
+    "clause_text", "created_at", "updated_at", "linked_docs",
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(value: Optional[str]) -> int:
+    if not value:
+        return -1
+    delta = datetime.fromisoformat(value) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> Optional[str]:
+    if value < 0:
+        return None
+    seconds, micros = divmod(value, 1_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=micros).isoformat()
+
+
+class StringColumn:
+    """Dictionary-encoded string column: one interned copy per distinct value."""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self):
+        self.values: list = []
+        self.codes = array("I")
+        self._lookup: dict = {}
+
+    def code_of(self, value) -> Optional[int]:
+        return self._lookup.get(value)
+
+    def encode(self, value) -> int:
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self._lookup[value] = code
+            self.values.append(value)
+        return code
+
+    def append(self, value) -> int:
+        code = self.encode(value)
+        self.codes.append(code)
+        return code
+
+    def set(self, row: int, value) -> int:
+        code = self.encode(value)
+        self.codes[row] = code
+        return code
+
+    def __getitem__(self, row: int):
+        return self.values[self.codes[row]]
+
+
+class ClauseStore:
+    """
+    In-memory columnar store of clause records with secondary indexes.
+
+    Use `ClauseStore.from_jsonl(path)` to load, `query(...)` to filter and
+    `record(row)` / `records(rows)` to materialize dicts in the original JSONL format.
+    """
+
+    def __init__(self):
+        self.columns = {name: StringColumn() for name in CATEGORICAL}
+        self.clause_text = StringColumn()
+        self.clause_ids = bytearray()
+        self.odd_clause_ids: dict[int, str] = {}  # ids that are not UUIDs
+        self.vec_db_idx = array("q")
+        self.created_at = array("q")
+        self.updated_at = array("q")
+        self.linked_docs: dict[int, list] = {}  # almost always empty
+        self.areas: dict[int, list] = {}  # rows with more areas than `area`, from deduplication
+        self.indexes: dict[str, dict[int, array]] = {name: {} for name in CATEGORICAL}
+        self.rows_by_clause_id: dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.vec_db_idx)
+
+    # ---------------------------
+    # Loading
+    # ---------------------------
+    def append(self, record: dict) -> int:
+        row = len(self)
+        for name in CATEGORICAL:
+            code = self.columns[name].append(record.get(name))
+            self.indexes[name].setdefault(code, array("I")).append(row)
+        self.clause_text.append(record.get("clause_text"))
+        self._set_areas(row, record.get("areas"))
+
+        clause_id = record.get("clause_id") or ""
+        try:
+            key = uuid.UUID(clause_id).bytes
+        except ValueError:
+            key = row.to_bytes(16, "big")
+            self.odd_clause_ids[row] = clause_id
+        self.clause_ids += key
+        self.rows_by_clause_id[key] = row
+
+        vec_db_idx = record.get("vec_db_idx")
+        self.vec_db_idx.append(-1 if vec_db_idx is None else vec_db_idx)
+        self.created_at.append(_to_micros(record.get("created_at")))
+        self.updated_at.append(_to_micros(record.get("updated_at")))
+        if record.get("linked_docs"):
+            self.linked_docs[row] = record["linked_docs"]
+        return row
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def _extra_areas(self, row: int) -> list:
+        primary = self.columns["area"][row]
+        return [area for area in self.areas.get(row, ()) if area != primary]
+
+    def _has_area(self, row: int, codes: set) -> bool:
+        column = self.columns["area"]
+        return column.codes[row] in codes or any(column.code_of(area) in codes for area in self.areas.get(row, ()))
+
+    def _set_areas(self, row: int, areas: Optional[list]) -> None:
+        """Record the areas of a row besides `area`, posting the row under each of them."""
+        postings = self.indexes["area"]
+        for area in self._extra_areas(row):
+            postings[self.columns["area"].code_of(area)].remove(row)
+        self.areas.pop(row, None)
+        if not areas or list(areas) == [self.columns["area"][row]]:
+            return
+        self.areas[row] = list(areas)
+        for area in self._extra_areas(row):
+            posting = postings.setdefault(self.columns["area"].encode(area), array("I"))
+            posting.append(row)
+            if len(posting) > 1 and posting[-2] > row:
+                postings[self.columns["area"].code_of(area)] = array("I", sorted(posting))
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "ClauseStore":
+        """Stream a JSONL file into a new store."""
+        store = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    store.append(json.loads(line))
+        return store
+
+    # ---------------------------
+    # Access
+    # ---------------------------
+    def clause_id(self, row: int) -> str:
+        if row in self.odd_clause_ids:
+            return self.odd_clause_ids[row]
+        return str(uuid.UUID(bytes=bytes(self.clause_ids[row * 16:row * 16 + 16])))
+
+    def row_of(self, clause_id: str) -> Optional[int]:
+        try:
+            key = uuid.UUID(clause_id).bytes
+        except ValueError:
+            return next((row for row, cid in self.odd_clause_ids.items() if cid == clause_id), None)
+        return self.rows_by_clause_id.get(key)
+
+    def get(self, row: int, field: str):
+        if field in self.columns:
+            return self.columns[field][row]
+        if field == "clause_text":
+            return self.clause_text[row]
+        if field == "clause_id":
+            return self.clause_id(row)
+        if field == "vec_db_idx":
+            value = self.vec_db_idx[row]
+            return None if value < 0 else value
+        if field in ("created_at", "updated_at"):
+            return _from_micros(getattr(self, field)[row])
+        if field == "linked_docs":
+            return list(self.linked_docs.get(row, []))
+        if field == "areas":
+            if row in self.areas:
+                return list(self.areas[row])
+            area = self.columns["area"][row]
+            return [] if area is None else [area]
+        raise KeyError(field)
+
+    def record(self, row: int) -> dict:
+        """Materialize one row as a dict, in the JSONL field order."""
+        return {field: self.get(row, field) for field in FIELDS}
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> Iterator[dict]:
+        for row in (range(len(self)) if rows is None else rows):
+            yield self.record(row)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def query(self, **filters) -> list[int]:
+        """
+        Row ids matching every `field=value` filter on the indexed columns
+        (doc_id, doc_name, area, status), in load order. A value may also be a
+        set/list/tuple of accepted values. `area` matches any of a row's `areas`.
+
+        Example:
+            store.query(doc_id="28a6...", area="compliance", status="pending")
+        """
+        if not filters:
+            return list(range(len(self)))
+
+        # Candidate rows come from the shortest posting list only; the other filters are
+        # checked against the column codes of those rows, so the cost is O(smallest match).
+        wanted_codes = {}
+        for field, wanted in filters.items():
+            if field not in self.indexes:
+                raise KeyError(f"'{field}' is not indexed. Indexed fields: {', '.join(CATEGORICAL)}")
+            values = wanted if isinstance(wanted, (set, list, tuple, frozenset)) else [wanted]
+            codes = {self.columns[field].code_of(value) for value in values} - {None}
+            if not codes:
+                return []
+            wanted_codes[field] = codes
+
+        def posting_size(field):
+            return sum(len(self.indexes[field].get(code, ())) for code in wanted_codes[field])
+
+        driver = min(wanted_codes, key=posting_size)
+        candidates = sorted({
+            row for code in wanted_codes[driver] for row in self.indexes[driver].get(code, ())
+        })
+        # A row with several areas may match on one that is not in the `area` column
+        multi_area = driver != "area" and "area" in wanted_codes and bool(self.areas)
+        checks = [
+            (self.columns[field].codes, codes) for field, codes in wanted_codes.items()
+            if field != driver and not (multi_area and field == "area")
+        ]
+        if multi_area:
+            candidates = [row for row in candidates if self._has_area(row, wanted_codes["area"])]
+        return [row for row in candidates if all(codes[row] in accepted for codes, accepted in checks)]
+
+    def count(self, field: str) -> dict:
+        """Number of rows per distinct value of an indexed column."""
+        column = self.columns[field]
+        return {column.values[code]: len(rows) for code, rows in self.indexes[field].items()}
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+    def set_field(self, row: int, field: str, value) -> None:
+        """Update one field of a row in place, keeping the secondary indexes consistent."""
+        if field == "areas":
+            self._set_areas(row, value)
+        elif field in self.columns:
+            areas = self.areas.get(row) if field == "area" else None
+            if areas:
+                self._set_areas(row, None)
+            old_code = self.columns[field].codes[row]
+            self.indexes[field][old_code].remove(row)
+            code = self.columns[field].set(row, value)
+            posting = self.indexes[field].setdefault(code, array("I"))
+            posting.append(row)
+            if len(posting) > 1 and posting[-2] > row:
+                self.indexes[field][code] = array("I", sorted(posting))
+            if areas:
+                self._set_areas(row, areas)
+        elif field == "clause_text":
+            self.clause_text.set(row, value)
+        elif field == "vec_db_idx":
+            self.vec_db_idx[row] = -1 if value is None else value
+        elif field in ("created_at", "updated_at"):
+            getattr(self, field)[row] = _to_micros(value)
+        elif field == "linked_docs":
+            if value:
+                self.linked_docs[row] = value
+            else:
+                self.linked_docs.pop(row, None)
+        else:
+            raise KeyError(field)
+
+    def to_jsonl(self, path: str, rows: Optional[Iterable[int]] = None) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records(rows):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,232 @@
+"""
+Deduplication of extracted clauses, before they are indexed or validated.
+
+Clauses with the same words (case, spacing, punctuation and bullets ignored) are
+collapsed into one clause whose `areas` lists every area it was extracted under.
+Records are only merged within one document (`doc_id`), so provenance is kept.
+
+With `DEDUP_THRESHOLD` below 1, near-duplicates are merged as well: found with
+MinHash signatures over word shingles and LSH banding, and merged when the Jaccard
+similarity of their shingles reaches the threshold. A single word can change a
+clause's meaning ("… e-mail; fotos"), so this is off by default.
+
+    python -m retrieval.Dedup s3_data/index.jsonl --index-dir vector_index
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+from typing import Optional
+
+from utils.clauseMerge import clause_key
+
+# Shingle Jaccard similarity from which two clauses are merged; 1.0 merges same-word clauses only
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "1.0"))
+# MinHash signature length and LSH bands (rows per band = DEDUP_NUM_PERM // DEDUP_BANDS)
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+
+SHINGLE_WORDS = 3
+
+# Words, numbers and the symbols that change their meaning ("Cost%" is not "Cost")
+_WORD = re.compile(r"[\w%$€£§]+", re.UNICODE)
+_PRIME = (1 << 31) - 1
+
+
+def words_key(text: str) -> str:
+    """Comparison key of a clause text: its words, lowercased, without punctuation or bullets."""
+    return " ".join(_WORD.findall(clause_key(text)))
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[str]:
+    """Word `size`-grams of the text; a text shorter than `size` words is one shingle."""
+    words = _WORD.findall(clause_key(text))
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signatures(shingle_sets: list[set[str]], num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+    """One MinHash signature (`num_perm` values) per shingle set, as a (len, num_perm) array."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+    signatures = np.full((len(shingle_sets), num_perm), _PRIME, dtype=np.int64)
+    for row, shingle_set in enumerate(shingle_sets):
+        if not shingle_set:
+            continue
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingle_set), dtype=np.int64)
+        signatures[row] = ((np.outer(a, hashes) + b[:, None]) % _PRIME).min(axis=1)
+    return signatures
+
+
+def _jaccard(first: set, second: set) -> float:
+    return len(first & second) / len(first | second) if first or second else 1.0
+
+
+def duplicate_groups(texts: list[str], threshold: float = DEDUP_THRESHOLD, scopes: Optional[list] = None) -> list[list[int]]:
+    """
+    Group the indexes of `texts` that are duplicates of each other.
+
+    Exact duplicates (same `words_key`) always share a group; with `threshold` < 1,
+    texts whose shingle Jaccard similarity reaches `threshold` are merged too, found as
+    LSH candidates and confirmed on their shingle sets. Texts with different `scopes`
+    (e.g. doc ids) are never grouped. Empty texts stay alone.
+
+    Returns:
+        list[list[int]]: Every index exactly once; groups are in order of their first
+            member and members in input order.
+    """
+    scopes = scopes if scopes is not None else [None] * len(texts)
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    first_of: dict[tuple, int] = {}
+    for i, (text, scope) in enumerate(zip(texts, scopes)):
+        key = words_key(text or "")
+        if key:
+            union(i, first_of.setdefault((scope, key), i))
+
+    # Near-duplicates, among one text per exact group
+    unique = sorted(set(first_of.values()))
+    if threshold < 1.0 and len(unique) > 1:
+        shingle_sets = [shingles(texts[i]) for i in unique]
+        signatures = minhash_signatures(shingle_sets)
+        rows = max(1, signatures.shape[1] // DEDUP_BANDS)
+        checked = set()
+        for band in range(0, signatures.shape[1], rows):
+            buckets: dict[tuple, list[int]] = {}
+            for position, i in enumerate(unique):
+                key = (scopes[i], signatures[position, band:band + rows].tobytes())
+                buckets.setdefault(key, []).append(position)
+            for bucket in buckets.values():
+                for x, first in enumerate(bucket):
+                    for second in bucket[x + 1:]:
+                        if (first, second) in checked:
+                            continue
+                        checked.add((first, second))
+                        if _jaccard(shingle_sets[first], shingle_sets[second]) >= threshold:
+                            union(unique[first], unique[second])
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+def _areas(item: dict) -> list:
+    return item.get("areas") or ([item["area"]] if item.get("area") else [])
+
+
+def _union(lists) -> list:
+    merged = []
+    for values in lists:
+        merged.extend(value for value in values if value not in merged)
+    return merged
+
+
+def dedupe_clauses(clauses: list[dict], threshold: float = DEDUP_THRESHOLD) -> list[dict]:
+    """
+    Collapse duplicated clauses as extracted by `ClausesAgent` (clause_text, area,
+    relevance). Each group keeps its most relevant clause, with the highest relevance
+    and `areas` holding the areas of the whole group, the kept clause's first.
+    """
+    merged = []
+    for group in duplicate_groups([clause.get("clause_text", "") for clause in clauses], threshold):
+        members = [clauses[i] for i in group]
+        kept = max(members, key=lambda clause: clause.get("relevance", 0))
+        if len(members) == 1:
+            merged.append(kept)
+            continue
+        areas = _union([_areas(kept)] + [_areas(clause) for clause in members])
+        merged.append({**kept, "areas": areas})
+    return merged
+
+
+def dedupe_records(records: list[dict], threshold: float = DEDUP_THRESHOLD) -> tuple[list[dict], dict[str, str]]:
+    """
+    Collapse duplicated `s3_data/index.jsonl` records of the same document.
+
+    Each group keeps its first record (so its `clause_id` and vector survive), with
+    `area` unchanged, `areas` the areas of the whole group, the earliest `created_at`,
+    the latest `updated_at` and the union of `linked_docs`.
+
+    Returns:
+        tuple[list[dict], dict[str, str]]: The records kept, in input order, and the
+            `clause_id` each dropped record was merged into.
+    """
+    kept_records = []
+    merged_into = {}
+    groups = duplicate_groups(
+        [record.get("clause_text") or "" for record in records], threshold, [record.get("doc_id") for record in records]
+    )
+    for group in groups:
+        members = [records[i] for i in group]
+        kept = dict(members[0])
+        if len(members) > 1:
+            kept["areas"] = _union(_areas(record) for record in members)
+            created = [record["created_at"] for record in members if record.get("created_at")]
+            updated = [record["updated_at"] for record in members if record.get("updated_at")]
+            kept["created_at"] = min(created) if created else kept.get("created_at")
+            kept["updated_at"] = max(updated) if updated else kept.get("updated_at")
+            kept["linked_docs"] = _union(record.get("linked_docs") or [] for record in members)
+            for record in members[1:]:
+                merged_into[record.get("clause_id")] = kept.get("clause_id")
+        kept_records.append(kept)
+    return kept_records, merged_into
+
+
+def dedupe_file(jsonl_path: str, threshold: float = DEDUP_THRESHOLD, dry_run: bool = False) -> dict:
+    """
+    Deduplicate the records of a JSONL index in place (atomically).
+
+    Returns:
+        dict: Records before and after, and the `clause_id` merges made.
+    """
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    kept, merged_into = dedupe_records(records, threshold)
+    if merged_into and not dry_run:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(jsonl_path)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for record in kept:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, jsonl_path)
+    return {"records": len(records), "kept": len(kept), "merged_into": merged_into}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collapse duplicated and near-duplicated clauses of a JSONL index.")
+    parser.add_argument("jsonl", nargs="?", default=os.path.join("s3_data", "index.jsonl"))
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD, help="Jaccard similarity to merge; 1.0 for exact duplicates only")
+    parser.add_argument("--index-dir", default=None, help="Also remove merged clauses from this local vector index")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = dedupe_file(args.jsonl, args.threshold, args.dry_run)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {stats['records']} records -> {stats['kept']} ({len(stats['merged_into'])} merged) in {elapsed:.2f}s")
+
+    if args.index_dir and stats["merged_into"] and not args.dry_run:
+        from retrieval.ClauseIndex import ClauseIndex
+
+        clause_index = ClauseIndex.load(args.index_dir)
+        removed = clause_index.remove(stats["merged_into"])
+        clause_index.save(args.index_dir)
+        print(f"✅ {removed} vectors removed from {args.index_dir}")
@@ -0,0 +1,88 @@
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+from utils.awsClients import get_client
+
+# Embedder used by the local clause index: "hashing" (offline, deterministic) or "bedrock"
+CLAUSE_EMBEDDER = os.getenv("CLAUSE_EMBEDDER", "hashing")
+BEDROCK_EMBEDDING_MODEL = os.getenv("BEDROCK_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline embedder based on feature hashing.
+
+    Words and character trigrams are hashed into `dim` buckets with a signed hash and the
+    vector is L2-normalized, so inner product is cosine similarity. There is no model to
+    download and the same text always maps to the same vector, which makes it suitable
+    for tests and for sub-millisecond query embedding.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        features = list(words)
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                value = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, value % self.dim] += 1.0 if value & 0x80000000 else -1.0
+        return _normalize(vectors)
+
+
+class BedrockEmbedder:
+    """Embeddings from a Bedrock embedding model (Titan Text Embeddings v2 by default)."""
+
+    name = "bedrock"
+
+    def __init__(self, model_id: str = BEDROCK_EMBEDDING_MODEL, dim: int = 1024, region: str = None):
+        self.model_id = model_id
+        self.dim = dim
+        self.region = region
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        client = get_client("bedrock-runtime", self.region)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            response = client.invoke_model(
+                modelId=self.model_id,
+                body=json.dumps({"inputText": text, "dimensions": self.dim, "normalize": True}),
+            )
+            vectors[row] = json.loads(response["body"].read())["embedding"]
+        return _normalize(vectors)
+
+
+EMBEDDERS = {
+    HashingEmbedder.name: HashingEmbedder,
+    BedrockEmbedder.name: BedrockEmbedder,
+}
+
+
+def get_embedder(name: str = None, **kwargs):
+    """Build an embedder by name (default: $CLAUSE_EMBEDDER)."""
+    name = name or CLAUSE_EMBEDDER
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder '{name}'. Available: {', '.join(EMBEDDERS)}")
+    return EMBEDDERS[name](**kwargs)
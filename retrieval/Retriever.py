@@ -0,0 +1,83 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from utils.awsClients import get_client
+from utils.tracing import traced
+
+KB_NUMBER_OF_RESULTS = 5
+
+
+def retrieval_engine() -> str:
+    """
+    "bedrock" queries the Bedrock Knowledge Base, "local" the FAISS clause index (retrieval/ClauseIndex.py).
+    Read on every call, so a RETRIEVAL_ENGINE set from .env after import is honoured.
+    """
+    return os.getenv("RETRIEVAL_ENGINE", "bedrock")
+
+
+def filter_results_by_score(results: List[Dict[str, Any]], min_score: float) -> List[Dict[str, Any]]:
+    """Keep the Knowledge Base results whose score is at least `min_score`."""
+    return [result for result in results if result.get("score", 0.0) >= min_score]
+
+
+def _knowledge_base_results(text: str, min_score: float) -> List[Dict[str, Any]]:
+    kb_id = os.getenv("KNOWLEDGE_BASE_ID")
+    region_name = os.getenv("AWS_REGION", "us-east-1")
+    response = get_client("bedrock-agent-runtime", region_name).retrieve(
+        retrievalQuery={"text": text},
+        knowledgeBaseId=kb_id,
+        retrievalConfiguration={
+            "vectorSearchConfiguration": {"numberOfResults": KB_NUMBER_OF_RESULTS},
+        },
+    )
+    return filter_results_by_score(response.get("retrievalResults", []), min_score)
+
+
+def default_min_score() -> float:
+    """
+    MIN_SCORE when set; otherwise 0.4 for the Knowledge Base and no threshold for the
+    local index, whose hashing-embedder scores are on a lower scale.
+    """
+    if os.getenv("MIN_SCORE"):
+        return float(os.getenv("MIN_SCORE"))
+    return 0.0 if retrieval_engine() == "local" else 0.4
+
+
+@traced(kind="retrieval")
+def retrieve_documents(text: str, number_of_results: int = 10, min_score: Optional[float] = None) -> List[str]:
+    """
+    Names of the documents (PDF file names) relevant to `text`, best match first.
+    `min_score` defaults to `default_min_score()`.
+    """
+    min_score = default_min_score() if min_score is None else min_score
+    documents_names = []
+    if retrieval_engine() == "local":
+        from retrieval.ClauseIndex import get_clause_index  # loads faiss and numpy
+
+        for hit in get_clause_index().search(text, k=number_of_results, min_score=min_score):
+            name = (hit.get("doc_name") or "").split("/")[-1]
+            if name and name not in documents_names:
+                documents_names.append(name)
+        return documents_names
+
+    for result in _knowledge_base_results(text, min_score):
+        uri = result['location']['s3Location']['uri']
+        documents_names.append(uri.split("/")[-1])  # Extract filename from S3 URI
+    return documents_names
+
+
+@traced(kind="retrieval")
+def retrieve_context(text: str, number_of_results: int = 5, min_score: Optional[float] = None) -> str:
+    """
+    Text passages relevant to `text`, joined into a single context string for validation.
+    `min_score` defaults to `default_min_score()`.
+    """
+    min_score = default_min_score() if min_score is None else min_score
+    if retrieval_engine() == "local":
+        from retrieval.ClauseIndex import get_clause_index  # loads faiss and numpy
+
+        hits = get_clause_index().search(text, k=number_of_results, min_score=min_score)
+        return "\n\n".join(f"[{hit.get('doc_name')}] {hit['clause_text']}" for hit in hits)
+
+    results = _knowledge_base_results(text, min_score)
+    return "\n\n".join(result.get("content", {}).get("text", "") for result in results[:number_of_results])
@@ -1,6 +1,6 @@
 import os
-from io import BytesIO
-from docling.document_converter import DocumentConverter, DocumentStream
+from pathlib import Path
+from utils.converterPool import get_converter_pool
 
 os.environ['CURL_CA_BUNDLE'] = ''
 os.environ['REQUESTS_CA_BUNDLE'] = ''
@@ -16,10 +16,7 @@ def convert_pdf_to_markdown(file_path: str) -> str:
         str: Path to the converted Markdown file.
     """
     # try:
-    with open(file_path, "rb") as f:
-        source_stream = DocumentStream(name=file_path, stream=BytesIO(f.read()))
-    converter = DocumentConverter()
-    result = converter.convert(source_stream).document
+    result = get_converter_pool().convert(Path(file_path)).document
     markdown = result.export_to_markdown()
     
     md_file_path = file_path.rsplit(".", 1)[0] + ".md"
@@ -36,5 +33,6 @@ if __name__ == "__main__":
     try:
         md_file_path = convert_pdf_to_markdown(pdf_file_path)
         print(f"Converted Markdown file saved at: {md_file_path}")
+        print(get_converter_pool().stats())
     except RuntimeError as e:
         print(e)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import threading
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+# Connection pool, retry and timeout settings shared by every AWS client
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", "5"))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", "60"))
+# LLM responses take much longer than regular API calls
+BEDROCK_READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "300"))
+
+_clients: dict = {}
+_lock = threading.Lock()
+
+
+def client_config(read_timeout: Optional[float] = None) -> Config:
+    """botocore Config with the shared pool size, retry mode and timeouts."""
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        retries={"mode": AWS_RETRY_MODE, "max_attempts": AWS_MAX_ATTEMPTS},
+        connect_timeout=AWS_CONNECT_TIMEOUT,
+        read_timeout=read_timeout or AWS_READ_TIMEOUT,
+    )
+
+
+def get_client(service: str, region: Optional[str] = None):
+    """
+    Return the shared boto3 client for (service, region), creating it on first use.
+
+    boto3 clients are thread-safe, so one client (and its connection pool) is reused
+    by every agent and thread of the process instead of paying for client construction
+    and a new TLS handshake on each call. Clients are keyed by process id as well, so
+    a forked worker never reuses its parent's connections.
+    """
+    region = region or os.getenv("AWS_REGION", "us-east-1")
+    key = (service, region, os.getpid())
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            read_timeout = BEDROCK_READ_TIMEOUT if service.startswith("bedrock") else None
+            # boto3.client() uses a global default session that is not thread-safe
+            client = boto3.session.Session().client(service, region_name=region, config=client_config(read_timeout))
+            _clients[key] = client
+    return client
@@ -0,0 +1,49 @@
+import re
+
+_SPACES = re.compile(r"\s+")
+
+
+def clause_key(text: str) -> str:
+    """Comparison key of a clause text: case, spacing and final punctuation ignored."""
+    return _SPACES.sub(" ", text).strip().rstrip(".;:").casefold()
+
+
+def merge_clauses(clauses_by_document: dict[str, list[dict]]) -> list[dict]:
+    """
+    Merge the clauses extracted from several documents into one list, with provenance.
+
+    Clauses with the same text are kept once, with the highest relevance found, and
+    `documents` lists every document they come from, in the order of
+    `clauses_by_document` (best retrieved match first). The result is sorted by
+    relevance, ties broken by document order.
+
+    Args:
+        clauses_by_document (dict[str, list[dict]]): Clauses of each document, as returned
+            by `ClausesAgent.analyze_sections`.
+
+    Returns:
+        list[dict]: The merged clauses, each with a `documents` list.
+    """
+    merged: dict[str, dict] = {}
+    for rank, (document, clauses) in enumerate(clauses_by_document.items()):
+        for clause in clauses:
+            key = clause_key(clause.get("clause_text", ""))
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = {**clause, "documents": [document], "_rank": rank}
+                continue
+            kept = merged[key]
+            if document not in kept["documents"]:
+                kept["documents"].append(document)
+            if clause.get("relevance", 0) > kept.get("relevance", 0):
+                kept.update({k: v for k, v in clause.items() if k != "documents"})
+
+    ordered = sorted(merged.values(), key=lambda clause: (-clause.get("relevance", 0), clause["_rank"]))
+    return [{k: v for k, v in clause.items() if k != "_rank"} for clause in ordered]
+
+
+def format_sources(clause: dict) -> str:
+    """` [source: A, B]` for a clause with provenance, else an empty string."""
+    documents = clause.get("documents") or []
+    return f" [source: {', '.join(documents)}]" if documents else ""
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+
+@dataclass
+class TaskOutcome:
+    """Result of a single task run by `bounded_map`."""
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _timed_call(func: Callable, item: Any, started: dict, index: int):
+    started[index] = time.perf_counter()
+    return func(item)
+
+
+def bounded_map(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.05,
+) -> list[TaskOutcome]:
+    """
+    Run `func` over `items` on a thread pool with at most `max_workers` calls in flight.
+
+    Outcomes are returned in the same order as `items`, whatever order the calls finish in.
+    An exception raised by one call is stored in its outcome and does not affect the others.
+    When `timeout` is set, a call running longer than `timeout` seconds is reported with a
+    TimeoutError. Python threads cannot be killed, so the call keeps running in the background
+    but its result is discarded.
+
+    Args:
+        func (Callable): Function called once per item.
+        items (Iterable): Items to process.
+        max_workers (int): Maximum number of concurrent calls.
+        timeout (float | None): Per-call timeout in seconds, measured from when the call starts.
+        poll_interval (float): How often running calls are checked against the timeout.
+
+    Returns:
+        list[TaskOutcome]: One outcome per item, in input order.
+    """
+    items = list(items)
+    outcomes = [TaskOutcome(index=i, item=item) for i, item in enumerate(items)]
+    if not items:
+        return outcomes
+
+    started: dict[int, float] = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        pending = {
+            # Each call runs in a copy of the caller's context, so the memory session follows it
+            executor.submit(contextvars.copy_context().run, _timed_call, func, item, started, i): i
+            for i, item in enumerate(items)
+        }
+        while pending:
+            done, _ = wait(pending, timeout=poll_interval if timeout else None, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+
+            for future in done:
+                i = pending.pop(future)
+                outcomes[i].elapsed = now - started.get(i, now)
+                try:
+                    outcomes[i].result = future.result()
+                except BaseException as e:
+                    outcomes[i].error = e
+
+            if timeout is None:
+                continue
+            for future, i in list(pending.items()):
+                start = started.get(i)
+                if start is not None and now - start > timeout:
+                    pending.pop(future)
+                    future.cancel()
+                    outcomes[i].elapsed = now - start
+                    outcomes[i].error = TimeoutError(f"Call exceeded {timeout}s timeout")
+    finally:
+        # Do not block on calls that timed out; they finish on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return outcomes
+
+
+def _run_in_context(coroutine):
+    """Run `coroutine` to completion on a fresh event loop, in a copy of the caller's context."""
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, asyncio.run, coroutine).result()
+
+
+def call_agent(agent, prompt, **kwargs):
+    """
+    Call a strands `Agent` like `agent(prompt)`, but keep the caller's context.
+
+    `Agent.__call__` runs the event loop on a fresh thread, which starts with an empty
+    context; the agent's tools would then read and write the "default" memory session
+    instead of the caller's, and their spans would start a new trace.
+    """
+    return _run_in_context(agent.invoke_async(prompt, **kwargs))
+
+
+def structured_output(agent, output_model, prompt):
+    """`agent.structured_output(output_model, prompt)`, keeping the caller's context (see `call_agent`)."""
+    return _run_in_context(agent.structured_output_async(output_model, prompt))
+
+
+def stream_agent(agent, prompt, on_text: Callable[[str], None], **kwargs):
+    """
+    Like `call_agent`, but pass every text chunk to `on_text` as the model produces it.
+
+    Returns:
+        AgentResult: The agent's final result.
+    """
+    async def consume():
+        result = None
+        async for event in agent.stream_async(prompt, **kwargs):
+            if "data" in event:
+                on_text(event["data"])
+            elif "result" in event:
+                result = event["result"]
+        return result
+
+    return _run_in_context(consume())
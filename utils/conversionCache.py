@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from importlib import metadata
+from typing import Optional
+
+# Default location and size budget of the PDF -> Markdown conversion cache
+CONVERSION_CACHE_DIR = os.getenv("CONVERSION_CACHE_DIR", os.path.join(".cache", "markdown"))
+CONVERSION_CACHE_MAX_BYTES = int(os.getenv("CONVERSION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def docling_version() -> str:
+    try:
+        return metadata.version("docling")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks, without loading it whole into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    Content-addressed on-disk cache of PDF -> Markdown conversions.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the docling version and the
+    conversion options, so a byte-identical PDF uploaded under another name is a hit and
+    upgrading docling or changing options is a miss. The total size is kept under
+    `max_bytes` by evicting the least recently used entries (tracked through mtime).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = CONVERSION_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir or CONVERSION_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def make_key(self, pdf_path: str, options: Optional[dict] = None) -> str:
+        fingerprint = json.dumps(
+            {
+                "pdf": file_sha256(pdf_path),
+                "docling": docling_version(),
+                "options": options or {},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.md")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the path of the cached Markdown for `key`, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, markdown: str) -> str:
+        """Store `markdown` under `key` and return the entry path."""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def materialize(self, key: str, dest_path: str) -> Optional[str]:
+        """
+        Place the cached Markdown for `key` at `dest_path`.
+        A hard link is used when possible, falling back to a copy across filesystems.
+        The destination is replaced rather than rewritten, so the cache entry is never modified.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        try:
+            os.link(path, tmp_path)
+        except OSError:
+            shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".md"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+
+_default_cache: Optional[ConversionCache] = None
+
+
+def get_conversion_cache() -> ConversionCache:
+    """Process-wide cache instance, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ConversionCache()
+    return _default_cache
@@ -0,0 +1,131 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Number of docling converters kept warm per process
+DOCLING_POOL_SIZE = int(os.getenv("DOCLING_POOL_SIZE", "1"))
+
+
+class ConverterPool:
+    """
+    Process-wide pool of warmed-up docling `DocumentConverter` instances.
+
+    Building a converter and running its first conversion loads the layout/OCR models,
+    which costs far more than converting a typical policy. The pool creates converters
+    lazily, forces the model load once per converter, and hands each converter to one
+    caller at a time so concurrent ingestions never share pipeline state.
+    """
+
+    def __init__(self, size: int = DOCLING_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle: queue.Queue = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "converters": 0,
+            "model_load_seconds": 0.0,
+            "conversions": 0,
+            "pages": 0,
+            "convert_seconds": 0.0,
+            "wait_seconds": 0.0,
+        }
+
+    def _create_converter(self):
+        from docling.datamodel.base_models import InputFormat
+        from docling.document_converter import DocumentConverter
+
+        start = time.perf_counter()
+        converter = DocumentConverter()
+        converter.initialize_pipeline(InputFormat.PDF)  # loads the models now, not on first convert
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["converters"] += 1
+            self._stats["model_load_seconds"] += elapsed
+        print(f"🔥 Docling converter ready in {elapsed:.2f}s")
+        return converter
+
+    def _acquire(self):
+        start = time.perf_counter()
+        try:
+            converter = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    converter = self._create_converter()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                converter = self._idle.get()
+        with self._lock:
+            self._stats["wait_seconds"] += time.perf_counter() - start
+        return converter
+
+    @contextmanager
+    def converter(self):
+        """Borrow a converter for exclusive use."""
+        converter = self._acquire()
+        try:
+            yield converter
+        finally:
+            self._idle.put(converter)
+
+    def convert(self, source):
+        """
+        Convert `source` (path, URL or DocumentStream) with a pooled converter.
+
+        Returns:
+            ConversionResult: docling result; the Markdown is in `result.document`.
+        """
+        with self.converter() as converter:
+            start = time.perf_counter()
+            result = converter.convert(source)
+            elapsed = time.perf_counter() - start
+
+        pages = len(getattr(result, "pages", None) or [])
+        with self._lock:
+            self._stats["conversions"] += 1
+            self._stats["pages"] += pages
+            self._stats["convert_seconds"] += elapsed
+        print(f"📄 Converted {pages} pages in {elapsed:.2f}s")
+        return result
+
+    def warm_up(self, count: Optional[int] = None) -> None:
+        """Create and warm `count` converters (default: the whole pool) ahead of the first request."""
+        count = min(count or self.size, self.size)
+        borrowed = []
+        try:
+            while len(borrowed) < count and (self._created < self.size or not self._idle.empty()):
+                borrowed.append(self._acquire())
+        finally:
+            for converter in borrowed:
+                self._idle.put(converter)
+
+    def stats(self) -> dict:
+        """Time spent loading models versus converting pages."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["seconds_per_page"] = stats["convert_seconds"] / stats["pages"] if stats["pages"] else 0.0
+        return stats
+
+
+_default_pool: Optional[ConverterPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_converter_pool() -> ConverterPool:
+    """Process-wide converter pool, created on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConverterPool()
+        return _default_pool
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Optional
+
+from strands.models import Model
+
+from utils.tracing import set_attributes
+
+# Location, size and lifetime of the persistent LLM response cache
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm", "responses.sqlite"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# "1" sends every call to the model (responses are still stored)
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with runs of whitespace collapsed, so formatting-only differences share a key."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def normalize_messages(messages: list) -> list:
+    """Role and content of each message, with text blocks normalized and other blocks kept as-is."""
+    normalized = []
+    for message in messages or []:
+        blocks = []
+        for block in message.get("content", []):
+            if "text" in block:
+                blocks.append({"text": normalize_text(block["text"])})
+            else:
+                blocks.append(block)
+        normalized.append({"role": message.get("role"), "content": blocks})
+    return normalized
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of model responses.
+
+    Entries expire `ttl` seconds after they were stored, and the least recently used
+    ones are evicted once there are more than `max_entries`. Hits and misses are
+    counted per process.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL):
+        self.path = os.path.abspath(path or LLM_CACHE_PATH)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model_id TEXT, value TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    @staticmethod
+    def make_key(kind: str, config: dict, messages: list, system_prompt: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        fingerprint = json.dumps(
+            {
+                "kind": kind,
+                "config": config,
+                "messages": normalize_messages(messages),
+                "system": normalize_text(system_prompt or ""),
+                "schema": schema,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for `key`, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str, model_id: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model_id, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model_id, value, now, now),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used ones beyond `max_entries`."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class CachedModel(Model):
+    """
+    Wraps a strands model and answers repeated calls from an `LLMCache`.
+
+    Cached: `structured_output`, keyed on the model config (model id and sampling
+    parameters), the normalized prompt and the output schema; and `stream` calls
+    without tools, replayed event by event. Calls that offer tools reach the model,
+    since their answer depends on tool results.
+
+    Args:
+        model (Model): The wrapped model, e.g. a BedrockModel.
+        cache (LLMCache | None): Defaults to the process-wide cache.
+        bypass (bool): Always call the model; responses are still stored.
+    """
+
+    def __init__(self, model: Model, cache: Optional[LLMCache] = None, bypass: bool = LLM_CACHE_BYPASS):
+        self.model = model
+        self._cache = cache
+        self.bypass = bypass
+
+    @property
+    def cache(self) -> LLMCache:
+        return self._cache or get_llm_cache()
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def _model_id(self) -> str:
+        return str(self.get_config().get("model_id", ""))
+
+    async def structured_output(self, output_model, prompt, **kwargs):
+        key = self.cache.make_key("structured_output", self.get_config(), prompt, schema=output_model.model_json_schema())
+        cached = None if self.bypass else self.cache.get(key)
+        set_attributes(cache="bypass" if self.bypass else "hit" if cached is not None else "miss")
+        if cached is not None:
+            yield {"output": output_model.model_validate_json(cached)}
+            return
+
+        event = None
+        async for event in self.model.structured_output(output_model, prompt, **kwargs):
+            yield event
+        if event and "output" in event:
+            self.cache.put(key, event["output"].model_dump_json(), self._model_id())
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        if tool_specs:
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+
+        key = self.cache.make_key("stream", self.get_config(), messages, system_prompt)
+        cached = None if self.bypass else self.cache.get(key)
+        set_attributes(cache="bypass" if self.bypass else "hit" if cached is not None else "miss")
+        if cached is not None:
+            for event in json.loads(cached):
+                yield event
+            return
+
+        events = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append(event)
+            yield event
+        # Only complete answers are stored, not ones cut off by length or guardrails
+        if any(event.get("messageStop", {}).get("stopReason") == "end_turn" for event in events):
+            self.cache.put(key, json.dumps(events, ensure_ascii=False, default=str), self._model_id())
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache instance, created on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
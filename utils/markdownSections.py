@@ -0,0 +1,349 @@
+"""
+One-pass Markdown section splitter, by headings or by token-sized sliding windows.
+
+The document is scanned once, with a single regular expression over the UTF-8 bytes,
+for ATX headings (`#` to `######`) and code fences. The scan works the same on `bytes`
+and on an `mmap` of the file. Each section is recorded as byte offsets into the
+document, not as a copy of its text, together with its heading level and the titles
+of the headings that enclose it. Text before the first heading is kept as a preamble
+section. Headings inside fenced code blocks are ignored.
+
+Sliding windows are sized in tokens and snap to paragraph or sentence boundaries.
+They can be saved as offsets into the Markdown file instead of overlapping copies of
+its text; `open_sections` materializes them from a memory-mapped Markdown file.
+Offsets are into the bytes of the file, so it is read with `read_markdown`, which
+keeps CRLF line endings and a BOM as they are.
+
+    python -m utils.markdownSections markdown/X.md sections/title_X.jsonl --levels 1 2 3
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from utils.conversionCache import file_sha256
+from utils.sectionPacker import CHARS_PER_TOKEN
+
+# Heading levels that start a section; deeper headings stay in their parent's content
+SPLITTER_HEADING_LEVELS = tuple(
+    int(level) for level in os.getenv("SPLITTER_HEADING_LEVELS", "1,2,3").split(",") if level.strip()
+)
+
+PREAMBLE_TITLE = "Preamble"
+
+# Share of a window, at its end, searched for a paragraph or sentence boundary to cut at
+WINDOW_SNAP_FRACTION = 0.25
+
+_SENTENCE_ENDS = (b". ", b".\n", b"! ", b"!\n", b"? ", b"?\n", b"; ", b";\n")
+
+_BOM = b"\xef\xbb\xbf"
+
+_LINE = re.compile(
+    rb"^(?:\xef\xbb\xbf)? {0,3}(?:(?P<hashes>#{1,6})(?:[ \t]+(?P<title>[^\r\n]*?))?(?:[ \t]+#+)?[ \t]*\r?$|(?P<fence>```|~~~))",
+    re.MULTILINE,
+)
+
+
+@dataclass
+class SectionSpan:
+    index: int
+    title: str
+    level: int              # 0 for the preamble
+    path: tuple             # titles of the enclosing headings, outermost first
+    heading_start: int      # byte offset of the heading line
+    start: int              # byte offset of the content, after the heading line
+    end: int                # byte offset where the next section's heading starts
+
+    def content(self, buffer) -> str:
+        return bytes(buffer[self.start:self.end]).decode("utf-8", errors="replace")
+
+    def to_section(self, buffer) -> dict:
+        """The section in the format of the `sections/*.json` files, plus its level, path and offsets."""
+        return {
+            "title": self.title,
+            "content": self.content(buffer),
+            "level": self.level,
+            "path": list(self.path),
+            "start": self.start,
+            "end": self.end,
+        }
+
+
+def _content_start(buffer) -> int:
+    """Offset of the text, after a UTF-8 BOM if the document starts with one."""
+    return len(_BOM) if bytes(buffer[:len(_BOM)]) == _BOM else 0
+
+
+def iter_section_spans(buffer, levels: Optional[tuple] = None, preamble: bool = True) -> Iterator[SectionSpan]:
+    """
+    Yield the sections of the Markdown in `buffer` (bytes or mmap) in document order.
+    A heading whose level is in `levels` starts a new section. The preamble is only
+    yielded when it holds more than whitespace.
+    """
+    levels = set(levels or SPLITTER_HEADING_LEVELS)
+    size = len(buffer)
+    origin = _content_start(buffer)
+    stack: list[tuple[int, str]] = []
+    fence = None
+    current: Optional[SectionSpan] = None
+    index = 0
+
+    for match in _LINE.finditer(buffer):
+        if match["fence"]:
+            if fence is None:
+                fence = match["fence"]
+            elif match["fence"] == fence:
+                fence = None
+            continue
+        level = len(match["hashes"])
+        if fence is not None or level not in levels:
+            continue
+
+        heading_start = match.start()
+        if current is not None:
+            current.end = heading_start
+            yield current
+            index += 1
+        elif preamble and heading_start and bytes(buffer[origin:heading_start]).strip():
+            yield SectionSpan(index, PREAMBLE_TITLE, 0, (), 0, origin, heading_start)
+            index += 1
+
+        title = (match["title"] or b"").decode("utf-8", errors="replace").strip()
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        newline = buffer.find(b"\n", match.end())
+        current = SectionSpan(
+            index=index,
+            title=title,
+            level=level,
+            path=tuple(t for _, t in stack),
+            heading_start=heading_start,
+            start=size if newline < 0 else newline + 1,
+            end=size,
+        )
+        stack.append((level, title))
+
+    if current is not None:
+        yield current
+    elif preamble and size and bytes(buffer[origin:size]).strip():
+        yield SectionSpan(index, PREAMBLE_TITLE, 0, (), 0, origin, size)
+
+
+def _char_boundary(buffer, offset: int, low: int) -> int:
+    """Move `offset` back to the start of a UTF-8 character (not below `low`)."""
+    while offset > low and (buffer[offset] & 0xC0) == 0x80:
+        offset -= 1
+    return offset
+
+
+def _snap_end(buffer, start: int, target: int, size: int) -> int:
+    """End of the window starting at `start`: the last paragraph, sentence or word break before `target`."""
+    if target >= size:
+        return size
+    low = max(start + 1, target - int((target - start) * WINDOW_SNAP_FRACTION))
+    cut = buffer.rfind(b"\n\n", low, target)
+    if cut >= 0:
+        return cut + 2
+    cut = buffer.rfind(b"\n\r\n", low, target)
+    if cut >= 0:
+        return cut + 3
+    cut = max(buffer.rfind(end, low, target) for end in _SENTENCE_ENDS)
+    if cut >= 0:
+        return cut + 2
+    cut = max(buffer.rfind(b" ", low, target), buffer.rfind(b"\n", low, target))
+    if cut >= 0:
+        return cut + 1
+    return _char_boundary(buffer, target, start + 1)
+
+
+def _snap_start(buffer, start: int, end: int, overlap: int) -> int:
+    """Start of the window after `end`: the first sentence (or word) start in the last `overlap` bytes."""
+    target = end - overlap
+    if overlap <= 0 or target <= start:
+        return end
+    found = [position for position in (buffer.find(end_, target, end) for end_ in _SENTENCE_ENDS) if position >= 0]
+    if found:
+        return min(found) + 2
+    position = buffer.find(b" ", target, end)
+    if position >= 0:
+        return position + 1
+    return _char_boundary(buffer, target, start + 1)
+
+
+def iter_window_spans(buffer, window_tokens: int, overlap_tokens: int) -> Iterator[SectionSpan]:
+    """
+    Yield sliding windows of about `window_tokens` tokens over `buffer` (bytes or mmap),
+    consecutive windows sharing up to `overlap_tokens` tokens. Window ends snap back to a
+    paragraph, sentence or word break, and starts snap forward to a sentence start, so
+    windows never cut a word or a UTF-8 character.
+    """
+    if window_tokens <= 0 or overlap_tokens >= window_tokens:
+        raise ValueError("Overlap must be smaller than window size.")
+    window = window_tokens * CHARS_PER_TOKEN
+    overlap = max(0, overlap_tokens) * CHARS_PER_TOKEN
+    size = len(buffer)
+    start, index = _content_start(buffer), 0
+    while start < size:
+        end = _snap_end(buffer, start, start + window, size)
+        yield SectionSpan(index, f"Section {index + 1}", 0, (), start, start, end)
+        if end >= size:
+            break
+        start, index = _snap_start(buffer, start, end, overlap), index + 1
+
+
+def read_markdown(md_path: str) -> str:
+    """
+    The text of a Markdown file, exactly as stored: line endings are not translated and
+    a BOM is kept, so offsets into `text.encode("utf-8")` are offsets into the file.
+    """
+    with open(md_path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def split_windows(text: str, window_tokens: int, overlap_tokens: int) -> list[dict]:
+    """Sliding windows of a Markdown string, with their text; offsets are into its UTF-8 encoding."""
+    buffer = text.encode("utf-8")
+    return [span.to_section(buffer) for span in iter_window_spans(buffer, window_tokens, overlap_tokens)]
+
+
+def offsets_payload(sections: list[dict], md_path: str) -> dict:
+    """
+    What a sections file holds when sections are stored as offsets: the Markdown file
+    name, its size and hash (to detect a Markdown changed since the split), and each
+    section without its text.
+    """
+    return {
+        **source_info(md_path),
+        "sections": [{key: value for key, value in section.items() if key != "content"} for section in sections],
+    }
+
+
+def source_info(md_path: str) -> dict:
+    return {
+        "source": os.path.basename(md_path),
+        "source_bytes": os.path.getsize(md_path),
+        "source_sha256": file_sha256(md_path),
+    }
+
+
+def check_source(md_path: str, info: dict, sections_file: str) -> None:
+    """Raise ValueError when the Markdown no longer matches `source_info` taken at split time."""
+    if os.path.getsize(md_path) != info["source_bytes"] or file_sha256(md_path) != info["source_sha256"]:
+        raise ValueError(f"{md_path} changed since {os.path.basename(sections_file)} was written; split it again.")
+
+
+class MappedSections:
+    """
+    Sections stored as offsets, read from a memory-mapped Markdown file. A section's
+    text is decoded when it is accessed, never kept.
+    """
+
+    def __init__(self, entries: list[dict], md_path: str):
+        self.entries = entries
+        self._file = open(md_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: int) -> dict:
+        entry = self.entries[index]
+        return {**entry, "content": bytes(self._buffer[entry["start"]:entry["end"]]).decode("utf-8", errors="replace")}
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self.entries)):
+            yield self[index]
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedSections":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_sections(sections_file: str, markdown_dir: str):
+    """
+    Sections of a sections file: a `SectionStore` for binary `.sections` stores
+    (utils/sectionStore.py); for JSON files, the list itself when sections carry their
+    text, or a `MappedSections` over `markdown_dir/<source>` when they are offsets.
+    All can be used in a `with` block.
+
+    Raises:
+        ValueError: The Markdown changed since the offsets were computed.
+    """
+    if sections_file.endswith(".sections"):
+        from utils.sectionStore import SectionStore
+
+        return SectionStore(sections_file, markdown_dir)
+    with open(sections_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return _ListSections(data)
+    md_path = os.path.join(markdown_dir, data["source"])
+    check_source(md_path, data, sections_file)
+    return MappedSections(data["sections"], md_path)
+
+
+class _ListSections(list):
+    def __enter__(self) -> "_ListSections":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+def split_sections(text: str, levels: Optional[tuple] = None, preamble: bool = True) -> list[dict]:
+    """Sections of a Markdown string; offsets are into its UTF-8 encoding."""
+    buffer = text.encode("utf-8")
+    return [span.to_section(buffer) for span in iter_section_spans(buffer, levels, preamble)]
+
+
+def count_headings(text: str, levels: Optional[tuple] = None) -> int:
+    """Headings of a Markdown string that start a section (at `levels`, outside code fences)."""
+    return sum(1 for _ in iter_section_spans(text.encode("utf-8"), levels, preamble=False))
+
+
+def write_sections_jsonl(md_path: str, jsonl_path: str, levels: Optional[tuple] = None, preamble: bool = True) -> int:
+    """
+    Split the Markdown file into `jsonl_path`, one section per line. The file is
+    memory-mapped and one section at a time is decoded, so memory stays bounded by the
+    largest section, whatever the size of the document. Returns the number of sections.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+    count = 0
+    with open(md_path, "rb") as source, open(jsonl_path, "w", encoding="utf-8") as out:
+        if os.fstat(source.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for span in iter_section_spans(buffer, levels, preamble):
+                out.write(json.dumps(span.to_section(buffer), ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def read_sections_jsonl(jsonl_path: str) -> Iterator[dict]:
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split a Markdown file into a JSONL file of sections.")
+    parser.add_argument("markdown", help="Markdown file")
+    parser.add_argument("output", help="JSONL file to write")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(SPLITTER_HEADING_LEVELS), help="Heading levels that start a section")
+    parser.add_argument("--no-preamble", action="store_true", help="Drop the text before the first heading")
+    args = parser.parse_args()
+
+    count = write_sections_jsonl(args.markdown, args.output, tuple(args.levels), not args.no_preamble)
+    print(f"✅ {count} sections written to {args.output}")
@@ -1,4 +1,9 @@
+import os
 from pathlib import Path
+from typing import Optional
+
+# "binary" writes memory-mapped section stores (utils/sectionStore.py), "json" the JSON section files
+SECTIONS_FORMAT = os.getenv("SECTIONS_FORMAT", "binary")
 
 def normalize_basename(filename: str) -> str:
     """Always strip path and extension."""
@@ -10,5 +15,14 @@ def make_pdf_name(basename: str) -> str:
 def make_md_name(basename: str) -> str:
     return f"{normalize_basename(basename)}.md"
 
-def make_sections_name(basename: str, method: str) -> str:
-    return f"{method}_{normalize_basename(basename)}.json"
\ No newline at end of file
+def make_sections_name(basename: str, method: str, sections_format: Optional[str] = None) -> str:
+    extension = "sections" if (sections_format or SECTIONS_FORMAT) == "binary" else "json"
+    return f"{method}_{normalize_basename(basename)}.{extension}"
+
+def find_sections_name(sections_dir: str, basename: str, method: str) -> Optional[str]:
+    """Name of the existing sections file of `basename` split by `method`, binary store first."""
+    for sections_format in ("binary", "json"):
+        name = make_sections_name(basename, method, sections_format)
+        if os.path.exists(os.path.join(sections_dir, name)):
+            return name
+    return None
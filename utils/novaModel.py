@@ -1,8 +1,74 @@
-from strands.models import BedrockModel
-
-NOVA_MODEL = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",
-    region_name="us-east-1",
-    temperature=0.2,
-    top_p=0.9,
-)
\ No newline at end of file
+import os
+import threading
+from typing import Any
+
+from strands.models import Model
+
+from utils.awsClients import client_config, BEDROCK_READ_TIMEOUT
+from utils.llmCache import CachedModel
+from utils.tracing import TracedModel
+
+# Bedrock model shared by every agent
+NOVA_MODEL_ID = os.getenv("NOVA_MODEL_ID", "amazon.nova-pro-v1:0")
+NOVA_REGION = os.getenv("NOVA_REGION", "us-east-1")
+
+_models: dict = {}
+_models_lock = threading.Lock()
+
+
+def build_model(model_id: str = NOVA_MODEL_ID, temperature: float = 0.2, top_p: float = 0.9) -> Model:
+    """
+    A new Bedrock model. Repeated prompts are answered from the local response cache
+    (utils/llmCache.py), and every request, cached or not, gets a tracing span.
+    """
+    from strands.models import BedrockModel
+
+    return TracedModel(CachedModel(BedrockModel(
+        model_id=model_id,
+        region_name=NOVA_REGION,
+        temperature=temperature,
+        top_p=top_p,
+        boto_client_config=client_config(BEDROCK_READ_TIMEOUT),
+    )))
+
+
+def get_model(**settings: Any) -> Model:
+    """Process-wide model for `settings` (see `build_model`), created on first use."""
+    key = tuple(sorted(settings.items()))
+    with _models_lock:
+        if key not in _models:
+            _models[key] = build_model(**settings)
+        return _models[key]
+
+
+class LazyModel(Model):
+    """
+    Placeholder for `get_model(**settings)` that can be created at import time. The
+    Bedrock model, with its boto3 client, is only built when an agent first uses it.
+    """
+
+    def __init__(self, **settings: Any):
+        self.settings = settings
+
+    @property
+    def model(self) -> Model:
+        return get_model(**self.settings)
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, **kwargs):
+        return self.model.structured_output(output_model, prompt, **kwargs)
+
+    def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        return self.model.stream(messages, tool_specs, system_prompt, **kwargs)
+
+
+NOVA_MODEL = LazyModel()
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+def section_hash(section: dict) -> str:
+    """Content hash of a section; whitespace at the ends of the content is ignored."""
+    payload = f"{section.get('title', '').strip()}\n{section.get('content', '').strip()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256((context or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+def hashes_path(sections_file: str) -> str:
+    """`sections/title_X.json` -> `sections/title_X.hashes.json`"""
+    return sections_file.rsplit(".", 1)[0] + ".hashes.json"
+
+
+def section_clauses_path(clauses_dir: str, base_name: str) -> str:
+    """Per-section clauses, kept next to `clauses/<base_name>.json`."""
+    return os.path.join(clauses_dir, f"{base_name}.sections.json")
+
+
+def read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: str, data) -> None:
+    """Write JSON atomically, so an interrupted run never leaves a truncated file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def diff_sections(old_hashes: list[dict], new_sections: list[dict]) -> dict:
+    """
+    Compare the stored hashes of a previous split with a new list of sections.
+
+    A section is `unchanged` when its hash was already present, `changed` when its
+    title existed with a different hash, and `new` otherwise. Old hashes that are no
+    longer present are `removed`.
+
+    Returns:
+        dict: Lists of section titles for new/changed/unchanged, and of removed hashes.
+    """
+    old_by_hash = {entry["hash"]: entry for entry in old_hashes}
+    old_titles = {entry["title"] for entry in old_hashes}
+    diff = {"new": [], "changed": [], "unchanged": [], "removed": []}
+
+    new_hashes = set()
+    for section in new_sections:
+        digest = section_hash(section)
+        new_hashes.add(digest)
+        title = section.get("title", "Untitled")
+        if digest in old_by_hash:
+            diff["unchanged"].append(title)
+        elif title in old_titles:
+            diff["changed"].append(title)
+        else:
+            diff["new"].append(title)
+    diff["removed"] = [digest for digest in old_by_hash if digest not in new_hashes]
+    return diff
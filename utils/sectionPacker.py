@@ -0,0 +1,110 @@
+import math
+import re
+
+# Rough size of a token for Nova on Portuguese/English prose; no tokenizer is shipped for Bedrock models
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_units(text: str, pattern: re.Pattern) -> list[str]:
+    return [unit for unit in pattern.split(text) if unit.strip()]
+
+
+def split_text(text: str, budget: int) -> list[str]:
+    """
+    Cut `text` into chunks of at most `budget` tokens, at paragraph breaks when possible,
+    then at sentence ends, and as a last resort at the character limit.
+    """
+    if estimate_tokens(text) <= budget:
+        return [text]
+
+    chunks = []
+    current = ""
+    for paragraph in _split_units(text, _PARAGRAPH_BREAK):
+        units = [paragraph] if estimate_tokens(paragraph) <= budget else _split_units(paragraph, _SENTENCE_END)
+        for unit in units:
+            separator = "\n\n" if unit is paragraph else " "
+            if current and estimate_tokens(current + separator + unit) > budget:
+                chunks.append(current)
+                current = ""
+            if estimate_tokens(unit) > budget:
+                limit = budget * CHARS_PER_TOKEN
+                pieces = [unit[i:i + limit] for i in range(0, len(unit), limit)]
+                chunks.extend(pieces[:-1])
+                unit = pieces[-1]
+            current = f"{current}{separator}{unit}" if current else unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _window_overlap(previous: dict, section: dict) -> int:
+    """
+    Bytes of `section` that repeat the end of `previous`. Only sliding windows overlap,
+    and their recorded `start`/`end` byte offsets say by how much; sections without
+    offsets, and title sections, which never overlap, share nothing.
+    """
+    offsets = [s.get(key) for s in (previous, section) for key in ("start", "end")]
+    if not all(isinstance(offset, int) for offset in offsets):
+        return 0
+    return max(0, min(previous["end"], section["end"]) - section["start"])
+
+
+def _drop_overlap(content: str, overlap: int) -> str:
+    """`content` without its first `overlap` bytes (window offsets are at character boundaries)."""
+    return content.encode("utf-8")[overlap:].decode("utf-8", errors="ignore").strip()
+
+
+def pack_sections(sections: list[dict], budget: int) -> list[list[dict]]:
+    """
+    Group sections into packs of at most `budget` tokens of content, keeping their order.
+
+    Small sections share a pack; a section larger than the budget is split into parts
+    that go to consecutive packs. When two sliding windows share a pack, the text the
+    second repeats from the first (known from their byte offsets) is sent only once.
+
+    Returns:
+        list[list[dict]]: Packs of pieces with `index` (position in `sections`), `title`,
+        `content`, and `part`/`parts` for split sections.
+    """
+    pieces = []
+    trimmed = {}  # index -> content without the overlap with the previous window
+    for index, section in enumerate(sections):
+        content = section.get("content", "").strip()
+        parts = split_text(content, budget) if budget > 0 else [content]
+        overlap = _window_overlap(sections[index - 1], section) if index else 0
+        if overlap and len(parts) == 1:
+            trimmed[index] = _drop_overlap(section.get("content", ""), overlap)
+        for part, chunk in enumerate(parts, start=1):
+            pieces.append({
+                "index": index,
+                "title": section.get("title", "Untitled"),
+                "content": chunk,
+                "part": part,
+                "parts": len(parts),
+            })
+
+    packs = []
+    current = []
+    used = 0
+    for piece in pieces:
+        packed = piece
+        if current and current[-1]["index"] == piece["index"] - 1 and current[-1]["parts"] == 1 and piece["index"] in trimmed:
+            packed = {**piece, "content": trimmed[piece["index"]]}
+        tokens = estimate_tokens(packed["content"])
+        if current and (budget <= 0 or used + tokens > budget):
+            packs.append(current)
+            current, used = [], 0
+            packed, tokens = piece, estimate_tokens(piece["content"])
+        if packed["content"]:
+            current.append(packed)
+            used += tokens
+    if current:
+        packs.append(current)
+    return packs
@@ -0,0 +1,200 @@
+"""
+Binary, memory-mapped section store (`sections/<method>_<base>.sections`).
+
+Layout, little-endian:
+
+    header   8s magic "SECSTOR1", u32 section count, u32 flags, u32 metadata length
+    metadata UTF-8 JSON (source Markdown name, size and hash when content is external)
+    index    per section: u64/u32 offset and length of its title, content and attributes
+    payload  UTF-8 titles, contents and attributes (JSON: level, path, start, end)
+
+A section is read by unpacking its index entry and decoding its slices of the mapped
+file, so opening a store costs nothing in proportion to its size and any section can
+be read without the others. With the EXTERNAL_CONTENT flag (sliding windows), content
+offsets point into the Markdown file instead, which is mapped as well.
+
+    python -m utils.sectionStore sections/*.json        # convert JSON section files
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterator, Optional
+
+from utils.markdownSections import check_source, open_sections, source_info
+
+MAGIC = b"SECSTOR1"
+EXTERNAL_CONTENT = 1
+
+_HEADER = struct.Struct("<8sIII")
+_ENTRY = struct.Struct("<QIQIQI")
+
+_ATTRIBUTE_KEYS = ("level", "path", "start", "end")
+
+
+def write_section_store(sections: list[dict], path: str, md_path: Optional[str] = None) -> str:
+    """
+    Write `sections` (dicts with title and content) to `path`, atomically. When `md_path`
+    is given, contents are not copied: each section must carry its `start`/`end` byte
+    offsets into that Markdown file.
+    """
+    external = md_path is not None
+    metadata = json.dumps(source_info(md_path) if external else {}, ensure_ascii=False).encode("utf-8")
+
+    titles, attributes, contents = [], [], []
+    for section in sections:
+        titles.append(section.get("title", "Untitled").encode("utf-8"))
+        attributes.append(json.dumps(
+            {key: section[key] for key in _ATTRIBUTE_KEYS if key in section}, ensure_ascii=False
+        ).encode("utf-8"))
+        contents.append(b"" if external else section.get("content", "").encode("utf-8"))
+
+    offset = _HEADER.size + len(metadata) + _ENTRY.size * len(sections)
+    entries = []
+    for title, content, attribute, section in zip(titles, contents, attributes, sections):
+        title_offset = offset
+        offset += len(title)
+        if external:
+            content_offset, content_length = section["start"], section["end"] - section["start"]
+        else:
+            content_offset, content_length = offset, len(content)
+            offset += len(content)
+        entries.append(_ENTRY.pack(title_offset, len(title), content_offset, content_length, offset, len(attribute)))
+        offset += len(attribute)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(sections), EXTERNAL_CONTENT if external else 0, len(metadata)))
+            f.write(metadata)
+            f.writelines(entries)
+            for title, content, attribute in zip(titles, contents, attributes):
+                f.write(title)
+                f.write(content)
+                f.write(attribute)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _map(path: str):
+    f = open(path, "rb")
+    if os.fstat(f.fileno()).st_size == 0:
+        return f, b""
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SectionStore:
+    """
+    Read-only view of a `.sections` file. `store[i]` is section i as a dict (title,
+    content and its attributes), like an item of a JSON section file.
+
+    Args:
+        path (str): The `.sections` file.
+        markdown_dir (str | None): Where the source Markdown of a store with external
+            content lives. Defaults to the directory `markdown/` next to `sections/`.
+
+    Raises:
+        ValueError: Not a section store, or its source Markdown changed since it was written.
+    """
+
+    def __init__(self, path: str, markdown_dir: Optional[str] = None):
+        self.path = path
+        self._file, self._buffer = _map(path)
+        self._source_file, self._source = None, None
+        try:
+            if len(self._buffer) < _HEADER.size:
+                raise ValueError(f"{path} is not a section store")
+            magic, self._count, self._flags, metadata_length = _HEADER.unpack_from(self._buffer, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a section store")
+            self.metadata = json.loads(bytes(self._buffer[_HEADER.size:_HEADER.size + metadata_length]) or b"{}")
+            self._index = _HEADER.size + metadata_length
+
+            if self._flags & EXTERNAL_CONTENT:
+                markdown_dir = markdown_dir or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(path))), "markdown")
+                md_path = os.path.join(markdown_dir, self.metadata["source"])
+                check_source(md_path, self.metadata, path)
+                self._source_file, self._source = _map(md_path)
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, index: int) -> tuple:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return _ENTRY.unpack_from(self._buffer, self._index + index * _ENTRY.size)
+
+    def _text(self, buffer, offset: int, length: int) -> str:
+        return bytes(buffer[offset:offset + length]).decode("utf-8", errors="replace")
+
+    def title(self, index: int) -> str:
+        title_offset, title_length, *_ = self._entry(index)
+        return self._text(self._buffer, title_offset, title_length)
+
+    def content(self, index: int) -> str:
+        _, _, content_offset, content_length, _, _ = self._entry(index)
+        buffer = self._source if self._flags & EXTERNAL_CONTENT else self._buffer
+        return self._text(buffer, content_offset, content_length)
+
+    def attributes(self, index: int) -> dict:
+        *_, attributes_offset, attributes_length = self._entry(index)
+        return json.loads(self._text(self._buffer, attributes_offset, attributes_length) or "{}")
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self._count
+        return {"title": self.title(index), "content": self.content(index), **self.attributes(index)}
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        for buffer in (self._buffer, self._source):
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+        for f in (self._file, self._source_file):
+            if f is not None:
+                f.close()
+
+    def __enter__(self) -> "SectionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def convert_sections_file(json_path: str, markdown_dir: str, out_path: Optional[str] = None) -> str:
+    """
+    Convert a `title_*`/`window_*` JSON section file to a `.sections` store next to it
+    (or at `out_path`). Windows stored as offsets keep their content in the Markdown.
+    """
+    out_path = out_path or json_path.rsplit(".", 1)[0] + ".sections"
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    md_path = None if isinstance(data, list) else os.path.join(markdown_dir, data["source"])
+    with open_sections(json_path, markdown_dir) as sections:
+        return write_section_store(list(sections), out_path, md_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert JSON section files to binary section stores.")
+    parser.add_argument("files", nargs="+", help="title_*.json / window_*.json files")
+    parser.add_argument("--markdown-dir", default="markdown", help="Markdown of windows stored as offsets")
+    args = parser.parse_args()
+
+    for json_path in args.files:
+        if json_path.endswith(".hashes.json"):
+            continue
+        out_path = convert_sections_file(json_path, args.markdown_dir)
+        print(f"✅ {json_path} ({os.path.getsize(json_path)} bytes) -> {out_path} ({os.path.getsize(out_path)} bytes)")
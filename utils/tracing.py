@@ -0,0 +1,319 @@
+"""
+Lightweight tracing: a span per request, agent, tool, pipeline stage and LLM call.
+
+Spans nest through a ContextVar, so they follow the work into the threads started by
+`utils.concurrency` and the stage scheduler. Finished spans are appended to a JSONL
+file, one OTLP/JSON span per line (traceId, spanId, parentSpanId, times in unix
+nanoseconds, attributes as key/value pairs), which an OpenTelemetry collector can
+read. With TRACE_SUMMARY=1 a flame-style summary is printed when a request's root
+span ends; otherwise it is reported on demand:
+
+    python -m utils.tracing traces/spans.jsonl            # summary of the last trace
+    python -m utils.tracing traces/spans.jsonl --trace <traceId>
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from strands.models import Model
+
+# "0" turns every span into a no-op
+TRACING_ENABLED = os.getenv("TRACING", "1") == "1"
+# JSONL file receiving finished spans; empty keeps spans in memory only
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join("traces", "spans.jsonl"))
+# "1" prints the flame summary when a root span ends; `python -m utils.tracing` reports on demand
+TRACE_SUMMARY = os.getenv("TRACE_SUMMARY", "0") == "1"
+# Traces kept in memory for `flame_summary`
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "50"))
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self) -> dict:
+        """The span as OTLP/JSON (the `spans` item of a `scopeSpans` entry)."""
+        def value(v: Any) -> dict:
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": "span.kind", "value": value(self.kind)}]
+                + [{"key": k, "value": value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+    @classmethod
+    def from_otlp(cls, data: dict) -> "Span":
+        attributes = {}
+        for item in data.get("attributes", []):
+            (kind, raw), = item["value"].items()
+            attributes[item["key"]] = int(raw) if kind == "intValue" else raw
+        return cls(
+            name=data["name"],
+            kind=attributes.pop("span.kind", "internal"),
+            trace_id=data["traceId"],
+            span_id=data["spanId"],
+            parent_id=data.get("parentSpanId") or None,
+            start_ns=int(data["startTimeUnixNano"]),
+            end_ns=int(data["endTimeUnixNano"]),
+            attributes=attributes,
+            error=data.get("status", {}).get("message"),
+        )
+
+
+class Tracer:
+    """Collects finished spans per trace and appends them to the export file."""
+
+    def __init__(self, export_path: Optional[str] = TRACE_EXPORT_PATH, keep: int = TRACE_KEEP):
+        self.export_path = export_path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._traces: OrderedDict[str, list[Span]] = OrderedDict()
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self._traces.setdefault(span.trace_id, []).append(span)
+            self._traces.move_to_end(span.trace_id)
+            while len(self._traces) > self.keep:
+                self._traces.popitem(last=False)
+            if self.export_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.export_path)), exist_ok=True)
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span.to_otlp(), ensure_ascii=False) + "\n")
+
+    def spans(self, trace_id: str) -> list[Span]:
+        with self._lock:
+            return list(self._traces.get(trace_id, []))
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Time the enclosed code as a child of the current span (or as a new trace's root)."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        kind=kind,
+        trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = repr(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator finalized in another context (e.g. closed by the GC)
+            _current_span.set(parent)
+        tracer.finish(current)
+        if parent is None and TRACE_SUMMARY:
+            print(f"📊 Trace {current.trace_id}\n{flame_summary(current.trace_id)}")
+
+
+def set_attributes(**attributes) -> None:
+    """Add attributes to the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def _short(value: Any) -> Any:
+    if isinstance(value, (bool, int, float)):
+        return value
+    return str(value)[:100]
+
+
+def traced(name: Optional[str] = None, kind: str = "function") -> Callable:
+    """
+    Decorator running the function in a span. The wrapper keeps the signature, type
+    hints and docstring (functools.wraps), so it can sit under `@tool`. Scalar and
+    string arguments are recorded as attributes, truncated to 100 characters.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+            except TypeError:
+                bound = {}
+            attributes = {
+                f"arg.{key}": _short(value)
+                for key, value in bound.items()
+                if key != "self" and isinstance(value, (str, bool, int, float))
+            }
+            with span(span_name, kind, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracedModel(Model):
+    """
+    Wraps a strands model with a span per LLM request, recording the method, the
+    number of tools offered and the token usage reported by the model.
+    """
+
+    def __init__(self, model: Model):
+        self.model = model
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def _span(self, method: str, tools: int = 0):
+        return span(str(self.get_config().get("model_id", "model")), "llm", method=method, tools=tools)
+
+    @staticmethod
+    def _record_usage(usage: Optional[dict]) -> None:
+        if usage:
+            set_attributes(
+                input_tokens=usage.get("inputTokens", 0),
+                output_tokens=usage.get("outputTokens", 0),
+                total_tokens=usage.get("totalTokens", 0),
+            )
+
+    async def structured_output(self, output_model, prompt, **kwargs):
+        with self._span("structured_output"):
+            async for event in self.model.structured_output(output_model, prompt, **kwargs):
+                if "stop" in event:
+                    self._record_usage(event["stop"][2])
+                yield event
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        with self._span("stream", len(tool_specs or [])):
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                if "metadata" in event:
+                    self._record_usage(event["metadata"].get("usage"))
+                yield event
+
+
+def flame_summary(trace_id: str, spans: Optional[list[Span]] = None) -> str:
+    """
+    Indented tree of the trace's spans with their duration and share of the root,
+    followed by totals per span kind (calls, seconds and LLM tokens).
+    """
+    spans = spans if spans is not None else tracer.spans(trace_id)
+    if not spans:
+        return f"(no spans for trace {trace_id})"
+    children: dict[Optional[str], list[Span]] = {}
+    ids = {s.span_id for s in spans}
+    for s in sorted(spans, key=lambda s: s.start_ns):
+        parent = s.parent_id if s.parent_id in ids else None
+        children.setdefault(parent, []).append(s)
+    total = sum(s.seconds for s in children.get(None, [])) or 1e-9
+
+    lines = []
+
+    def walk(node: Span, depth: int) -> None:
+        extra = ""
+        if "total_tokens" in node.attributes:
+            extra = f"  tokens {node.attributes.get('input_tokens')}→{node.attributes.get('output_tokens')}"
+        if "cache" in node.attributes:
+            extra += f"  cache {node.attributes['cache']}"
+        if node.error:
+            extra += "  ❌"
+        lines.append(
+            f"{'  ' * depth}{node.name} [{node.kind}] {node.seconds:.3f}s {100 * node.seconds / total:5.1f}%{extra}"
+        )
+        for child in children.get(node.span_id, []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+
+    totals: dict[str, dict] = {}
+    for s in spans:
+        entry = totals.setdefault(s.kind, {"calls": 0, "seconds": 0.0, "tokens": 0})
+        entry["calls"] += 1
+        entry["seconds"] += s.seconds
+        entry["tokens"] += int(s.attributes.get("total_tokens", 0) or 0)
+    lines.append("totals: " + ", ".join(
+        f"{kind} {t['calls']}× {t['seconds']:.2f}s" + (f" {t['tokens']} tokens" if t["tokens"] else "")
+        for kind, t in sorted(totals.items())
+    ))
+    return "\n".join(lines)
+
+
+def load_spans(path: str) -> list[Span]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                spans.append(Span.from_otlp(json.loads(line)))
+    return spans
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the flame-style summary of a trace from a span file.")
+    parser.add_argument("path", nargs="?", default=TRACE_EXPORT_PATH, help="JSONL span file")
+    parser.add_argument("--trace", default=None, help="Trace id (default: the most recent trace)")
+    args = parser.parse_args()
+
+    all_spans = load_spans(args.path)
+    if not all_spans:
+        parser.error(f"No spans in {args.path}")
+    trace_id = args.trace or max(all_spans, key=lambda s: s.end_ns).trace_id
+    print(flame_summary(trace_id, [s for s in all_spans if s.trace_id == trace_id]))